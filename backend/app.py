@@ -3,11 +3,27 @@
 import os
 import uuid
 import json
+from datetime import datetime, timezone
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
-from logic.scoring import compute_scores, categorize_scores, get_detailed_profile
+from logic.scoring import (SCORING_VERSION, compute_scores, categorize_scores,
+                           save_score_snapshot, ResultsPipeline)
+from logic.scoring_model import compile_scoring_model
 from plots.generate_plot import generate_plot
-from logic.db_helpers import get_connection
+from logic.db_helpers import db_connection, save_responses
+from logic.submission_queries import (COMPLETE_SUBMISSION_SQL, INSERT_SUBMISSION_SQL,
+                                      SUBMISSION_EXISTS_SQL, SUBMISSION_STATUS_SQL)
+from logic.migrations import apply_migrations
+from logic.rollups import record_started, record_completed
+from logic.item_analysis import record_item_responses
+from logic.results_cache import results_cache
+from logic.creative_matrix import get_creative_matrix
+from logic.http_cache import (content_hash, is_not_modified, load_submission_revision,
+                              not_modified, set_validators)
+from logic.result_table import build_result_table, get_result_table
+from logic.distribution import score_distribution
+from logic.percentiles import percentile_index
+from logic.write_behind import WRITE_BEHIND_ENABLED, start_response_writer, get_response_writer
 
 # Import the admin and auth blueprints
 from routes.auth_routes import auth_bp
@@ -39,6 +55,8 @@ TEXT_QUESTIONS_PATH = "data/text_questions.json"
 with open(SCALE_QUESTIONS_PATH, "r", encoding="utf-8") as f:
     scale_data = json.load(f)
 scale_questions = scale_data["questions"]
+# Compiled once: per-question axis/sign/offset from the bank's metadata
+scoring_model = compile_scoring_model(scale_data)
 
 with open(TEXT_QUESTIONS_PATH, "r", encoding="utf-8") as f:
     text_data = json.load(f)
@@ -47,37 +65,46 @@ text_questions = text_data["questions"]
 # Combine them into one list to keep a single question flow
 all_questions = scale_questions + text_questions
 
+# Lookup by id for validating submitted responses
+questions_by_id = {q["id"]: q for q in all_questions}
 
-def create_tables_if_not_exists():
-    """Creates tables from your schema.sql if you haven't already, or just ensure existence."""
-    # Minimal approach: run the schema statements inline or read from schema.sql
-    schema_sql = """
-    CREATE TABLE IF NOT EXISTS submissions (
-        submission_id TEXT PRIMARY KEY,
-        user_name TEXT,
-        user_email TEXT,
-        submission_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-        is_complete INTEGER DEFAULT 0
-    );
-
-    CREATE TABLE IF NOT EXISTS submission_responses (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        submission_id TEXT,
-        question_id TEXT,
-        numeric_response INTEGER,
-        text_response TEXT,
-        response_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
-    );
-    """
-    conn = get_connection()
-    conn.executescript(schema_sql)
-    conn.commit()
-    conn.close()
+# The question bank (for exports) and scoring model (for re-scoring)
+app.config["QUESTIONS"] = all_questions
+app.config["SCORING_MODEL"] = scoring_model
+SCALE_RANGE = scale_data["metadata"]["scaleRange"]
+
+# The bank only changes on restart: serialise it once and tag it with its hash
+QUESTIONS_BODY = app.json.dumps({"questions": all_questions, "total": len(all_questions)}).encode("utf-8")
+QUESTIONS_ETAG = content_hash(QUESTIONS_BODY)
+QUESTIONS_CACHE_CONTROL = "public, max-age=300"
+
+# Completed scores only change on re-scoring or content edits, but their
+# percentiles move with every completion, so browsers revalidate after a minute
+COMPLETED_RESULTS_CACHE_CONTROL = "private, max-age=60"
+RESULTS_CACHE_CONTROL = "private, no-cache"
+
+# Precompute the results payload for every reachable score pair
+build_result_table(scoring_model.score_bound)
+# Population percentile counts over the same score range, and the admin score
+# distribution, both loaded on first use from this model's snapshots
+percentile_index.reset(scoring_model.score_bound, scoring_model.version)
+score_distribution.reset(scoring_model.version)
+
+# Fetch -> score -> categorise -> profile -> serialise for /api/results
+results_pipeline = ResultsPipeline(scoring_model, result_table=get_result_table)
 
+# Upper bound on items accepted by /api/submit-responses in one request
+MAX_BATCH_RESPONSES = 200
 
-# Call table-creation on startup
-create_tables_if_not_exists()
+
+# Bring the schema up to date on startup (see logic/migrations.py)
+apply_migrations()
+
+# Optional group-commit writer for single responses (see logic/write_behind.py)
+if WRITE_BEHIND_ENABLED:
+    start_response_writer(model=scoring_model,
+                          on_commit=lambda rows: results_cache.invalidate_many(
+                              row[0] for row in rows))
 
 # 2. ROUTES
 
@@ -85,7 +112,10 @@ create_tables_if_not_exists()
 @app.route("/api/questions", methods=["GET"])
 def get_questions():
     """Return all questions data"""
-    return jsonify({"questions": all_questions, "total": len(all_questions)})
+    if is_not_modified(QUESTIONS_ETAG):
+        return not_modified(QUESTIONS_ETAG, cache_control=QUESTIONS_CACHE_CONTROL)
+    response = app.response_class(QUESTIONS_BODY, mimetype="application/json")
+    return set_validators(response, QUESTIONS_ETAG, cache_control=QUESTIONS_CACHE_CONTROL)
 
 
 @app.route("/api/start", methods=["POST"])
@@ -94,17 +124,14 @@ def start_submission():
     data = request.json
     user_name = data.get("name", "")
     user_email = data.get("email", "")
+    # Optional label grouping submissions for analytics (e.g. a class or campaign)
+    cohort = data.get("cohort") if isinstance(data.get("cohort"), str) else None
     submission_id = str(uuid.uuid4())
 
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO submissions (submission_id, user_name, user_email)
-        VALUES (?, ?, ?)
-    """, (submission_id, user_name, user_email))
-    conn.commit()
-    conn.close()
+    with db_connection() as conn:
+        conn.execute(INSERT_SUBMISSION_SQL,
+                     (submission_id, user_name, user_email, cohort or None))
+        record_started(conn, submission_id)
 
     return jsonify({"submission_id": submission_id, "status": "success"})
 
@@ -112,65 +139,179 @@ def start_submission():
 @app.route("/api/submit-response", methods=["POST"])
 def submit_response():
     """Save a question response"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     submission_id = data.get("submission_id")
-    question_id = data.get("question_id")
-    numeric_response = data.get("numeric_response")
-    text_response = data.get("text_response")
-
-    conn = get_connection()
-    cur = conn.cursor()
-
-    if numeric_response is not None:
-        cur.execute(
-            """
-            INSERT INTO submission_responses (submission_id, question_id, numeric_response)
-            VALUES (?, ?, ?)
-        """, (submission_id, question_id, numeric_response))
-    else:
-        cur.execute(
-            """
-            INSERT INTO submission_responses (submission_id, question_id, text_response)
-            VALUES (?, ?, ?)
-        """, (submission_id, question_id, text_response))
+    if not submission_id:
+        return jsonify({"status": "error", "message": "submission_id is required"}), 400
+    # Validated up front on both paths: a queued row is acknowledged before
+    # it is written, so it must not be able to fail for a reason the client
+    # could have been told about
+    validated, error = validate_response_item(data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    row = (submission_id, ) + validated
+
+    writer = get_response_writer()
+    with db_connection() as conn:
+        if writer is None:
+            # Hold the write lock from the status check, so the submission
+            # cannot be completed between the check and the write
+            conn.execute("BEGIN IMMEDIATE")
+        error = submission_write_error(conn, submission_id)
+        if error:
+            return error
+        if writer is None:
+            save_responses(conn, [row], scoring_model)
+
+    if writer is not None:
+        if not writer.submit(row):
+            response = jsonify({
+                "status": "error",
+                "message": "Server busy, please retry"
+            })
+            response.headers["Retry-After"] = "1"
+            return response, 503
+        return jsonify({"status": "success", "message": "Response queued"}), 202
 
-    conn.commit()
-    conn.close()
+    results_cache.invalidate(submission_id)
 
     return jsonify({"status": "success", "message": "Response recorded"})
 
 
+def submission_write_error(conn, submission_id):
+    """A 404 or 409 response if the submission can't take responses, else None."""
+    row = conn.execute(SUBMISSION_STATUS_SQL, (submission_id, )).fetchone()
+    if row is None:
+        return jsonify({
+            "status": "error",
+            "message": "Submission not found"
+        }), 404
+    if row[0]:
+        return jsonify({
+            "status": "error",
+            "message": "Submission is already complete"
+        }), 409
+    return None
+
+
+def validate_response_item(item):
+    """
+    Check one response item (a batch item or a single response) against the
+    question bank.
+    Returns (row, None) when valid, or (None, error message).
+    """
+    if not isinstance(item, dict):
+        return None, "Item must be an object"
+
+    question_id = item.get("question_id")
+    question = questions_by_id.get(question_id)
+    if question is None:
+        return None, f"Unknown question_id: {question_id}"
+
+    numeric_response = item.get("numeric_response")
+    text_response = item.get("text_response")
+
+    if question.get("responseType") == "text":
+        if not isinstance(text_response, str):
+            return None, "text_response is required for this question"
+        return (question_id, None, text_response), None
+
+    if isinstance(numeric_response, bool) or not isinstance(numeric_response, int):
+        return None, "numeric_response must be an integer for this question"
+    if not SCALE_RANGE["min"] <= numeric_response <= SCALE_RANGE["max"]:
+        return None, (f"numeric_response must be between {SCALE_RANGE['min']} "
+                      f"and {SCALE_RANGE['max']}")
+    return (question_id, numeric_response, None), None
+
+
+@app.route("/api/submit-responses", methods=["POST"])
+def submit_responses():
+    """Save a batch of question responses in a single transaction"""
+    data = request.get_json(silent=True) or {}
+    submission_id = data.get("submission_id")
+    items = data.get("responses")
+
+    if not submission_id or not isinstance(items, list) or not items:
+        return jsonify({
+            "status": "error",
+            "message": "submission_id and a non-empty responses array are required"
+        }), 400
+    if len(items) > MAX_BATCH_RESPONSES:
+        return jsonify({
+            "status": "error",
+            "message": f"At most {MAX_BATCH_RESPONSES} responses per request"
+        }), 400
+
+    rows = []
+    results = []
+    for index, item in enumerate(items):
+        validated, error = validate_response_item(item)
+        question_id = item.get("question_id") if isinstance(item, dict) else None
+        if error:
+            results.append({"index": index, "question_id": question_id,
+                            "status": "error", "message": error})
+        else:
+            rows.append((submission_id, ) + validated)
+            results.append({"index": index, "question_id": question_id,
+                            "status": "success"})
+
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        error = submission_write_error(conn, submission_id)
+        if error:
+            return error
+        saved = save_responses(conn, rows, scoring_model)
+    results_cache.invalidate(submission_id)
+
+    if saved == len(items):
+        status, code = "success", 200
+    elif saved:
+        status, code = "partial", 200
+    else:
+        status, code = "error", 400
+
+    return jsonify({"status": status, "saved": saved, "results": results}), code
+
+
 @app.route("/api/complete/<submission_id>", methods=["POST"])
 def complete_submission(submission_id):
     """Mark a submission as complete"""
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        # Check if submission exists
-        cur.execute(
-            """
-            SELECT submission_id FROM submissions
-            WHERE submission_id = ?
-        """, (submission_id, ))
-
-        if not cur.fetchone():
-            conn.close()
-            return jsonify({
-                "status": "error",
-                "message": "Submission not found"
-            }), 404
-
-        # Update submission to mark as complete
-        cur.execute(
-            """
-            UPDATE submissions
-            SET is_complete = 1
-            WHERE submission_id = ?
-        """, (submission_id, ))
-
-        conn.commit()
-        conn.close()
+        # Make sure queued responses are on disk before the submission is closed
+        writer = get_response_writer()
+        if writer is not None:
+            writer.flush()
+
+        with db_connection() as conn:
+            cur = conn.cursor()
+
+            # Check if submission exists
+            cur.execute(SUBMISSION_EXISTS_SQL, (submission_id, ))
+
+            if not cur.fetchone():
+                return jsonify({
+                    "status": "error",
+                    "message": "Submission not found"
+                }), 404
+
+            # Update submission to mark as complete; rowcount is 0 on a repeat call
+            cur.execute(COMPLETE_SUBMISSION_SQL, (submission_id, ))
+            first_completion = cur.rowcount == 1
+
+            # Completed results are immutable, so score them once here
+            scores = compute_scores(submission_id, scoring_model, conn)
+            labels = categorize_scores(scores["learning_score"],
+                                       scores["application_score"])
+            save_score_snapshot(conn, submission_id, scores, labels, scoring_model.version)
+            if first_completion:
+                record_completed(conn, submission_id, scores, labels)
+                record_item_responses(conn, submission_id, scoring_model)
+        results_cache.invalidate(submission_id)
+        try:
+            percentile_index.refresh()
+        except Exception as e:
+            # The completion is committed; percentiles catch up on a later refresh
+            print(f"Error refreshing percentiles: {str(e)}")
 
         return jsonify({
             "status": "success",
@@ -184,42 +325,73 @@ def complete_submission(submission_id):
         }), 500
 
 
+def results_validators(revision, percentile_generation: int, matrix_version: int):
+    """
+    ETag and Last-Modified for a submission's results. Besides the submission's
+    own revision, results depend on the scoring rules, the question bank, the
+    creative matrix text (by the version the body was built from) and the
+    population percentiles (by the index's generation), so those are folded in too.
+    """
+    content = content_hash(
+        f"{SCORING_VERSION}:{scoring_model.version}:{QUESTIONS_ETAG}:{matrix_version}:"
+        f"{percentile_generation}".encode("utf-8"), 8)
+    last_modified = revision["last_modified"]
+    matrix_modified = datetime.fromtimestamp(matrix_version / 1e9, tz=timezone.utc)
+    for modified in (matrix_modified, percentile_index.last_modified):
+        if modified is not None and (last_modified is None or modified > last_modified):
+            last_modified = modified
+    return f"{revision['revision']}-{content}", last_modified
+
+
 @app.route("/api/results/<submission_id>")
 def get_results(submission_id):
     """Get computed results for a submission"""
     try:
-        # Get scores and labels
-        print(f"Computing scores for {submission_id}...")
-        scores = compute_scores(submission_id, all_questions)
-        print(f"Scores computed: {scores}")
-
-        print("Categorizing scores...")
-        labels = categorize_scores(scores["learning_score"],
-                                   scores["application_score"])
-        print(f"Labels categorized: {labels}")
-
-        # Get detailed profile
-        print("Getting detailed profile...")
-        detailed_profile = get_detailed_profile(submission_id, all_questions)
-        print(f"Profile retrieved? {detailed_profile is not None}")
-        if detailed_profile is None:
-            return jsonify({"error":
-                            "Could not generate detailed profile"}), 500
-
-        # Skip plot generation entirely
-        plot_filename = None
-        print("Skipped plot generation")
-
-        # Return structured response
-        return jsonify({
-            "scores": {
-                "learning_score": scores["learning_score"],
-                "application_score": scores["application_score"]
-            },
-            "labels": labels,
-            "detailed_profile": detailed_profile,
-            "plot_url": None  # Always return None for plot_url
-        })
+        revision = load_submission_revision(submission_id)
+
+        # Validators need only the revision and the percentile generation:
+        # answer 304 before fetching or scoring anything
+        if revision is not None:
+            percentile_index.refresh_if_stale()
+            etag, last_modified = results_validators(revision, percentile_index.generation,
+                                                     get_creative_matrix().version)
+            cache_control = (COMPLETED_RESULTS_CACHE_CONTROL if revision["is_complete"]
+                             else RESULTS_CACHE_CONTROL)
+            if is_not_modified(etag, last_modified):
+                return not_modified(etag, last_modified, cache_control)
+
+        cached = True
+
+        def compute():
+            nonlocal cached
+            cached = False
+            return results_pipeline.run(submission_id)
+
+        # The cached report holds everything but the percentiles, which move with
+        # the population; they are looked up per request (O(1)) and appended
+        report = results_cache.get_or_compute(submission_id, compute)
+        if report.matrix_version != get_creative_matrix().version:
+            # Cached before the creative matrix was edited: rebuild the profile
+            results_cache.invalidate(submission_id)
+            report = results_cache.get_or_compute(submission_id, compute)
+        # Read before the lookup, so the validators never claim newer counts than the body has
+        generation = percentile_index.generation
+        percentiles = app.json.dumps(percentile_index.lookup(
+            report.scores, revision["cohort"] if revision else None)).encode("utf-8")
+
+        body = report.body[:-1] + b',"percentiles":' + percentiles + b"}"
+        response = app.response_class(body, mimetype="application/json")
+        # Per-stage latency, visible in the browser's network panel
+        if cached:
+            response.headers["Server-Timing"] = "cache;desc=hit"
+        else:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={ms:.2f}" for stage, ms in report.timings_ms.items())
+        if revision is not None:
+            # Validators for the matrix version this body was actually built from
+            etag, last_modified = results_validators(revision, generation, report.matrix_version)
+            set_validators(response, etag, last_modified, cache_control)
+        return response
 
     except Exception as e:
         print(f"Error generating results: {str(e)}")
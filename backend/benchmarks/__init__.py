@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+"""
+Offline benchmark suite: synthetic databases (benchmarks/synthetic.py) and an
+in-process runner (benchmarks/run.py). Run from the backend directory:
+
+    python -m benchmarks.run
+"""
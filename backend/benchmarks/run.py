@@ -0,0 +1,274 @@
+# benchmarks/run.py
+"""
+Benchmark scoring, profile lookup and the admin submission queries against
+synthetic databases of several sizes, entirely offline.
+
+    python -m benchmarks.run                          # 1k, 100k and 1M submissions
+    python -m benchmarks.run --sizes 1000 --iterations 200
+    python -m benchmarks.run --compare benchmarks/results/previous.json
+
+Databases are built once per (size, seed) under benchmarks/data/ and reused
+(--rebuild forces a fresh build). Each size is measured in its own worker
+process, because the app binds its connection pool to DATABASE_FILE on
+import. Functions are called directly and endpoints go through the Flask
+test client, so no server is needed.
+
+Every operation gets a warm-up, then --iterations timed calls; p50/p95/p99,
+mean and ops/sec are printed and saved as JSON under benchmarks/results/.
+With --compare, any operation whose p95 grew by more than --threshold
+against the earlier run is reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_ITERATIONS = 500
+WARMUP = 20
+# Distinct submissions the per-submission operations cycle through
+SAMPLE_SUBMISSIONS = 1000
+# Relative p95 growth that counts as a regression in --compare
+DEFAULT_THRESHOLD = 0.2
+
+STYLES = ("intuitive", "conceptual", "pragmatic", "deductive")
+STRENGTHS = ("slight", "solid", "strong")
+
+
+def database_path(size: int, seed: int) -> str:
+    return os.path.join(DATA_DIR, f"bench-{size}-seed{seed}.db")
+
+
+def time_operation(operation: Callable[[int], Any], iterations: int) -> Dict[str, float]:
+    """Call operation(i) WARMUP + iterations times; latency statistics of the timed calls."""
+    for i in range(WARMUP):
+        operation(i)
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        operation(i)
+        samples[i] = time.perf_counter_ns() - start
+    samples /= 1e6
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "iterations": iterations,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(samples.mean()),
+        "ops_per_sec": float(iterations / (samples.sum() / 1000)) if samples.sum() else 0.0
+    }
+
+
+def _sample_submissions(path: str, count: int, seed: int) -> List[str]:
+    """Random completed submission IDs, spread over the whole table."""
+    conn = sqlite3.connect(path)
+    try:
+        max_rowid = conn.execute("SELECT MAX(rowid) FROM submissions").fetchone()[0] or 0
+        rng = random.Random(seed)
+        rowids = rng.sample(range(1, max_rowid + 1), min(count * 2, max_rowid))
+        placeholders = ", ".join("?" for _ in rowids)
+        ids = [row[0] for row in conn.execute(
+            f"SELECT submission_id FROM submissions WHERE is_complete = 1 AND rowid IN ({placeholders})",
+            rowids)]
+    finally:
+        conn.close()
+    rng.shuffle(ids)
+    return ids[:count]
+
+
+def run_worker(size: int, seed: int, iterations: int, rebuild: bool) -> Dict[str, Any]:
+    """Build (if needed) and measure one database. DATABASE_FILE is already set."""
+    from benchmarks.synthetic import build_database
+
+    path = os.environ["DATABASE_FILE"]
+    build = None
+    if rebuild or not os.path.exists(path):
+        print(f"Building {path} ({size} submissions)...", file=sys.stderr)
+        build = build_database(path, size, seed,
+                               progress=lambda message: print(message, file=sys.stderr))
+
+    import app as appmod
+    from auth.auth_utils import generate_token
+    from logic.scoring import (categorize_scores, compute_scores, get_detailed_profile,
+                               get_style_profile)
+
+    model = appmod.scoring_model
+    client = appmod.app.test_client()
+    headers = {"Authorization": f"Bearer {generate_token('benchmark')}"}
+    ids = _sample_submissions(path, SAMPLE_SUBMISSIONS, seed)
+    if not ids:
+        raise RuntimeError(f"No completed submissions in {path}")
+
+    rng = random.Random(seed)
+    bound = model.score_bound
+    pairs = [(rng.randint(-bound, bound), rng.randint(-bound, bound)) for _ in range(1000)]
+    profiles = [(rng.choice(STYLES), rng.choice(STRENGTHS)) for _ in range(1000)]
+
+    def get(url: str) -> None:
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} -> {response.status_code}: {response.get_data(as_text=True)}")
+
+    first_page = client.get("/api/admin/submissions?limit=50", headers=headers).get_json()
+    cursor = first_page["next_cursor"] or ""
+
+    operations: Dict[str, Callable[[int], Any]] = {
+        "compute_scores": lambda i: compute_scores(ids[i % len(ids)], model),
+        "categorize_scores": lambda i: categorize_scores(*pairs[i % len(pairs)]),
+        "get_detailed_profile": lambda i: get_detailed_profile(ids[i % len(ids)], model),
+        "get_style_profile": lambda i: get_style_profile(*profiles[i % len(profiles)]),
+        "get_submissions.first_page": lambda i: get("/api/admin/submissions?limit=50"),
+        "get_submissions.next_page": lambda i: get(f"/api/admin/submissions?limit=50&cursor={cursor}"),
+        "get_submissions.style_by_time": lambda i: get(
+            f"/api/admin/submissions?limit=50&style={STYLES[i % len(STYLES)]}"),
+        "get_submissions.style_by_score": lambda i: get(
+            f"/api/admin/submissions?limit=50&style={STYLES[i % len(STYLES)]}&sort=learning_score"),
+        "get_submission_detail": lambda i: get(f"/api/admin/submissions/{ids[i % len(ids)]}"),
+    }
+
+    results = {}
+    for name, operation in operations.items():
+        results[name] = time_operation(operation, iterations)
+        print(f"  {name}: p50 {results[name]['p50_ms']:.3f} ms", file=sys.stderr)
+
+    return {"submissions": size, "build": build, "operations": results}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measure(size: int, seed: int, iterations: int, rebuild: bool) -> Dict[str, Any]:
+    """Run one size in a worker process and return its results."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    env = dict(os.environ)
+    env["DATABASE_FILE"] = database_path(size, seed)
+    env.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+    # Measure the synchronous write path, not whatever the shell has enabled
+    env["WRITE_BEHIND"] = "0"
+
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        output = f.name
+    try:
+        command = [sys.executable, "-m", "benchmarks.run", "--worker", "--sizes", str(size),
+                   "--seed", str(seed), "--iterations", str(iterations), "--output", output]
+        if rebuild:
+            command.append("--rebuild")
+        # The app prints while importing; keep the worker's stdout off ours
+        subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for size, result in report["sizes"].items():
+        print(f"\n{int(size):,} submissions")
+        print(f"  {'operation':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/sec':>10}")
+        for name, stats in result["operations"].items():
+            print(f"  {name:<34} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} "
+                  f"{stats['p99_ms']:>9.3f} {stats['ops_per_sec']:>10.0f}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Operations whose p95 grew by more than `threshold` (relative) against the baseline."""
+    regressions = []
+    for size, result in report["sizes"].items():
+        before = baseline.get("sizes", {}).get(size)
+        if before is None:
+            continue
+        for name, stats in result["operations"].items():
+            old = before["operations"].get(name)
+            if old is None or not old["p95_ms"]:
+                continue
+            change = stats["p95_ms"] / old["p95_ms"] - 1
+            flag = "REGRESSION" if change > threshold else ""
+            print(f"  {int(size):>9,} {name:<34} p95 {old['p95_ms']:.3f} -> {stats['p95_ms']:.3f} ms "
+                  f"({change:+.0%}) {flag}")
+            if flag:
+                regressions.append(f"{size}:{name}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="numbers of synthetic submissions to measure")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS,
+                        help="timed calls per operation")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="rebuild the synthetic databases even if they exist")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative p95 growth reported as a regression (default 0.2)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    iterations = max(args.iterations, 1)
+
+    if args.worker:
+        result = run_worker(args.sizes[0], args.seed, iterations, args.rebuild)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return 0
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "iterations": iterations,
+        "sizes": {}
+    }
+    for size in args.sizes:
+        print(f"Measuring {size:,} submissions...")
+        report["sizes"][str(size)] = _measure(size, args.seed, iterations, args.rebuild)
+    print_report(report)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(RESULTS_DIR, f"bench-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# benchmarks/synthetic.py
+"""
+Reproducible synthetic databases for the benchmarks.
+
+The schema comes from the real migrations. Submissions get a latent trait
+per axis, so scores spread like real ones rather than piling up at zero;
+most are complete and answer every scale question plus one text question,
+the rest stop part-way. Completed submissions get score snapshots computed
+the way logic/rescoring.py does (one matrix product per chunk), and the
+rollups, running totals and item statistics are built by their own rebuild
+functions at the end.
+
+The same (size, seed) always produces the same data.
+"""
+
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from logic.item_analysis import rebuild_item_statistics
+from logic.migrations import apply_migrations
+from logic.rescoring import score_matrix
+from logic.rollups import rebuild_rollups
+from logic.scoring import (LABEL_FIELDS, SAVE_SCORE_SNAPSHOT_SQL, SCORING_VERSION,
+                           categorize_scores)
+from logic.scoring_model import SCALE_QUESTIONS_PATH, load_scoring_model
+from logic.totals import rebuild_running_totals
+
+# Submissions generated and inserted per transaction
+BUILD_CHUNK_SIZE = 50000
+COMPLETE_SHARE = 0.85
+COHORTS = (None, "spring", "summer", "autumn", "winter", "staff")
+# Submission times are spread over this many days before BASE_TIME
+DAYS = 365
+BASE_TIME = np.datetime64("2025-01-01T00:00:00", "s")
+
+TEXT_QUESTION_IDS = ("Q31", "Q32", "Q33", "Q34")
+TEXT_WORDS = ("idea", "experiment", "team", "theory", "prototype", "sketch", "notes",
+              "feedback", "practice", "model", "story", "example", "reflection", "plan")
+
+# FTS and revision triggers fire per response and snapshot row; inserting those
+# before their submission rows leaves the revision triggers nothing to update.
+INSERT_RESPONSE_SQL = """
+    INSERT INTO submission_responses (submission_id, question_id, numeric_response, text_response,
+                                      response_time)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+INSERT_SUBMISSION_SQL = """
+    INSERT INTO submissions (submission_id, user_name, user_email, submission_time, is_complete,
+                             cohort, revision, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, 1, ?)
+"""
+
+# Snapshots go in before their submission rows, so the trigger that copies
+# submission_time onto them finds nothing; fill it in once everything is inserted
+FILL_SNAPSHOT_TIMES_SQL = """
+    UPDATE submission_scores SET submission_time = (
+        SELECT s.submission_time FROM submissions s
+        WHERE s.submission_id = submission_scores.submission_id)
+"""
+
+
+def _chunk(rng: np.random.Generator, start: int, count: int, model,
+           matrices: Dict[str, Any]) -> Dict[str, Any]:
+    """One chunk of submissions with their responses and score snapshots, as insert rows."""
+    item_ids = list(matrices["columns"])
+    axis = np.array([model.items[q][0] for q in item_ids])
+    sign = np.array([model.items[q][1] for q in item_ids])
+    lo, hi = model.scale_range["min"], model.scale_range["max"]
+    mid = (lo + hi) / 2
+
+    traits = rng.normal(size=(count, len(model.axes)))
+    noise = rng.normal(size=(count, len(item_ids)))
+    raw = np.clip(np.rint(mid + 1.2 * traits[:, axis] * sign + noise), lo, hi).astype(int)
+
+    complete = rng.random(count) < COMPLETE_SHARE
+    # Incomplete submissions answered the first `answered` questions
+    answered = np.where(complete, len(item_ids), rng.integers(0, len(item_ids), count))
+    times = BASE_TIME - rng.integers(0, DAYS * 86400, count).astype("timedelta64[s]")
+    stamps = [t.replace("T", " ") for t in np.datetime_as_string(times, unit="s")]
+    cohorts = rng.integers(0, len(COHORTS), count)
+    text_questions = rng.integers(0, len(TEXT_QUESTION_IDS), count)
+    words = rng.integers(0, len(TEXT_WORDS), (count, 6))
+
+    mask = (np.arange(len(item_ids)) < answered[:, None]).astype(np.int64)
+    scores = score_matrix(raw * mask, mask, matrices["weights"],
+                          matrices["offsets"])[:, list(model.stored_axes)].tolist()
+    labels = {}
+
+    submissions: List[tuple] = []
+    responses: List[tuple] = []
+    snapshots: List[tuple] = []
+    for i in range(count):
+        submission_id = str(uuid.UUID(bytes=rng.bytes(16), version=4))
+        stamp = stamps[i]
+        submissions.append((submission_id, f"User {start + i}", f"user{start + i}@example.com",
+                            stamp, int(complete[i]), COHORTS[cohorts[i]], stamp))
+        for j in range(answered[i]):
+            responses.append((submission_id, item_ids[j], int(raw[i, j]), None, stamp))
+        if complete[i]:
+            text = " ".join(TEXT_WORDS[w] for w in words[i])
+            responses.append((submission_id, TEXT_QUESTION_IDS[text_questions[i]], None, text, stamp))
+            pair = tuple(scores[i])
+            if pair not in labels:
+                labels[pair] = categorize_scores(*pair)
+            snapshots.append((submission_id, pair[0], pair[1],
+                              *(labels[pair][field] for field in LABEL_FIELDS), SCORING_VERSION,
+                              model.version))
+    return {"submissions": submissions, "responses": responses, "snapshots": snapshots}
+
+
+def _chunks(size: int, seed: int, model) -> Iterator[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    matrices = model.weight_matrix()
+    for start in range(0, size, BUILD_CHUNK_SIZE):
+        yield _chunk(rng, start, min(BUILD_CHUNK_SIZE, size - start), model, matrices)
+
+
+def build_database(path: str, size: int, seed: int = 0, progress=print) -> Dict[str, Any]:
+    """Create `path` with `size` synthetic submissions. Replaces an existing file."""
+    start = time.perf_counter()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    model = load_scoring_model(SCALE_QUESTIONS_PATH)
+    conn = sqlite3.connect(path)
+    try:
+        apply_migrations(conn)
+        conn.execute("PRAGMA synchronous = OFF")
+        done = 0
+        for chunk in _chunks(size, seed, model):
+            conn.executemany(INSERT_RESPONSE_SQL, chunk["responses"])
+            conn.executemany(SAVE_SCORE_SNAPSHOT_SQL, chunk["snapshots"])
+            conn.executemany(INSERT_SUBMISSION_SQL, chunk["submissions"])
+            conn.commit()
+            done += len(chunk["submissions"])
+            progress(f"  inserted {done}/{size} submissions")
+
+        conn.execute(FILL_SNAPSHOT_TIMES_SQL)
+        progress("  rebuilding rollups, running totals and item statistics")
+        rebuild_rollups(conn)
+        rebuild_running_totals(conn, model)
+        rebuild_item_statistics(conn, model)
+        conn.commit()
+        scored = conn.execute("SELECT COUNT(*) FROM submission_scores").fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        "submissions": size,
+        "seed": seed,
+        "scored": scored,
+        "build_seconds": time.perf_counter() - start
+    }
@@ -0,0 +1,103 @@
+# logic/creative_matrix.py
+"""
+Process-wide, indexed copy of data/creative_matrix.json.
+
+The file is parsed once and indexed by style id and by
+(style_id, strengthLevel, dimensionType, dimensionValue). Its mtime is checked
+at most once every MTIME_CHECK_INTERVAL seconds, so edits are picked up
+without a restart.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+MATRIX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "data", "creative_matrix.json")
+
+# Seconds between stat() calls on the matrix file
+MTIME_CHECK_INTERVAL = 1.0
+
+
+class CreativeMatrix:
+    """One parsed, indexed version of the matrix file. Treat as read-only."""
+
+    def __init__(self, data: Dict[str, Any], version: int):
+        self.data = data
+        # File mtime (ns) this copy was loaded from; changes whenever the file does
+        self.version = version
+
+        self.styles: Dict[str, Dict[str, Any]] = {}
+        self.preferences: Dict[Tuple[str, str, str, str], str] = {}
+        # (style_id, strengthLevel, dimensionType) -> description, last entry wins
+        self.preferences_by_strength: Dict[Tuple[str, str, str], str] = {}
+
+        for style in data["learningStyles"]:
+            style_id = style["id"]
+            self.styles[style_id] = style
+            for pref in style["preferences"]:
+                self.preferences[(style_id, pref["strengthLevel"],
+                                  pref["dimensionType"],
+                                  pref["dimensionValue"])] = pref["description"]
+                self.preferences_by_strength[(style_id, pref["strengthLevel"],
+                                              pref["dimensionType"])] = pref["description"]
+
+    def style(self, style_id: str) -> Optional[Dict[str, Any]]:
+        return self.styles.get(style_id)
+
+    def preference_description(self, style_id: str, strength_level: str,
+                               dimension_type: str, dimension_value: str) -> str:
+        return self.preferences.get(
+            (style_id, strength_level, dimension_type, dimension_value), "")
+
+
+class CreativeMatrixRepository:
+    """Loads the matrix file on first use and reloads it when its mtime changes."""
+
+    def __init__(self, path: str = MATRIX_PATH,
+                 check_interval: float = MTIME_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._matrix: Optional[CreativeMatrix] = None
+        self._next_check = 0.0
+        self.reloads = 0
+
+    def get(self) -> CreativeMatrix:
+        matrix = self._matrix
+        if matrix is not None and time.monotonic() < self._next_check:
+            return matrix
+
+        with self._lock:
+            now = time.monotonic()
+            if self._matrix is not None and now < self._next_check:
+                return self._matrix
+            self._next_check = now + self.check_interval
+
+            mtime = os.stat(self.path).st_mtime_ns
+            if self._matrix is None or mtime != self._matrix.version:
+                self._load(mtime)
+            return self._matrix
+
+    def _load(self, mtime: int) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._matrix = CreativeMatrix(data, mtime)
+            self.reloads += 1
+        except (OSError, ValueError, KeyError) as e:
+            # A half-written edit should not take results down: keep serving the
+            # previous copy and try again on the next check.
+            if self._matrix is None:
+                raise
+            print(f"Error reloading creative matrix, keeping previous version: {str(e)}")
+
+
+creative_matrix_repository = CreativeMatrixRepository()
+
+
+def get_creative_matrix() -> CreativeMatrix:
+    """The current indexed creative matrix."""
+    return creative_matrix_repository.get()
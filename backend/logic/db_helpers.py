@@ -1,10 +1,211 @@
 # logic/db_helpers.py
 
+import os
+import queue
 import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
-DATABASE_FILE = "../db/my_database.db"  # Use standardized location
+from logic.totals import apply_response_deltas, response_deltas
 
-def get_connection():
-    """Return a new DB connection. Caller should close() it."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    return conn
\ No newline at end of file
+DATABASE_FILE = os.environ.get("DATABASE_FILE", "../db/my_database.db")  # Use standardized location
+
+# Idle connections kept warm between requests; extra ones are opened on demand
+# under bursts and closed again when they are returned.
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = 5000
+
+# Applied once per physical connection, when it is first opened.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",      # ~20 MB page cache (negative = KiB)
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA foreign_keys = ON",
+)
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled sqlite3 connection.
+    close() hands the connection back to the pool instead of closing it,
+    so existing `conn = get_connection() ... conn.close()` code keeps working.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name: str) -> Any:
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+
+class ConnectionPool:
+    """
+    LIFO pool of pre-configured SQLite connections shared by all request threads.
+    Each connection is only ever used by one thread at a time.
+    """
+
+    def __init__(self, database: str, max_idle: int = POOL_SIZE):
+        self.database = database
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._opened = 0
+        self._in_use = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._latency_samples: deque = deque(maxlen=1024)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database,
+                               timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+            self._latency_samples.append(elapsed)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._latency_samples)
+            checkouts = self._checkouts
+            stats = {
+                "database": self.database,
+                "checkouts": checkouts,
+                "connections_opened": self._opened,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "max_idle": self._idle.maxsize,
+                "checkout_ms_avg": (self._latency_total / checkouts * 1000) if checkouts else 0.0,
+                "checkout_ms_max": self._latency_max * 1000,
+            }
+        for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            value = samples[min(len(samples) - 1, int(fraction * len(samples)))] if samples else 0.0
+            stats[f"checkout_ms_{label}"] = value * 1000
+        return stats
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_FILE)
+    return _pool
+
+
+def get_connection() -> PooledConnection:
+    """Return a pooled DB connection. Caller should close() it to return it to the pool."""
+    pool = get_pool()
+    return PooledConnection(pool, pool.acquire())
+
+
+# (submission_id, question_id, numeric_response, text_response)
+ResponseRow = Tuple[str, str, Optional[int], Optional[str]]
+
+# A changed answer replaces the earlier one (unique on submission_id, question_id)
+UPSERT_RESPONSE_SQL = """
+    INSERT INTO submission_responses (submission_id, question_id, numeric_response, text_response)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (submission_id, question_id) DO UPDATE SET
+        numeric_response = excluded.numeric_response,
+        text_response = excluded.text_response,
+        response_time = CURRENT_TIMESTAMP
+"""
+
+
+def save_responses(conn, rows: Iterable[ResponseRow], model=None) -> int:
+    """
+    Upsert response rows with a single executemany on the caller's connection.
+    The caller owns the transaction (db_connection() commits it).
+    With a compiled scoring model, the submissions' running totals are moved
+    by each answer's change in the same transaction (see logic/totals.py).
+    The old answers those changes start from must not be overwritten by
+    another writer before the upsert, so a transaction is opened with BEGIN
+    IMMEDIATE before reading them; a caller that has already opened one must
+    have used BEGIN IMMEDIATE too.
+    """
+    rows = list(rows)
+    if rows:
+        if model is not None and not conn.in_transaction:
+            # Take the write lock before the read, not at the first upsert
+            conn.execute("BEGIN IMMEDIATE")
+        deltas = response_deltas(conn, model, rows) if model is not None else None
+        conn.executemany(UPSERT_RESPONSE_SQL, rows)
+        if deltas:
+            apply_response_deltas(conn, model, deltas)
+    return len(rows)
+
+
+@contextmanager
+def db_connection() -> Iterator[PooledConnection]:
+    """
+    Check out a pooled connection for the duration of a with-block.
+    Commits on success, rolls back on error, and always returns the connection.
+    """
+    conn = get_connection()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Checkout counts and latency figures for the connection pool."""
+    return get_pool().stats()
@@ -0,0 +1,211 @@
+# logic/distribution.py
+"""
+Population score distribution for the admin analytics endpoint.
+
+Every stored score snapshot is kept in memory as columnar NumPy arrays
+(learning, application, day, cohort). The arrays are loaded from
+submission_scores once, then topped up incrementally: snapshots are read in
+rowid order and each refresh only fetches rows past the last rowid seen, so a
+completion costs one indexed range query on the next read, not a reload.
+
+Scores are integers, so histograms are exact bincounts on a one-point grid,
+coarsened to `bin_width` afterwards. The 2-D grid is indexed
+grid[application_bin][learning_bin], the x/y layout generate_plot uses.
+Results are cached per filter set until new snapshots arrive.
+
+Only snapshots of the current SCORING_VERSION and of the model version given
+to reset() (the app passes its scoring model's at startup) are counted, the
+same ones the listing and detail endpoints show. Re-scoring rewrites
+snapshots in place (same rowids), so it must call reset(); POST
+/api/admin/rescore does.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+from logic.result_table import DEFAULT_SCORE_BOUND
+from logic.results_cache import ResultsCache
+from logic.scoring import SCORING_VERSION
+
+FETCH_SIZE = 10000
+
+DISTRIBUTION_ROWS_SQL = """
+    SELECT sc.rowid, sc.learning_score, sc.application_score,
+           date(s.submission_time), s.cohort
+    FROM submission_scores sc
+    JOIN submissions s ON s.submission_id = sc.submission_id
+    WHERE sc.rowid > ? AND sc.scoring_version = ? AND sc.model_version = ?
+    ORDER BY sc.rowid
+"""
+
+# Day value for snapshots without a submission_time; excluded by any date filter
+NO_DAY = np.iinfo(np.int64).min
+NO_COHORT = -1
+
+QUADRANTS = ("intuitive", "conceptual", "pragmatic", "deductive")
+
+
+class DistributionError(ValueError):
+    """Raised for malformed filters; routes turn it into a 400."""
+
+
+def parse_day(value: Optional[str]) -> Optional[int]:
+    """'YYYY-MM-DD' (a longer timestamp is truncated) -> days since the epoch."""
+    if not value:
+        return None
+    try:
+        return int(np.datetime64(value[:10], "D").astype(np.int64))
+    except ValueError:
+        raise DistributionError(f"Invalid date: {value}")
+
+
+class ScoreDistribution:
+
+    def __init__(self, cache_size: int = 256, model_version: Optional[str] = None):
+        self.model_version = model_version
+        self._lock = threading.Lock()
+        self._cache = ResultsCache(maxsize=cache_size)
+        self._generation = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self._learning = np.empty(0, dtype=np.int64)
+        self._application = np.empty(0, dtype=np.int64)
+        self._day = np.empty(0, dtype=np.int64)
+        self._cohort = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._last_rowid = 0
+        self._cohorts: Dict[str, int] = {}
+        # Part of every cache key, so results from before a reset are never served
+        self._generation += 1
+
+    def reset(self, model_version: Optional[str] = None) -> None:
+        """
+        Forget everything (optionally switching to another scoring model's
+        snapshots); the next read reloads from the database.
+        """
+        with self._lock:
+            if model_version is not None:
+                self.model_version = model_version
+            self._clear()
+        self._cache.clear()
+
+    def refresh(self) -> Tuple[int, int]:
+        """Append snapshots stored since the last refresh. Returns (generation, row count)."""
+        with self._lock:
+            with db_connection() as conn:
+                cur = conn.execute(DISTRIBUTION_ROWS_SQL, (self._last_rowid, SCORING_VERSION,
+                                                           self.model_version))
+                while True:
+                    batch = cur.fetchmany(FETCH_SIZE)
+                    if not batch:
+                        break
+                    self._append(batch)
+            return self._generation, self._size
+
+    def _append(self, rows) -> None:
+        n = len(rows)
+        needed = self._size + n
+        if needed > len(self._learning):
+            capacity = max(needed, 2 * len(self._learning), 1024)
+            for name in ("_learning", "_application", "_day", "_cohort"):
+                grown = np.empty(capacity, dtype=np.int64)
+                grown[:self._size] = getattr(self, name)[:self._size]
+                setattr(self, name, grown)
+
+        end = self._size + n
+        self._learning[self._size:end] = [row[1] for row in rows]
+        self._application[self._size:end] = [row[2] for row in rows]
+        days = np.array([row[3] for row in rows], dtype="datetime64[D]")
+        self._day[self._size:end] = np.where(np.isnat(days), NO_DAY, days.astype(np.int64))
+        self._cohort[self._size:end] = [
+            NO_COHORT if row[4] is None else self._cohorts.setdefault(row[4], len(self._cohorts))
+            for row in rows]
+        self._size = end
+        self._last_rowid = rows[-1][0]
+
+    def compute(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                cohort: Optional[str] = None, bin_width: int = 1) -> Dict[str, Any]:
+        """Histograms, density grid and quadrant shares for the filtered population."""
+        day_from, day_to = parse_day(date_from), parse_day(date_to)
+        if bin_width < 1:
+            raise DistributionError("bin_width must be at least 1")
+
+        generation, size = self.refresh()
+        key = (generation, size, day_from, day_to, cohort, bin_width)
+        return self._cache.get_or_compute(
+            key, lambda: self._compute(size, day_from, day_to, cohort, bin_width))
+
+    def _compute(self, size: int, day_from: Optional[int], day_to: Optional[int],
+                 cohort: Optional[str], bin_width: int) -> Dict[str, Any]:
+        with self._lock:
+            # Slices of the current arrays; later appends never touch rows < size
+            size = min(size, self._size)
+            learning = self._learning[:size]
+            application = self._application[:size]
+            day = self._day[:size]
+            cohort_codes = self._cohort[:size]
+            cohort_code = self._cohorts.get(cohort) if cohort else None
+
+        mask = np.ones(size, dtype=bool)
+        if day_from is not None:
+            mask &= day >= day_from
+        if day_to is not None:
+            mask &= (day <= day_to) & (day != NO_DAY)
+        if cohort:
+            # An unknown cohort matches nothing
+            mask &= cohort_codes == (cohort_code if cohort_code is not None else -2)
+        learning, application = learning[mask], application[mask]
+        count = len(learning)
+
+        bound = DEFAULT_SCORE_BOUND
+        if count:
+            bound = max(bound, int(np.abs(learning).max()), int(np.abs(application).max()))
+        points = 2 * bound + 1
+
+        # Exact counts per integer score pair, then merged into bin_width-wide bins
+        flat = np.bincount((application + bound) * points + (learning + bound),
+                           minlength=points * points)
+        grid = _coarsen(flat.reshape(points, points), bin_width)
+
+        if count:
+            quadrant_counts = {
+                "intuitive": int(np.count_nonzero((learning >= 0) & (application >= 0))),
+                "conceptual": int(np.count_nonzero((learning < 0) & (application >= 0))),
+                "pragmatic": int(np.count_nonzero((learning < 0) & (application < 0))),
+                "deductive": int(np.count_nonzero((learning >= 0) & (application < 0))),
+            }
+            mean = {"learning_score": float(learning.mean()),
+                    "application_score": float(application.mean())}
+        else:
+            quadrant_counts = dict.fromkeys(QUADRANTS, 0)
+            mean = {"learning_score": None, "application_score": None}
+
+        return {
+            "count": count,
+            "bin_width": bin_width,
+            # Bin k covers scores in [bin_edges[k], bin_edges[k + 1])
+            "bin_edges": [-bound + k * bin_width for k in range(grid.shape[0] + 1)],
+            "application_histogram": grid.sum(axis=1).tolist(),
+            "learning_histogram": grid.sum(axis=0).tolist(),
+            "grid": grid.tolist(),
+            "quadrants": {
+                style: {"count": n, "share": (n / count) if count else 0.0}
+                for style, n in quadrant_counts.items()
+            },
+            "mean": mean
+        }
+
+
+def _coarsen(grid: np.ndarray, bin_width: int) -> np.ndarray:
+    """Sum a square grid into bin_width x bin_width blocks (the last block may be partial)."""
+    if bin_width == 1:
+        return grid
+    starts = np.arange(0, grid.shape[0], bin_width)
+    return np.add.reduceat(np.add.reduceat(grid, starts, axis=0), starts, axis=1)
+
+
+score_distribution = ScoreDistribution()
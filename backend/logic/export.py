@@ -0,0 +1,141 @@
+# logic/export.py
+"""
+Streaming export of submissions, one wide row per submission:
+
+    submission_id, user_name, ..., Q1..Q34, learning_score, ..., overall_style
+
+Submissions are read in keyset-paginated chunks of EXPORT_CHUNK_SIZE, each on
+its own short-lived connection, and the connection is handed back before the
+chunk is yielded. A slow client therefore never holds a read transaction open
+for the whole export, and memory stays bounded by one chunk. Score columns
+come from the stored snapshot when it is current (see score_snapshot_from_row)
+and are empty otherwise.
+"""
+
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from logic.db_helpers import db_connection
+from logic.scoring import SCORING_VERSION
+from logic.submission_queries import batch_responses_query
+
+# Submissions per read transaction
+EXPORT_CHUNK_SIZE = 500
+# Response rows pulled from the cursor at a time
+FETCH_SIZE = 1000
+
+SUBMISSION_COLUMNS = ["submission_id", "user_name", "user_email", "submission_time",
+                      "is_complete"]
+SCORE_COLUMNS = ["learning_score", "application_score", "learning_direction",
+                 "learning_strength", "application_direction", "application_strength",
+                 "overall_style"]
+
+EXPORT_CHUNK_SQL = """
+    SELECT s.submission_id, s.user_name, s.user_email, s.submission_time, s.is_complete,
+           sc.learning_score, sc.application_score, sc.learning_direction,
+           sc.learning_strength, sc.application_direction, sc.application_strength,
+           sc.overall_style
+    FROM submissions s
+    LEFT JOIN submission_scores sc ON sc.submission_id = s.submission_id
+        AND sc.scoring_version = ? AND sc.model_version = ?
+"""
+
+
+def export_columns(question_ids: Sequence[str]) -> List[str]:
+    return SUBMISSION_COLUMNS + list(question_ids) + SCORE_COLUMNS
+
+
+def export_chunk_query(model_version: str, status: Optional[int] = None,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       after: Optional[Sequence[Any]] = None,
+                       chunk_size: int = EXPORT_CHUNK_SIZE) -> Tuple[str, List[Any]]:
+    """The next chunk of submissions after the (submission_time, submission_id) pair `after`."""
+    where_clauses = []
+    params: List[Any] = [SCORING_VERSION, model_version]
+    if status is not None:
+        where_clauses.append("s.is_complete = ?")
+        params.append(status)
+    if date_from:
+        where_clauses.append("s.submission_time >= ?")
+        params.append(date_from)
+    if date_to:
+        where_clauses.append("s.submission_time <= ?")
+        params.append(date_to)
+
+    if after is not None:
+        where_clauses.append("(s.submission_time, s.submission_id) > (?, ?)")
+        params.extend(after)
+    query = EXPORT_CHUNK_SQL
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    query += " ORDER BY s.submission_time, s.submission_id LIMIT ?"
+    params.append(chunk_size)
+    return query, params
+
+
+def iter_export_rows(question_ids: Sequence[str], model_version: str,
+                     status: Optional[int] = None,
+                     date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield one dict per submission, oldest first, with its answers pivoted into columns."""
+    after = None
+    while True:
+        query, params = export_chunk_query(model_version, status, date_from, date_to, after,
+                                           chunk_size)
+        with db_connection() as conn:
+            heads = conn.execute(query, params).fetchall()
+            if not heads:
+                return
+            answers = _fetch_answers(conn, [head[0] for head in heads])
+
+        for head in heads:
+            row = dict(zip(SUBMISSION_COLUMNS, head[:5]))
+            row["is_complete"] = bool(row["is_complete"])
+            submission_answers = answers.get(head[0], {})
+            for question_id in question_ids:
+                row[question_id] = submission_answers.get(question_id)
+            row.update(zip(SCORE_COLUMNS, head[5:]))
+            yield row
+
+        if len(heads) < chunk_size:
+            return
+        after = [heads[-1][3], heads[-1][0]]
+
+
+def _fetch_answers(conn, submission_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """submission_id -> {question_id: numeric or text answer} for one chunk."""
+    cur = conn.execute(*batch_responses_query(submission_ids))
+
+    answers: Dict[str, Dict[str, Any]] = {}
+    while True:
+        batch = cur.fetchmany(FETCH_SIZE)
+        if not batch:
+            return answers
+        for submission_id, question_id, numeric_response, text_response in batch:
+            value = numeric_response if numeric_response is not None else text_response
+            answers.setdefault(submission_id, {})[question_id] = value
+
+
+def csv_stream(columns: List[str], rows: Iterator[Dict[str, Any]],
+               rows_per_chunk: int = 100) -> Iterator[str]:
+    """Encode rows as CSV text, yielding every `rows_per_chunk` rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def ndjson_stream(rows: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
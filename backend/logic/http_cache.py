@@ -0,0 +1,83 @@
+# logic/http_cache.py
+"""
+Validators for conditional GETs (ETag / Last-Modified).
+
+Every write that can change what a submission's endpoints return (responses,
+completion, score snapshots) bumps submissions.revision and updated_at via
+triggers (migration 11), so a validator costs one primary-key lookup.
+Handlers check it before doing any scoring or serialisation and answer 304
+when the client's copy is current. /api/results also folds in the generation
+of the population percentile index, which is just as cheap to read.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from flask import current_app, request
+
+from logic.db_helpers import db_connection
+
+SUBMISSION_REVISION_SQL = """
+    SELECT revision, COALESCE(updated_at, submission_time), is_complete, cohort
+    FROM submissions
+    WHERE submission_id = ?
+"""
+
+
+def content_hash(data: bytes, length: int = 16) -> str:
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def parse_db_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """SQLite CURRENT_TIMESTAMP text ('YYYY-MM-DD HH:MM:SS', UTC) -> aware datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def load_submission_revision(submission_id: str, conn=None) -> Optional[Dict[str, Any]]:
+    """The submission's revision, last-modified time, completion flag and cohort, or None."""
+    if conn is None:
+        with db_connection() as own_conn:
+            return load_submission_revision(submission_id, own_conn)
+
+    row = conn.execute(SUBMISSION_REVISION_SQL, (submission_id,)).fetchone()
+    if row is None:
+        return None
+    return {
+        "revision": row[0],
+        "last_modified": parse_db_timestamp(row[1]),
+        "is_complete": bool(row[2]),
+        "cohort": row[3]
+    }
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True when the request's If-None-Match (or, failing that, If-Modified-Since) still holds."""
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def set_validators(response, etag: str, last_modified: Optional[datetime] = None,
+                   cache_control: Optional[str] = None):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None,
+                 cache_control: Optional[str] = None):
+    """An empty 304 carrying the same validators as the full response."""
+    return set_validators(current_app.response_class(status=304), etag, last_modified,
+                          cache_control)
@@ -0,0 +1,275 @@
+# logic/item_analysis.py
+"""
+Psychometric item analysis for the scale questions: Cronbach's alpha per
+category, item means and variances, item-rest correlations and alpha if the
+item is deleted.
+
+Instead of loading every response, item_statistics keeps streaming
+sufficient statistics for each pair of items in the same category (the
+diagonal pair (i, i) holds the item's own sums):
+
+    n        completed submissions that answered both items
+    sum_a    sum of item_a's keyed value over those submissions
+    sum_b    sum of item_b's keyed value
+    sum_ab   sum of the products
+
+Keyed values are the scoring model's contributions (sign * raw + offset), so
+reverse items are already reversed. The pairwise covariance matrix, and from
+it every statistic, is then O(items^2) per category however many submissions
+there are. Missing answers are handled by pairwise deletion.
+
+complete_submission adds a submission once, on its first completion. Rows
+carry the scoring model version and are only read for the current model;
+answers edited after completion and a changed question bank need a rebuild,
+which migration 13 and re-scoring do, or by hand:
+
+    python -m logic.item_analysis --rebuild
+"""
+
+import argparse
+import math
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from logic.db_helpers import DATABASE_FILE, db_connection
+from logic.scoring import fetch_numeric_responses
+from logic.scoring_model import SCALE_QUESTIONS_PATH, ScoringModel, load_scoring_model
+
+FETCH_SIZE = 10000
+# Submissions packed into one matrix during a rebuild
+CHUNK_SIZE = 5000
+
+UPSERT_ITEM_STATISTICS_SQL = """
+    INSERT INTO item_statistics (category, item_a, item_b, n, sum_a, sum_b, sum_ab, model_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (category, item_a, item_b) DO UPDATE SET
+        n = n + excluded.n,
+        sum_a = sum_a + excluded.sum_a,
+        sum_b = sum_b + excluded.sum_b,
+        sum_ab = sum_ab + excluded.sum_ab
+    WHERE item_statistics.model_version = excluded.model_version
+"""
+
+ITEM_STATISTICS_SQL = """
+    SELECT category, item_a, item_b, n, sum_a, sum_b, sum_ab, model_version
+    FROM item_statistics
+"""
+
+# Answers of completed submissions, grouped by submission (in index order)
+ITEM_RESPONSES_SQL = """
+    SELECT s.submission_id, r.question_id, r.numeric_response
+    FROM submissions s
+    JOIN submission_responses r ON r.submission_id = s.submission_id
+    WHERE s.is_complete = 1 AND r.numeric_response IS NOT NULL
+    ORDER BY s.submission_time, s.submission_id
+"""
+
+
+def _pair_rows(model: ScoringModel, values: Dict[str, Any]) -> List[tuple]:
+    """Upsert rows adding one submission's keyed values {question_id: value}."""
+    order = {question_id: i for i, question_id in enumerate(model.items)}
+    answered = sorted(values, key=order.__getitem__)
+    rows = []
+    for i, item_a in enumerate(answered):
+        category = model.axes[model.items[item_a][0]]
+        for item_b in answered[i:]:
+            if model.items[item_b][0] == model.items[item_a][0]:
+                va, vb = values[item_a], values[item_b]
+                rows.append((category, item_a, item_b, 1, va, vb, va * vb, model.version))
+    return rows
+
+
+def record_item_responses(conn, submission_id: str, model: ScoringModel) -> int:
+    """
+    Add a newly completed submission's answers to item_statistics. Call it
+    only on the first completion, or the submission is counted twice.
+    """
+    values = {}
+    for question_id, raw in fetch_numeric_responses(conn, submission_id).items():
+        item = model.items.get(question_id)
+        if item is not None:
+            _axis, sign, offset = item
+            values[question_id] = sign * raw + offset
+    rows = _pair_rows(model, values)
+    if rows:
+        conn.executemany(UPSERT_ITEM_STATISTICS_SQL, rows)
+    return len(rows)
+
+
+def rebuild_item_statistics(conn, model: ScoringModel, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Recompute item_statistics from every completed submission with one NumPy
+    pass over the (submissions x questions) response matrix, a chunk at a
+    time. For keyed values X and answered mask M, per chunk:
+
+        n += M.T @ M     sum_a += X.T @ M     sum_ab += X.T @ X
+
+    Runs on the caller's connection. Returns the number of rows written.
+    """
+    matrices = model.weight_matrix()
+    columns = matrices["columns"]
+    # Keyed value per column: raw * sign + offset
+    signs = matrices["weights"].sum(axis=1)
+    offsets = matrices["offsets"].sum(axis=1)
+    dtype = offsets.dtype
+    k = len(columns)
+
+    n = np.zeros((k, k), dtype=np.int64)
+    sums = np.zeros((k, k), dtype=dtype)
+    products = np.zeros((k, k), dtype=dtype)
+    raw = np.zeros((chunk_size, k), dtype=dtype)
+    answered = np.zeros((chunk_size, k), dtype=np.int64)
+    filled = 0
+    last_id = None
+
+    def flush() -> None:
+        nonlocal filled
+        mask = answered[:filled]
+        values = (raw[:filled] * signs + offsets) * mask
+        n[:] += mask.T @ mask
+        sums[:] += values.T @ mask
+        products[:] += values.T @ values
+        raw[:filled] = 0
+        answered[:filled] = 0
+        filled = 0
+
+    cur = conn.execute(ITEM_RESPONSES_SQL)
+    while True:
+        batch = cur.fetchmany(FETCH_SIZE)
+        if not batch:
+            break
+        for submission_id, question_id, numeric_response in batch:
+            col = columns.get(question_id)
+            if col is None:
+                continue
+            if submission_id != last_id:
+                if filled == chunk_size:
+                    flush()
+                filled += 1
+                last_id = submission_id
+            raw[filled - 1, col] = numeric_response
+            answered[filled - 1, col] = 1
+    if filled:
+        flush()
+
+    item_ids = list(columns)
+    rows = []
+    for i, item_a in enumerate(item_ids):
+        axis = model.items[item_a][0]
+        for j in range(i, k):
+            if model.items[item_ids[j]][0] == axis and n[i, j]:
+                rows.append((model.axes[axis], item_a, item_ids[j], int(n[i, j]),
+                             sums[i, j].item(), sums[j, i].item(), products[i, j].item(),
+                             model.version))
+
+    conn.execute("DELETE FROM item_statistics")
+    conn.executemany(UPSERT_ITEM_STATISTICS_SQL, rows)
+    return len(rows)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if value is None or math.isnan(value) else float(value)
+
+
+def _category_report(model: ScoringModel, category: str, items: List[str],
+                     stats: Dict[tuple, tuple]) -> Dict[str, Any]:
+    k = len(items)
+    n = np.zeros((k, k))
+    cov = np.full((k, k), np.nan)
+    means = np.full(k, np.nan)
+    for i, item_a in enumerate(items):
+        for j in range(i, k):
+            row = stats.get((item_a, items[j]))
+            if row is None:
+                continue
+            count, sum_a, sum_b, sum_ab = row
+            n[i, j] = n[j, i] = count
+            if count > 1:
+                cov[i, j] = cov[j, i] = (sum_ab - sum_a * sum_b / count) / (count - 1)
+            if i == j and count:
+                means[i] = sum_a / count
+
+    variances = np.diag(cov)
+    complete = k > 1 and not np.isnan(cov).any()
+    total = cov.sum() if complete else np.nan
+    trace = variances.sum() if complete else np.nan
+    alpha = k / (k - 1) * (1 - trace / total) if complete and total > 0 else np.nan
+
+    report_items = []
+    for i, question_id in enumerate(items):
+        _axis, sign, offset = model.items[question_id]
+        correlation = alpha_if_deleted = np.nan
+        if complete:
+            # Covariance with, and variance of, the sum of the other items
+            rest_cov = cov[i].sum() - variances[i]
+            rest_var = total - 2 * cov[i].sum() + variances[i]
+            if variances[i] > 0 and rest_var > 0:
+                correlation = rest_cov / math.sqrt(variances[i] * rest_var)
+            if k > 2 and rest_var > 0:
+                alpha_if_deleted = (k - 1) / (k - 2) * (1 - (trace - variances[i]) / rest_var)
+        report_items.append({
+            "question_id": question_id,
+            "reverse": sign < 0,
+            "n": int(n[i, i]),
+            # On the answer scale, before reverse keying
+            "mean": _optional(sign * (means[i] - offset)),
+            "variance": _optional(variances[i]),
+            "item_rest_correlation": _optional(correlation),
+            "alpha_if_deleted": _optional(alpha_if_deleted)
+        })
+
+    return {
+        "category": category,
+        "items": report_items,
+        "respondents": int(n.diagonal().max()) if k else 0,
+        "alpha": _optional(alpha)
+    }
+
+
+def item_analysis(conn, model: ScoringModel) -> Dict[str, Any]:
+    """Reliability report per category from item_statistics, for the given model."""
+    stats: Dict[tuple, tuple] = {}
+    stale = 0
+    for category, item_a, item_b, n, sum_a, sum_b, sum_ab, version in conn.execute(ITEM_STATISTICS_SQL):
+        if version != model.version:
+            stale += 1
+            continue
+        stats[(item_a, item_b)] = (n, sum_a, sum_b, sum_ab)
+
+    categories = []
+    for axis, category in enumerate(model.axes):
+        items = [question_id for question_id, item in model.items.items() if item[0] == axis]
+        categories.append(_category_report(model, category, items, stats))
+
+    return {
+        "model_version": model.version,
+        # Rows kept for another model version; rebuild to include them
+        "stale_rows": stale,
+        "categories": categories
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain item analysis statistics.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="regenerate item_statistics from completed submissions")
+    args = parser.parse_args(argv)
+
+    if not args.rebuild:
+        parser.print_help()
+        return 1
+
+    model = load_scoring_model(SCALE_QUESTIONS_PATH)
+    print(f"Database: {DATABASE_FILE}")
+    print(f"Scoring model: {model.version}")
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        count = rebuild_item_statistics(conn, model)
+    print(f"Rebuilt item statistics: {count} item pair rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,435 @@
+# logic/migrations.py
+"""
+Versioned schema migrations.
+
+Each migration runs once, in order, inside its own transaction and is recorded
+in the schema_version table. They are applied on app startup and can also be
+run by hand from the backend directory:
+
+    python -m logic.migrations            # apply pending migrations
+    python -m logic.migrations --status   # list applied / pending versions
+    python -m logic.migrations --explain  # check query plans for scans and page sorts
+"""
+
+import argparse
+import sqlite3
+import sys
+from typing import Callable, List, NamedTuple, Optional, Union
+
+from logic.db_helpers import DATABASE_FILE, get_connection
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    # Either a SQL script or a callable that receives the open connection
+    apply: Union[str, Callable[[sqlite3.Connection], None]]
+
+
+# Migrations that need Python (run inside the migration's transaction)
+
+
+def _create_rollups(conn) -> None:
+    from logic.rollups import rebuild_rollups
+
+    for statement in _split_statements("""
+        CREATE TABLE IF NOT EXISTS daily_rollups (
+            day TEXT PRIMARY KEY,
+            started INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            scored INTEGER NOT NULL DEFAULT 0,
+            learning_score_sum INTEGER NOT NULL DEFAULT 0,
+            application_score_sum INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS style_rollups (
+            day TEXT NOT NULL,
+            overall_style TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            learning_score_sum INTEGER NOT NULL DEFAULT 0,
+            application_score_sum INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, overall_style)
+        );
+    """):
+        conn.execute(statement)
+    rebuild_rollups(conn)
+
+
+
+def _create_running_totals(conn) -> None:
+    from logic.scoring_model import SCALE_QUESTIONS_PATH, load_scoring_model
+    from logic.totals import rebuild_running_totals
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS submission_totals (
+            submission_id TEXT PRIMARY KEY,
+            learning_score INTEGER NOT NULL DEFAULT 0,
+            application_score INTEGER NOT NULL DEFAULT 0,
+            answered INTEGER NOT NULL DEFAULT 0,
+            model_version TEXT NOT NULL,
+            FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
+        )
+    """)
+    rebuild_running_totals(conn, load_scoring_model(SCALE_QUESTIONS_PATH))
+
+
+def _create_item_statistics(conn) -> None:
+    from logic.item_analysis import rebuild_item_statistics
+    from logic.scoring_model import SCALE_QUESTIONS_PATH, load_scoring_model
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS item_statistics (
+            category TEXT NOT NULL,
+            item_a TEXT NOT NULL,
+            item_b TEXT NOT NULL,
+            n INTEGER NOT NULL DEFAULT 0,
+            sum_a INTEGER NOT NULL DEFAULT 0,
+            sum_b INTEGER NOT NULL DEFAULT 0,
+            sum_ab INTEGER NOT NULL DEFAULT 0,
+            model_version TEXT NOT NULL,
+            PRIMARY KEY (category, item_a, item_b)
+        )
+    """)
+    rebuild_item_statistics(conn, load_scoring_model(SCALE_QUESTIONS_PATH))
+
+
+def _backfill_score_snapshots(conn) -> None:
+    # Snapshots were only written on completion from migration 4 on, and
+    # migration 14 left every older one without a model version; score all
+    # completed submissions with the current model and recount the rollups.
+    from logic.rescoring import rescore_chunk
+    from logic.rollups import rebuild_rollups
+    from logic.scoring_model import SCALE_QUESTIONS_PATH, load_scoring_model
+
+    model = load_scoring_model(SCALE_QUESTIONS_PATH)
+    matrices = model.weight_matrix()
+    after = ""
+    while after is not None:
+        _, after = rescore_chunk(conn, model, after, matrices=matrices)
+    rebuild_rollups(conn)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create submissions and submission_responses tables", """
+        CREATE TABLE IF NOT EXISTS submissions (
+            submission_id TEXT PRIMARY KEY,
+            user_name TEXT,
+            user_email TEXT,
+            submission_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            is_complete INTEGER DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS submission_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            submission_id TEXT,
+            question_id TEXT,
+            numeric_response INTEGER,
+            text_response TEXT,
+            response_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
+        );
+    """),
+    Migration(2, "Index responses by submission and submissions by time", """
+        CREATE INDEX IF NOT EXISTS idx_submission_responses_submission_question
+            ON submission_responses (submission_id, question_id);
+        CREATE INDEX IF NOT EXISTS idx_submissions_time
+            ON submissions (submission_time);
+        CREATE INDEX IF NOT EXISTS idx_submissions_complete_time
+            ON submissions (is_complete, submission_time);
+    """),
+    Migration(3, "Deduplicate responses and make (submission_id, question_id) unique", """
+        DELETE FROM submission_responses
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY submission_id, question_id
+                    ORDER BY response_time DESC, id DESC
+                ) AS rn
+                FROM submission_responses
+            )
+            WHERE rn = 1
+        );
+        DROP INDEX IF EXISTS idx_submission_responses_submission_question;
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_submission_responses_submission_question
+            ON submission_responses (submission_id, question_id);
+    """),
+    Migration(4, "Add submission_scores snapshot table", """
+        CREATE TABLE IF NOT EXISTS submission_scores (
+            submission_id TEXT PRIMARY KEY,
+            learning_score INTEGER NOT NULL,
+            application_score INTEGER NOT NULL,
+            learning_direction TEXT,
+            learning_strength TEXT,
+            application_direction TEXT,
+            application_strength TEXT,
+            overall_style TEXT,
+            scoring_version TEXT NOT NULL,
+            computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
+        );
+    """),
+    Migration(5, "Index submissions for keyset pagination on (submission_time, submission_id)", """
+        DROP INDEX IF EXISTS idx_submissions_time;
+        DROP INDEX IF EXISTS idx_submissions_complete_time;
+        CREATE INDEX IF NOT EXISTS idx_submissions_time_id
+            ON submissions (submission_time, submission_id);
+        CREATE INDEX IF NOT EXISTS idx_submissions_complete_time_id
+            ON submissions (is_complete, submission_time, submission_id);
+    """),
+    Migration(6, "Index submission_scores by overall_style", """
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_style
+            ON submission_scores (overall_style);
+    """),
+    Migration(7, "Add daily and per-style analytics rollups", _create_rollups),
+    Migration(8, "Add FTS5 index over text responses", """
+        CREATE VIRTUAL TABLE IF NOT EXISTS response_text_fts USING fts5(
+            text_response,
+            content = 'submission_responses',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_responses_fts_insert
+        AFTER INSERT ON submission_responses
+        WHEN new.text_response IS NOT NULL
+        BEGIN
+            INSERT INTO response_text_fts (rowid, text_response)
+            VALUES (new.id, new.text_response);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_responses_fts_delete
+        AFTER DELETE ON submission_responses
+        WHEN old.text_response IS NOT NULL
+        BEGIN
+            INSERT INTO response_text_fts (response_text_fts, rowid, text_response)
+            VALUES ('delete', old.id, old.text_response);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_responses_fts_update
+        AFTER UPDATE OF text_response ON submission_responses
+        BEGIN
+            INSERT INTO response_text_fts (response_text_fts, rowid, text_response)
+            SELECT 'delete', old.id, old.text_response WHERE old.text_response IS NOT NULL;
+            INSERT INTO response_text_fts (rowid, text_response)
+            SELECT new.id, new.text_response WHERE new.text_response IS NOT NULL;
+        END;
+        INSERT INTO response_text_fts (rowid, text_response)
+        SELECT id, text_response FROM submission_responses
+        WHERE text_response IS NOT NULL;
+    """),
+    Migration(9, "Index submission_scores for score-range filters and score sorting", """
+        DROP INDEX IF EXISTS idx_submission_scores_style;
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_learning
+            ON submission_scores (learning_score, submission_id);
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_application
+            ON submission_scores (application_score, submission_id);
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_style_learning
+            ON submission_scores (overall_style, learning_score, submission_id);
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_style_application
+            ON submission_scores (overall_style, application_score, submission_id);
+    """),
+    Migration(10, "Add optional cohort label to submissions", """
+        ALTER TABLE submissions ADD COLUMN cohort TEXT;
+    """),
+    Migration(11, "Track a per-submission revision for HTTP validators", """
+        ALTER TABLE submissions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE submissions ADD COLUMN updated_at DATETIME;
+        UPDATE submissions SET updated_at = NULLIF(max(
+            COALESCE(submission_time, ''),
+            COALESCE((SELECT MAX(response_time) FROM submission_responses r
+                      WHERE r.submission_id = submissions.submission_id), ''),
+            COALESCE((SELECT computed_at FROM submission_scores sc
+                      WHERE sc.submission_id = submissions.submission_id), '')
+        ), '');
+        CREATE TRIGGER IF NOT EXISTS trg_responses_revision_insert
+        AFTER INSERT ON submission_responses
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_responses_revision_update
+        AFTER UPDATE ON submission_responses
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_responses_revision_delete
+        AFTER DELETE ON submission_responses
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = old.submission_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_submissions_revision_complete
+        AFTER UPDATE OF is_complete ON submissions
+        WHEN old.is_complete IS NOT new.is_complete
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_scores_revision_insert
+        AFTER INSERT ON submission_scores
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_scores_revision_update
+        AFTER UPDATE ON submission_scores
+        WHEN old.learning_score IS NOT new.learning_score
+          OR old.application_score IS NOT new.application_score
+          OR old.overall_style IS NOT new.overall_style
+          OR old.scoring_version IS NOT new.scoring_version
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+    """),
+    Migration(12, "Add running per-submission score totals", _create_running_totals),
+    Migration(13, "Add item analysis sufficient statistics", _create_item_statistics),
+    Migration(14, "Record the scoring model version on score snapshots", """
+        ALTER TABLE submission_scores ADD COLUMN model_version TEXT;
+        DROP TRIGGER IF EXISTS trg_scores_revision_update;
+        CREATE TRIGGER IF NOT EXISTS trg_scores_revision_update
+        AFTER UPDATE ON submission_scores
+        WHEN old.learning_score IS NOT new.learning_score
+          OR old.application_score IS NOT new.application_score
+          OR old.overall_style IS NOT new.overall_style
+          OR old.scoring_version IS NOT new.scoring_version
+          OR old.model_version IS NOT new.model_version
+        BEGIN
+            UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE submission_id = new.submission_id;
+        END;
+    """),
+    Migration(15, "Backfill score snapshots for completed submissions", _backfill_score_snapshots),
+    Migration(16, "Copy submission_time onto score snapshots for time-sorted score listings", """
+        ALTER TABLE submission_scores ADD COLUMN submission_time DATETIME;
+        UPDATE submission_scores SET submission_time = (
+            SELECT s.submission_time FROM submissions s
+            WHERE s.submission_id = submission_scores.submission_id);
+        CREATE TRIGGER IF NOT EXISTS trg_scores_submission_time
+        AFTER INSERT ON submission_scores
+        BEGIN
+            UPDATE submission_scores SET submission_time = (
+                SELECT s.submission_time FROM submissions s
+                WHERE s.submission_id = new.submission_id)
+            WHERE submission_id = new.submission_id;
+        END;
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_time
+            ON submission_scores (submission_time, submission_id);
+        CREATE INDEX IF NOT EXISTS idx_submission_scores_style_time
+            ON submission_scores (overall_style, submission_time, submission_id);
+    """),
+]
+
+
+def _ensure_version_table(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+def _split_statements(script: str) -> List[str]:
+    """Split a SQL script into complete statements (trigger bodies stay intact)."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def applied_versions(conn) -> List[int]:
+    _ensure_version_table(conn)
+    rows = conn.execute("SELECT version FROM schema_version ORDER BY version").fetchall()
+    return [row[0] for row in rows]
+
+
+def apply_migrations(conn=None, target: Optional[int] = None) -> List[int]:
+    """
+    Apply every pending migration (up to `target`, if given).
+    Returns the versions that were applied by this call.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+
+    applied = []
+    try:
+        _ensure_version_table(conn)
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            if target is not None and migration.version > target:
+                break
+
+            # IMMEDIATE takes the write lock up front, so concurrent workers
+            # starting together cannot both apply the same version.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                already = conn.execute(
+                    "SELECT 1 FROM schema_version WHERE version = ?",
+                    (migration.version,)).fetchone()
+                if already:
+                    conn.rollback()
+                    continue
+
+                if callable(migration.apply):
+                    migration.apply(conn)
+                else:
+                    for statement in _split_statements(migration.apply):
+                        conn.execute(statement)
+
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (migration.version, migration.description))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            print(f"Applied migration {migration.version}: {migration.description}")
+            applied.append(migration.version)
+    finally:
+        if own_conn:
+            conn.close()
+
+    return applied
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the SQLite schema.")
+    parser.add_argument("--status", action="store_true",
+                        help="show applied and pending migrations without applying")
+    parser.add_argument("--target", type=int,
+                        help="only apply migrations up to this version")
+    parser.add_argument("--explain", action="store_true",
+                        help="run EXPLAIN QUERY PLAN over the app's queries")
+    args = parser.parse_args(argv)
+
+    print(f"Database: {DATABASE_FILE}")
+    conn = get_connection()
+    try:
+        if args.status:
+            done = set(applied_versions(conn))
+            for migration in MIGRATIONS:
+                state = "applied" if migration.version in done else "pending"
+                print(f"  {migration.version:>3}  {state:<8} {migration.description}")
+            return 0
+
+        applied = apply_migrations(conn, target=args.target)
+        if not applied:
+            print("Schema is up to date.")
+
+        if args.explain:
+            from logic.query_plans import check_query_plans
+            problems = check_query_plans(conn, verbose=True)
+            return 1 if problems else 0
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+# logic/pagination.py
+"""
+Helpers for keyset (cursor) pagination.
+
+A cursor is the sort key of the last row on the previous page, JSON-encoded
+and base64url-wrapped, so clients treat it as an opaque string.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Raised for a malformed limit or cursor; routes turn it into a 400."""
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Decode a cursor into its `size` key values, or None when no cursor was given."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise PaginationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError("Invalid cursor")
+    return values
+
+
+def parse_limit(value: Optional[str], default: int = DEFAULT_PAGE_SIZE,
+                maximum: int = MAX_PAGE_SIZE) -> int:
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be at least 1")
+    return min(limit, maximum)
@@ -0,0 +1,150 @@
+# logic/percentiles.py
+"""
+Population percentile ranks for /api/results ("what percentile am I?").
+
+Scores on each axis are small bounded integers (-bound..bound, see
+logic/result_table.py), so the index keeps, per axis and per cohort (plus
+everyone), an array of cumulative counts over that range:
+
+    cumulative[axis][i] = completed submissions scoring <= i - bound
+
+A percentile is then two array reads, however many submissions there are.
+The mid-rank definition is used: 100 * (below + equal / 2) / total, rounded
+to a whole percent.
+
+Counts come from the stored score snapshots and are topped up by rowid, the
+same way logic/distribution.py does, so completions in other worker processes
+are picked up too: complete_submission refreshes after it commits, and a
+lookup refreshes first if the last refresh is older than
+PERCENTILE_REFRESH_SECONDS. As there, only snapshots of the current scoring
+version and of the model version given to reset() are counted. Re-scoring
+rewrites snapshots in place, so it must call reset(); POST /api/admin/rescore
+does.
+
+`generation` goes up whenever the counts change (a refresh that added rows,
+or a reset), so a response's validators can cover its percentiles without
+computing them.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+from logic.distribution import DISTRIBUTION_ROWS_SQL
+from logic.result_table import DEFAULT_SCORE_BOUND
+from logic.scoring import SCORING_VERSION
+
+FETCH_SIZE = 10000
+PERCENTILE_REFRESH_SECONDS = float(os.environ.get("PERCENTILE_REFRESH_SECONDS", "5"))
+
+AXES = ("learning_score", "application_score")
+
+
+class PercentileIndex:
+
+    def __init__(self, bound: int = DEFAULT_SCORE_BOUND,
+                 refresh_interval: float = PERCENTILE_REFRESH_SECONDS,
+                 model_version: Optional[str] = None):
+        self.refresh_interval = refresh_interval
+        self.model_version = model_version
+        # _lock guards the arrays; _refresh_lock lets one thread at a time read
+        # new rows, without blocking lookups while it queries the database
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.generation = 0
+        self._clear(bound)
+
+    def _clear(self, bound: int) -> None:
+        self.bound = bound
+        # cohort (None = everyone) -> (axes x points) cumulative counts
+        self._cumulative: Dict[Optional[str], np.ndarray] = {}
+        self._last_rowid = 0
+        self._refreshed_at = float("-inf")
+        self.last_modified: Optional[datetime] = None
+
+    def reset(self, bound: Optional[int] = None, model_version: Optional[str] = None) -> None:
+        """
+        Forget everything (optionally for a new score bound or scoring model);
+        the next lookup reloads.
+        """
+        with self._refresh_lock, self._lock:
+            if model_version is not None:
+                self.model_version = model_version
+            self._clear(bound if bound is not None else self.bound)
+            self.generation += 1
+
+    def refresh(self) -> int:
+        """Count snapshots stored since the last refresh. Returns how many were added."""
+        added = 0
+        with self._refresh_lock:
+            with db_connection() as conn:
+                cur = conn.execute(DISTRIBUTION_ROWS_SQL, (self._last_rowid, SCORING_VERSION,
+                                                           self.model_version))
+                while True:
+                    batch = cur.fetchmany(FETCH_SIZE)
+                    if not batch:
+                        break
+                    with self._lock:
+                        self._add(batch)
+                    added += len(batch)
+            self._refreshed_at = time.monotonic()
+            if added:
+                with self._lock:
+                    self.generation += 1
+                self.last_modified = datetime.now(timezone.utc)
+        return added
+
+    def refresh_if_stale(self) -> None:
+        """Refresh if the last refresh is older than refresh_interval."""
+        if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def _add(self, rows) -> None:
+        points = 2 * self.bound + 1
+        # Scores beyond the bound (a model with more items) rank at the edge
+        bins = np.clip(np.array([(row[1], row[2]) for row in rows], dtype=np.int64).T
+                       + self.bound, 0, points - 1)
+        cohorts = np.array([row[4] or "" for row in rows], dtype=object)
+
+        groups = [(None, slice(None))]
+        groups.extend((cohort, cohorts == cohort) for cohort in set(cohorts.tolist()) if cohort)
+        for cohort, selected in groups:
+            counts = np.stack([np.bincount(axis_bins[selected], minlength=points)
+                               for axis_bins in bins])
+            cumulative = self._cumulative.get(cohort)
+            if cumulative is None:
+                cumulative = self._cumulative[cohort] = np.zeros((len(AXES), points), dtype=np.int64)
+            cumulative += counts.cumsum(axis=1)
+        self._last_rowid = rows[-1][0]
+
+    def _ranks(self, cumulative: Optional[np.ndarray], scores: Dict[str, Any]) -> Dict[str, Optional[int]]:
+        ranks: Dict[str, Optional[int]] = {}
+        for axis, field in enumerate(AXES):
+            total = int(cumulative[axis, -1]) if cumulative is not None else 0
+            if not total:
+                ranks[field] = None
+                continue
+            i = min(max(int(scores[field]) + self.bound, 0), 2 * self.bound)
+            below = int(cumulative[axis, i - 1]) if i else 0
+            equal = int(cumulative[axis, i]) - below
+            ranks[field] = round(100 * (below + equal / 2) / total)
+        return ranks
+
+    def lookup(self, scores: Dict[str, Any], cohort: Optional[str] = None) -> Dict[str, Any]:
+        """Percentile of each score among everyone and, if given, within the cohort."""
+        self.refresh_if_stale()
+        with self._lock:
+            result: Dict[str, Any] = {"overall": self._ranks(self._cumulative.get(None), scores),
+                                      "cohort": None}
+            if cohort:
+                result["cohort"] = {"name": cohort,
+                                    **self._ranks(self._cumulative.get(cohort), scores)}
+        return result
+
+
+percentile_index = PercentileIndex()
@@ -0,0 +1,235 @@
+# logic/query_plans.py
+"""
+EXPLAIN QUERY PLAN checks for the SQL the app issues.
+
+APP_QUERIES lists every read/update statement in app.py, logic/ and routes/,
+imported from the module that runs it (constants, or builders called with
+representative filters and parameters), so the plans checked are the plans
+served. When you add a query, add an entry here too so
+`python -m logic.migrations --explain` keeps covering it.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from logic.db_helpers import UPSERT_RESPONSE_SQL
+from logic.distribution import DISTRIBUTION_ROWS_SQL
+from logic.export import export_chunk_query
+from logic.http_cache import SUBMISSION_REVISION_SQL
+from logic.item_analysis import (ITEM_RESPONSES_SQL, ITEM_STATISTICS_SQL,
+                                 UPSERT_ITEM_STATISTICS_SQL)
+from logic.rescoring import COMPLETED_COUNT_SQL, RESCORE_IDS_SQL, rescore_responses_query
+from logic.rollups import (DAILY_SERIES_SQL, RECORD_COMPLETED_DAY_SQL,
+                           RECORD_COMPLETED_STYLE_SQL, RECORD_STARTED_SQL, ROLLUP_TOTALS_SQL,
+                           STYLE_DISTRIBUTION_SQL, SUBMISSION_DAY_SQL)
+from logic.scoring import (LOAD_SCORE_SNAPSHOT_SQL, NUMERIC_RESPONSES_SQL,
+                           SAVE_SCORE_SNAPSHOT_SQL, SCORING_VERSION)
+from logic.search import search_query
+from logic.submission_queries import (COMPLETE_SUBMISSION_SQL, INSERT_SUBMISSION_SQL,
+                                      RECENT_SUBMISSIONS_SQL, SUBMISSION_EXISTS_SQL,
+                                      SUBMISSION_HEADER_SQL, SUBMISSION_RESPONSES_SQL,
+                                      SUBMISSION_STATUS_SQL, batch_responses_query,
+                                      completed_submissions_query, submission_count_query,
+                                      submission_headers_query, submission_list_query)
+from logic.totals import LOAD_TOTALS_SQL, UPSERT_TOTALS_SQL, current_values_query
+
+SAMPLE_ID = "00000000-0000-0000-0000-000000000000"
+SAMPLE_TIME = "2025-03-13 15:52:28"
+SAMPLE_IDS = [SAMPLE_ID] * 3
+PAGE = 51
+SAMPLE_VERSION = "v"
+
+
+def _query(sql_and_params) -> Tuple[str, tuple]:
+    sql, params = sql_and_params
+    return sql, tuple(params)
+
+
+APP_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "start_submission.insert": (
+        INSERT_SUBMISSION_SQL,
+        (SAMPLE_ID, "", "", None)),
+    "save_responses.upsert": (
+        UPSERT_RESPONSE_SQL,
+        (SAMPLE_ID, "Q1", 4, None)),
+    "totals.current_values": _query(
+        current_values_query([(SAMPLE_ID, "Q1"), (SAMPLE_ID, "Q2")])),
+    "totals.upsert": (
+        UPSERT_TOTALS_SQL,
+        (SAMPLE_ID, 1, -1, 1, "v")),
+    "totals.load": (
+        LOAD_TOTALS_SQL,
+        (SAMPLE_ID,)),
+    "submission.exists": (
+        SUBMISSION_EXISTS_SQL,
+        (SAMPLE_ID,)),
+    "submission.status": (
+        SUBMISSION_STATUS_SQL,
+        (SAMPLE_ID,)),
+    "write_behind.completed": _query(
+        completed_submissions_query(SAMPLE_IDS)),
+    "complete_submission.update": (
+        COMPLETE_SUBMISSION_SQL,
+        (SAMPLE_ID,)),
+    "save_score_snapshot.upsert": (
+        SAVE_SCORE_SNAPSHOT_SQL,
+        (SAMPLE_ID, 0, 0, "Experience", "slight", "Ideation", "slight", "intuitive", "1", "v")),
+    "load_score_snapshot": (
+        LOAD_SCORE_SNAPSHOT_SQL,
+        (SAMPLE_ID,)),
+    "compute_scores.responses": (
+        NUMERIC_RESPONSES_SQL,
+        (SAMPLE_ID,)),
+    "admin.get_submissions.first_page": _query(
+        submission_list_query({}, SAMPLE_VERSION, limit=PAGE)),
+    "admin.get_submissions.next_page": _query(
+        submission_list_query({}, SAMPLE_VERSION, after=(SAMPLE_TIME, SAMPLE_ID), limit=PAGE)),
+    "admin.get_submissions.status": _query(
+        submission_list_query({"status": 1}, SAMPLE_VERSION, after=(SAMPLE_TIME, SAMPLE_ID),
+                              limit=PAGE)),
+    "admin.get_submissions.date_range": _query(
+        submission_list_query({"date_from": "2025-01-01", "date_to": "2025-12-31"},
+                              SAMPLE_VERSION, limit=PAGE)),
+    "admin.get_submissions.status_date_range": _query(
+        submission_list_query({"status": 1, "date_from": "2025-01-01", "date_to": "2025-12-31"},
+                              SAMPLE_VERSION, limit=PAGE)),
+    "admin.get_submissions.total": _query(
+        submission_count_query({"status": 1}, SAMPLE_VERSION)),
+    "admin.get_submissions.by_learning_score": _query(
+        submission_list_query({}, SAMPLE_VERSION, "learning_score", after=(10, SAMPLE_ID),
+                              limit=PAGE)),
+    "admin.get_submissions.learning_range_by_application": _query(
+        submission_list_query({"learning_min": 10, "learning_max": 45}, SAMPLE_VERSION,
+                              "application_score", "asc", limit=PAGE)),
+    "admin.get_submissions.style_by_time": _query(
+        submission_list_query({"style": "pragmatic"}, SAMPLE_VERSION,
+                              after=(SAMPLE_TIME, SAMPLE_ID), limit=PAGE)),
+    "admin.get_submissions.style_date_range": _query(
+        submission_list_query({"style": "pragmatic", "date_from": "2025-01-01",
+                               "date_to": "2025-12-31"}, SAMPLE_VERSION, limit=PAGE)),
+    "admin.get_submissions.learning_range_by_time": _query(
+        submission_list_query({"learning_min": 10}, SAMPLE_VERSION,
+                              after=(SAMPLE_TIME, SAMPLE_ID), limit=PAGE)),
+    "admin.get_submissions.style_ranges": _query(
+        submission_list_query({"style": "pragmatic", "learning_min": -45, "application_max": -5},
+                              SAMPLE_VERSION, limit=PAGE)),
+    "admin.get_submissions.style_by_application_score": _query(
+        submission_list_query({"style": "pragmatic", "application_max": -5}, SAMPLE_VERSION,
+                              "application_score", limit=PAGE)),
+    "admin.get_submissions.scored_total": _query(
+        submission_count_query({"style": "pragmatic", "learning_min": 10}, SAMPLE_VERSION)),
+    "admin.get_stats.totals": (
+        ROLLUP_TOTALS_SQL,
+        ()),
+    "admin.get_stats.recent": (
+        RECENT_SUBMISSIONS_SQL,
+        (5,)),
+    "admin.get_stats.styles": (
+        STYLE_DISTRIBUTION_SQL,
+        ()),
+    "admin.get_stats.per_day": (
+        DAILY_SERIES_SQL,
+        ("-30 days",)),
+    "rollups.record_started": (
+        RECORD_STARTED_SQL,
+        (SAMPLE_ID,)),
+    "rollups.record_completed.day": (
+        SUBMISSION_DAY_SQL,
+        (SAMPLE_ID,)),
+    "rollups.record_completed.daily": (
+        RECORD_COMPLETED_DAY_SQL,
+        ("2025-01-01", 0, 0)),
+    "rollups.record_completed.style": (
+        RECORD_COMPLETED_STYLE_SQL,
+        ("2025-01-01", "intuitive", 0, 0)),
+    "admin.export.chunk": _query(
+        export_chunk_query(SAMPLE_VERSION, 1, after=("2025-01-01 00:00:00", SAMPLE_ID), chunk_size=500)),
+    "admin.export.responses": _query(
+        batch_responses_query([SAMPLE_ID, SAMPLE_ID])),
+    "rescoring.completed_count": (
+        COMPLETED_COUNT_SQL,
+        ()),
+    "rescoring.ids": (
+        RESCORE_IDS_SQL,
+        ("", 5000)),
+    "rescoring.responses": _query(
+        rescore_responses_query(SAMPLE_IDS)),
+    "item_analysis.record": (
+        UPSERT_ITEM_STATISTICS_SQL,
+        ("Learning", "Q1", "Q2", 1, 1, -1, -1, "v")),
+    "item_analysis.statistics": (
+        ITEM_STATISTICS_SQL,
+        ()),
+    "item_analysis.rebuild_responses": (
+        ITEM_RESPONSES_SQL,
+        ()),
+    "admin.search": _query(
+        search_query('"brick"', PAGE, after=(-1.0, 0), question_id="Q31")),
+    "admin.get_distribution.rows": (
+        DISTRIBUTION_ROWS_SQL,
+        (0, SCORING_VERSION, SAMPLE_VERSION)),
+    "submission.revision": (
+        SUBMISSION_REVISION_SQL,
+        (SAMPLE_ID,)),
+    "admin.get_submission_detail.header": (
+        SUBMISSION_HEADER_SQL,
+        (SAMPLE_ID,)),
+    "admin.get_submission_detail.responses": (
+        SUBMISSION_RESPONSES_SQL,
+        (SAMPLE_ID,)),
+    "admin.get_submission_details_batch.headers": _query(
+        submission_headers_query(SAMPLE_IDS)),
+    "admin.get_submission_details_batch.responses": _query(
+        batch_responses_query(SAMPLE_IDS)),
+}
+
+# "SCAN submissions" is a full table scan; "SCAN submissions USING INDEX ..." is an
+# ordered walk of an index, which is what an unfiltered listing has to do anyway.
+_TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+# Subqueries the planner materializes first (e.g. a VALUES key list that is
+# then joined through an index); scanning those is not a table scan.
+_MATERIALIZE = re.compile(r"^MATERIALIZE (\w+)$")
+
+# Tables that hold one row per day (or per day and style, or per item pair) and
+# are meant to be read whole; scanning them is the point.
+SMALL_TABLES = {"daily_rollups", "style_rollups", "item_statistics"}
+
+# A LIMITed query that sorts in a temp B-tree sorts every matching row to
+# return one page; each such query needs an index that delivers its order.
+_PAGINATED = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+# Except ranked full-text search: bm25 scores each MATCH hit at query time,
+# so a page of best matches has to rank all hits whatever the plan.
+RANKED_QUERIES = {"admin.search"}
+
+
+def explain(conn, sql: str, params: tuple = ()) -> List[str]:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def check_query_plans(conn, queries: Optional[Dict[str, Tuple[str, tuple]]] = None,
+                      verbose: bool = False) -> List[Tuple[str, str]]:
+    """
+    Explain every query and return (query name, plan line) for each full table
+    scan, and for each temp B-tree sort in a paginated (LIMIT) query. Other
+    temp B-tree sorts are printed as warnings but not counted as failures.
+    """
+    problems = []
+    for name, (sql, params) in (queries or APP_QUERIES).items():
+        plan = explain(conn, sql, params)
+        materialized = {m.group(1) for line in plan if (m := _MATERIALIZE.match(line.strip()))}
+        scans = [line for line in plan
+                 if (m := _TABLE_SCAN.match(line.strip()))
+                 and m.group(1) not in SMALL_TABLES and m.group(1) not in materialized]
+        sorts = [line for line in plan if "USE TEMP B-TREE" in line]
+        page_sorts = sorts if _PAGINATED.search(sql) and name not in RANKED_QUERIES else []
+        problems.extend((name, line) for line in scans + page_sorts)
+
+        if verbose:
+            status = "SCAN" if scans else ("PAGE" if page_sorts else ("SORT" if sorts else "ok"))
+            print(f"[{status:>4}] {name}")
+            for line in plan:
+                print(f"         {line}")
+    if verbose:
+        print(f"{len(problems)} full table scan(s) or paginated sort(s) found.")
+    return problems
@@ -0,0 +1,174 @@
+# logic/rescoring.py
+"""
+Bulk re-scoring of every completed submission, e.g. after a question's
+scoreType or category changes in data/scale_questions.json.
+
+Completed submissions are taken CHUNK_SIZE at a time in submission_id order
+(a keyset walk of the primary key), and each chunk's numeric responses are
+packed into a submissions x questions matrix. Scoring a chunk is then two
+matrix products against the compiled model's per-question matrices
+(logic/scoring_model.py):
+
+    scores = answers @ weights + answered @ offsets
+
+which is exactly what ScoringModel.score() computes one submission at a time.
+rescore_chunk() reads and upserts one chunk on the caller's connection;
+rescore_all() gives every chunk its own short BEGIN IMMEDIATE transaction,
+so no read is held open across writes, then rebuilds the analytics rollups,
+running totals (logic/totals.py) and item statistics
+(logic/item_analysis.py). Migration 15 runs the same chunks inside its own
+transaction to backfill snapshots.
+
+    python -m logic.rescoring [--chunk-size N]
+
+The CLI cannot reach a running server's results cache; cached results expire
+after RESULTS_CACHE_TTL, or use POST /api/admin/rescore, which clears it.
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from logic.db_helpers import DATABASE_FILE, db_connection
+from logic.item_analysis import rebuild_item_statistics
+from logic.rollups import rebuild_rollups
+from logic.scoring import (LABEL_FIELDS, SAVE_SCORE_SNAPSHOT_SQL, SCORING_VERSION,
+                           categorize_scores)
+from logic.scoring_model import SCALE_QUESTIONS_PATH, ScoringModel, load_scoring_model
+from logic.totals import rebuild_running_totals
+
+# Submissions scored and written per chunk
+CHUNK_SIZE = 5000
+
+COMPLETED_COUNT_SQL = "SELECT COUNT(*) FROM submissions WHERE is_complete = 1"
+
+# The unary + keeps the planner off the is_complete index, which would sort
+# every completed ID for each chunk; walking the primary key needs no sort
+RESCORE_IDS_SQL = """
+    SELECT submission_id
+    FROM submissions
+    WHERE +is_complete = 1 AND submission_id > ?
+    ORDER BY submission_id
+    LIMIT ?
+"""
+
+
+def rescore_responses_query(submission_ids: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Numeric responses of one chunk of submissions."""
+    placeholders = ", ".join("?" * len(submission_ids))
+    return f"""
+        SELECT submission_id, question_id, numeric_response
+        FROM submission_responses
+        WHERE submission_id IN ({placeholders}) AND numeric_response IS NOT NULL
+    """, list(submission_ids)
+
+
+def score_matrix(answers: np.ndarray, answered: np.ndarray, weights: np.ndarray,
+                 offsets: np.ndarray) -> np.ndarray:
+    """(submissions x questions) answers and answered-mask -> (submissions x axes) scores."""
+    return answers @ weights + answered @ offsets
+
+
+def rescore_chunk(conn, model: ScoringModel, after: str = "", chunk_size: int = CHUNK_SIZE,
+                  matrices: Optional[Dict[str, Any]] = None) -> Tuple[int, Optional[str]]:
+    """
+    Score and store the next `chunk_size` completed submissions whose ID sorts
+    after `after`. Returns (submissions rescored, last ID, or None when done).
+    """
+    ids = [row[0] for row in conn.execute(RESCORE_IDS_SQL, (after, chunk_size))]
+    if not ids:
+        return 0, None
+
+    matrices = matrices or model.weight_matrix()
+    columns = matrices["columns"]
+    rows = {submission_id: i for i, submission_id in enumerate(ids)}
+    answers = np.zeros((len(ids), len(columns)), dtype=np.int64)
+    answered = np.zeros((len(ids), len(columns)), dtype=np.int64)
+    for submission_id, question_id, numeric_response in conn.execute(*rescore_responses_query(ids)):
+        col = columns.get(question_id)
+        if col is not None:
+            answers[rows[submission_id], col] = numeric_response
+            answered[rows[submission_id], col] = 1
+
+    scores = score_matrix(answers, answered, matrices["weights"], matrices["offsets"])
+    # Axis order follows the bank's categories; the snapshot columns don't
+    _write_chunk(conn, ids, scores[:, list(model.stored_axes)], model.version)
+    return len(ids), ids[-1]
+
+
+def rescore_all(model: ScoringModel, chunk_size: int = CHUNK_SIZE,
+                progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Recompute and store the score snapshot of every completed submission.
+    `progress(done, total)` is called after each chunk is written.
+    """
+    start = time.perf_counter()
+    matrices = model.weight_matrix()
+    with db_connection() as conn:
+        total = conn.execute(COMPLETED_COUNT_SQL).fetchone()[0]
+
+    done = 0
+    chunks = 0
+    after: Optional[str] = ""
+    while True:
+        with db_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            count, after = rescore_chunk(conn, model, after, chunk_size, matrices)
+        if after is None:
+            break
+        done += count
+        chunks += 1
+        if progress:
+            progress(done, total)
+
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rollups = rebuild_rollups(conn)
+        totals = rebuild_running_totals(conn, model)
+        item_pairs = rebuild_item_statistics(conn, model)
+
+    return {
+        "rescored": done,
+        "chunks": chunks,
+        "scoring_version": SCORING_VERSION,
+        "model_version": model.version,
+        "rollups": rollups,
+        "totals": totals,
+        "item_statistics": item_pairs,
+        "elapsed_ms": (time.perf_counter() - start) * 1000
+    }
+
+
+def _write_chunk(conn, ids: List[str], scores: np.ndarray, model_version: str) -> None:
+    # scores: (submissions x STORED_SCORE_FIELDS)
+    # Labels only depend on the score pair, so categorise each distinct pair once
+    pairs = [tuple(row) for row in scores.tolist()]
+    labels = {pair: categorize_scores(*pair) for pair in set(pairs)}
+    conn.executemany(SAVE_SCORE_SNAPSHOT_SQL, (
+        (submission_id, pair[0], pair[1],
+         *(labels[pair][field] for field in LABEL_FIELDS), SCORING_VERSION, model_version)
+        for submission_id, pair in zip(ids, pairs)))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-score every completed submission.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="submissions scored and written per transaction")
+    args = parser.parse_args(argv)
+
+    model = load_scoring_model(SCALE_QUESTIONS_PATH)
+
+    print(f"Database: {DATABASE_FILE}")
+    print(f"Scoring model: {model.version}")
+    result = rescore_all(model, chunk_size=max(args.chunk_size, 1),
+                         progress=lambda done, total: print(f"Rescored {done}/{total}"))
+    print(f"Rescored {result['rescored']} submission(s) in {result['chunks']} chunk(s), "
+          f"{result['elapsed_ms']:.0f} ms (scoring version {result['scoring_version']}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
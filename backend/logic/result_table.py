@@ -0,0 +1,143 @@
+# logic/result_table.py
+"""
+Precomputed results for every reachable (learning, application) score pair.
+
+Each axis is the sum of 15 items scored -3..+3, so scores live in -45..45 and
+there are only 91 x 91 pairs. The table is built once (at startup, and again
+whenever the creative matrix file changes). /api/results and
+/api/admin/simulate then just look up their payload instead of categorising,
+looking up the profile and JSON-encoding it on every request.
+
+Labels and profile text only depend on which direction/strength bucket each
+score falls in, so pairs in the same bucket share one set of objects and one
+pre-serialised JSON fragment. Only the two score integers differ between
+pairs. That keeps the table to a few hundred KB instead of ~50 MB of
+duplicated JSON.
+"""
+
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from logic.creative_matrix import get_creative_matrix
+from logic.scoring import (build_detailed_profile, categorize_scores,
+                           format_simulation_labels, get_style_profile)
+
+# Default bounds: 15 items per axis, each contributing -3..+3
+DEFAULT_SCORE_BOUND = 45
+
+_SCORES_PREFIX = '{"scores":{"learning_score":%d,"application_score":%d},'
+
+
+def _fragment(labels: Dict[str, Any], profile: Dict[str, Any]) -> bytes:
+    """JSON for everything after "scores", without the opening brace."""
+    body = json.dumps({"labels": labels, "detailed_profile": profile, "plot_url": None},
+                      separators=(",", ":"))
+    return body[1:].encode("utf-8")
+
+
+class ResultClass:
+    """Payload parts shared by every score pair with the same labels. Read-only."""
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.detailed_profile = build_detailed_profile(labels)
+        self.results_fragment = _fragment(labels, self.detailed_profile)
+
+        self.simulation_labels = format_simulation_labels(labels)
+        self.simulation_profile = get_style_profile(labels["overall_style"],
+                                                    labels["learning_strength"])
+        self.simulation_fragment = _fragment(self.simulation_labels, self.simulation_profile)
+
+
+class PrecomputedResult:
+    """One (learning, application) entry of the table."""
+
+    __slots__ = ("learning_score", "application_score", "result_class", "_prefix")
+
+    def __init__(self, learning_score: int, application_score: int, result_class: ResultClass):
+        self.learning_score = learning_score
+        self.application_score = application_score
+        self.result_class = result_class
+        self._prefix = (_SCORES_PREFIX % (learning_score, application_score)).encode("utf-8")
+
+    @property
+    def scores(self) -> Dict[str, int]:
+        return {"learning_score": self.learning_score,
+                "application_score": self.application_score}
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        return self.result_class.labels
+
+    @property
+    def detailed_profile(self) -> Dict[str, Any]:
+        return self.result_class.detailed_profile
+
+    @property
+    def results_json(self) -> bytes:
+        """The /api/results body for this pair."""
+        return self._prefix + self.result_class.results_fragment
+
+    @property
+    def simulation_json(self) -> bytes:
+        """The /api/admin/simulate body for this pair."""
+        return self._prefix + self.result_class.simulation_fragment
+
+
+class ResultTable:
+    """Every score pair in [-bound, bound] x [-bound, bound], indexed for O(1) lookup."""
+
+    def __init__(self, bound: int = DEFAULT_SCORE_BOUND):
+        self.bound = bound
+        self.matrix_version = get_creative_matrix().version
+
+        classes: Dict[Tuple[str, ...], ResultClass] = {}
+        size = 2 * bound + 1
+        self._entries = [[None] * size for _ in range(size)]
+        for learning in range(-bound, bound + 1):
+            for application in range(-bound, bound + 1):
+                labels = categorize_scores(learning, application)
+                key = tuple(labels.values())
+                if key not in classes:
+                    classes[key] = ResultClass(labels)
+                self._entries[learning + bound][application + bound] = \
+                    PrecomputedResult(learning, application, classes[key])
+        self.class_count = len(classes)
+
+    def lookup(self, learning_score, application_score) -> Optional[PrecomputedResult]:
+        """The entry for a score pair, or None when it is outside the table."""
+        if not (isinstance(learning_score, int) and isinstance(application_score, int)):
+            return None
+        if abs(learning_score) > self.bound or abs(application_score) > self.bound:
+            return None
+        return self._entries[learning_score + self.bound][application_score + self.bound]
+
+
+_table: Optional[ResultTable] = None
+_table_bound = DEFAULT_SCORE_BOUND
+_table_lock = threading.Lock()
+
+
+def _build_locked(bound: int) -> ResultTable:
+    global _table, _table_bound
+    _table_bound = bound
+    _table = ResultTable(bound)
+    return _table
+
+
+def build_result_table(bound: int = DEFAULT_SCORE_BOUND) -> ResultTable:
+    """(Re)build the process-wide table, e.g. at startup."""
+    with _table_lock:
+        return _build_locked(bound)
+
+
+def get_result_table() -> ResultTable:
+    """The current table, rebuilt if the creative matrix has changed since it was built."""
+    table = _table
+    if table is not None and table.matrix_version == get_creative_matrix().version:
+        return table
+    with _table_lock:
+        if _table is None or _table.matrix_version != get_creative_matrix().version:
+            return _build_locked(_table_bound)
+        return _table
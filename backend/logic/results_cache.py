@@ -0,0 +1,137 @@
+# logic/results_cache.py
+"""
+Bounded LRU + TTL cache for /api/results, keyed by submission_id.
+
+Concurrent misses for the same key are coalesced: the first caller computes,
+everyone else waits for its result. Writes to a submission's responses must
+call invalidate() so the next read recomputes. A computation already running
+when its key is invalidated may have read the old data: its value still goes
+to the callers waiting on it, but it is not stored, and callers arriving
+after the invalidation start a fresh computation instead of joining it.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+RESULTS_CACHE_SIZE = int(os.environ.get("RESULTS_CACHE_SIZE", "1024"))
+RESULTS_CACHE_TTL = float(os.environ.get("RESULTS_CACHE_TTL", "300"))
+
+
+class _InFlight:
+    """A computation other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        # Set when the key is invalidated mid-computation; the value is still
+        # handed to the callers already waiting but is not stored, and the
+        # call is no longer joined by new callers.
+        self.stale = False
+
+
+class ResultsCache:
+
+    def __init__(self, maxsize: int = RESULTS_CACHE_SIZE, ttl: float = RESULTS_CACHE_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        self._inflight: Dict[Hashable, _InFlight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+            call = self._inflight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                call = self._inflight[key] = _InFlight()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # An invalidation may have handed the key to a newer computation
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                if call.error is None and not call.stale and self.maxsize > 0:
+                    self._store(key, call.value)
+            call.done.set()
+        return call.value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+            call = self._inflight.pop(key, None)
+            if call is not None:
+                call.stale = True
+
+    def invalidate_many(self, keys: Iterable[Hashable]) -> None:
+        for key in set(keys):
+            self.invalidate(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for call in self._inflight.values():
+                call.stale = True
+            self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": ((self.hits + self.coalesced) / lookups) if lookups else 0.0,
+            }
+
+
+results_cache = ResultsCache()
@@ -0,0 +1,172 @@
+# logic/rollups.py
+"""
+Incrementally maintained analytics rollups.
+
+daily_rollups   one row per day: started, completed, and score sums for averages
+style_rollups   one row per (day, overall_style): completions and score sums,
+                i.e. counts per quadrant
+
+Days are the UTC date of submissions.submission_time, so a submission is
+always counted on the day it was started. start_submission and
+complete_submission update the rollups in their own transactions. The tables
+can also be regenerated from the raw data:
+
+    python -m logic.rollups --rebuild
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List
+
+from logic.db_helpers import DATABASE_FILE, db_connection
+
+
+RECORD_STARTED_SQL = """
+    INSERT INTO daily_rollups (day, started)
+    SELECT date(submission_time), 1
+    FROM submissions
+    WHERE submission_id = ? AND submission_time IS NOT NULL
+    ON CONFLICT (day) DO UPDATE SET started = started + 1
+"""
+
+SUBMISSION_DAY_SQL = "SELECT date(submission_time) FROM submissions WHERE submission_id = ?"
+
+RECORD_COMPLETED_DAY_SQL = """
+    INSERT INTO daily_rollups (day, completed, scored, learning_score_sum, application_score_sum)
+    VALUES (?, 1, 1, ?, ?)
+    ON CONFLICT (day) DO UPDATE SET
+        completed = completed + 1,
+        scored = scored + 1,
+        learning_score_sum = learning_score_sum + excluded.learning_score_sum,
+        application_score_sum = application_score_sum + excluded.application_score_sum
+"""
+
+RECORD_COMPLETED_STYLE_SQL = """
+    INSERT INTO style_rollups (day, overall_style, completed, learning_score_sum, application_score_sum)
+    VALUES (?, ?, 1, ?, ?)
+    ON CONFLICT (day, overall_style) DO UPDATE SET
+        completed = completed + 1,
+        learning_score_sum = learning_score_sum + excluded.learning_score_sum,
+        application_score_sum = application_score_sum + excluded.application_score_sum
+"""
+
+ROLLUP_TOTALS_SQL = """
+    SELECT COALESCE(SUM(started), 0), COALESCE(SUM(completed), 0) FROM daily_rollups
+"""
+
+DAILY_SERIES_SQL = """
+    SELECT day, started, completed, scored, learning_score_sum, application_score_sum
+    FROM daily_rollups
+    WHERE day >= date('now', ?)
+    ORDER BY day
+"""
+
+STYLE_DISTRIBUTION_SQL = """
+    SELECT overall_style, SUM(completed)
+    FROM style_rollups
+    GROUP BY overall_style
+"""
+
+
+def record_started(conn, submission_id: str) -> None:
+    """Count a newly inserted submission on its start day."""
+    conn.execute(RECORD_STARTED_SQL, (submission_id,))
+
+
+def record_completed(conn, submission_id: str, scores: Dict[str, float],
+                     labels: Dict[str, str]) -> None:
+    """
+    Count a submission's first completion. Call it only when is_complete
+    actually flipped from 0 to 1, or the completion is counted twice.
+    """
+    row = conn.execute(SUBMISSION_DAY_SQL, (submission_id,)).fetchone()
+    if row is None or row[0] is None:
+        return
+    day = row[0]
+    learning, application = scores["learning_score"], scores["application_score"]
+
+    conn.execute(RECORD_COMPLETED_DAY_SQL, (day, learning, application))
+    conn.execute(RECORD_COMPLETED_STYLE_SQL, (day, labels["overall_style"], learning, application))
+
+
+def rebuild_rollups(conn) -> Dict[str, int]:
+    """
+    Regenerate both rollup tables from submissions and submission_scores.
+    Runs on the caller's connection; wrap it in BEGIN IMMEDIATE so that
+    concurrent starts/completions wait for the rebuild instead of being lost.
+    """
+    conn.execute("DELETE FROM daily_rollups")
+    conn.execute("DELETE FROM style_rollups")
+
+    conn.execute("""
+        INSERT INTO daily_rollups (day, started, completed, scored, learning_score_sum, application_score_sum)
+        SELECT date(s.submission_time),
+               COUNT(*),
+               SUM(s.is_complete = 1),
+               SUM(s.is_complete = 1 AND sc.submission_id IS NOT NULL),
+               COALESCE(SUM(CASE WHEN s.is_complete = 1 THEN sc.learning_score END), 0),
+               COALESCE(SUM(CASE WHEN s.is_complete = 1 THEN sc.application_score END), 0)
+        FROM submissions s
+        LEFT JOIN submission_scores sc ON sc.submission_id = s.submission_id
+        WHERE s.submission_time IS NOT NULL
+        GROUP BY date(s.submission_time)
+    """)
+
+    conn.execute("""
+        INSERT INTO style_rollups (day, overall_style, completed, learning_score_sum, application_score_sum)
+        SELECT date(s.submission_time), sc.overall_style,
+               COUNT(*), SUM(sc.learning_score), SUM(sc.application_score)
+        FROM submissions s
+        JOIN submission_scores sc ON sc.submission_id = s.submission_id
+        WHERE s.is_complete = 1 AND s.submission_time IS NOT NULL
+        GROUP BY date(s.submission_time), sc.overall_style
+    """)
+
+    days = conn.execute("SELECT COUNT(*) FROM daily_rollups").fetchone()[0]
+    styles = conn.execute("SELECT COUNT(*) FROM style_rollups").fetchone()[0]
+    return {"daily_rows": days, "style_rows": styles}
+
+
+def rollup_totals(conn) -> Dict[str, int]:
+    row = conn.execute(ROLLUP_TOTALS_SQL).fetchone()
+    return {"started": row[0], "completed": row[1]}
+
+
+def daily_series(conn, days: int) -> List[Dict[str, Any]]:
+    """Per-day counts and average scores for the last `days` days."""
+    rows = conn.execute(DAILY_SERIES_SQL, (f"-{days} days",)).fetchall()
+    return [{
+        "day": row[0],
+        "started": row[1],
+        "completed": row[2],
+        "avg_learning_score": (row[4] / row[3]) if row[3] else None,
+        "avg_application_score": (row[5] / row[3]) if row[3] else None
+    } for row in rows]
+
+
+def style_distribution(conn) -> Dict[str, int]:
+    """Completed submissions per overall_style (quadrant), all time."""
+    rows = conn.execute(STYLE_DISTRIBUTION_SQL).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain analytics rollup tables.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="regenerate the rollups from raw submissions and scores")
+    args = parser.parse_args(argv)
+
+    if not args.rebuild:
+        parser.print_help()
+        return 1
+
+    print(f"Database: {DATABASE_FILE}")
+    with db_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        counts = rebuild_rollups(conn)
+    print(f"Rebuilt rollups: {counts['daily_rows']} day rows, {counts['style_rows']} style rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
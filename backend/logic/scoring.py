@@ -1,52 +1,50 @@
 # logic/scoring.py
 
 import json
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
-from logic.db_helpers import get_connection
+from logic.db_helpers import db_connection
+from logic.creative_matrix import get_creative_matrix
+from logic.scoring_model import ScoringModel
+from logic.totals import load_running_totals
 
-def compute_scores(submission_id: str, question_list: list) -> Dict[str, float]:
+# Bump whenever scoring or labelling rules change, so stored snapshots can be told apart
+SCORING_VERSION = "1"
+
+LABEL_FIELDS = ("learning_direction", "learning_strength",
+                "application_direction", "application_strength",
+                "overall_style")
+
+def compute_scores(submission_id: str, model: ScoringModel, conn=None) -> Dict[str, float]:
     """
-    Reads the submission's numeric responses from the database.
-    Uses question_list to figure out normal vs. reverse, category, etc.
-    Returns numeric results (learning_score, application_score).
+    Returns numeric results (learning_score, application_score) for the
+    submission: its running totals (logic/totals.py) when they were kept with
+    this model, else its numeric responses scored with the compiled model
+    (see logic/scoring_model.py).
+    Pass conn to read inside an existing transaction.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT question_id, numeric_response
-        FROM submission_responses
-        WHERE submission_id = ?
-        AND numeric_response IS NOT NULL
-    """, (submission_id,))
-    rows = cursor.fetchall()
-    conn.close()
+    if conn is None:
+        with db_connection() as own_conn:
+            return compute_scores(submission_id, model, own_conn)
 
-    response_map = {row[0]: row[1] for row in rows}
+    totals = load_running_totals(conn, submission_id, model)
+    if totals is not None:
+        return totals
+    return model.score(fetch_numeric_responses(conn, submission_id))
 
-    learning_total = 0
-    application_total = 0
+NUMERIC_RESPONSES_SQL = """
+    SELECT question_id, numeric_response
+    FROM submission_responses
+    WHERE submission_id = ?
+    AND numeric_response IS NOT NULL
+"""
 
-    for q in question_list:
-        qid = q["id"]
-        cat = q.get("category")             # "Learning" or "Application"
-        score_type = q.get("scoreType")     # "normal" or "reverse"
-        
-        if qid in response_map:
-            raw_resp = response_map[qid]
-            if score_type == "reverse":
-                effective_val = 4 - raw_resp
-            else:  # normal
-                effective_val = raw_resp - 4
-
-            if cat == "Learning":
-                learning_total += effective_val
-            elif cat == "Application":
-                application_total += effective_val
-
-    return {
-        "learning_score": learning_total,
-        "application_score": application_total
-    }
+def fetch_numeric_responses(conn, submission_id: str) -> Dict[str, int]:
+    """Returns {question_id: numeric_response} for a submission."""
+    rows = conn.execute(NUMERIC_RESPONSES_SQL, (submission_id,)).fetchall()
+    return {row[0]: row[1] for row in rows}
 
 def categorize_scores(learning_score: float, application_score: float) -> Dict[str, str]:
     """
@@ -107,39 +105,94 @@ def categorize_scores(learning_score: float, application_score: float) -> Dict[s
         "overall_style": overall_style
     }
 
-def find_preference_description(learning_style: Dict, strength_level: str, dimension_type: str, dimension_value: str) -> str:
+SAVE_SCORE_SNAPSHOT_SQL = """
+        INSERT INTO submission_scores (
+            submission_id, learning_score, application_score,
+            learning_direction, learning_strength,
+            application_direction, application_strength,
+            overall_style, scoring_version, model_version
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (submission_id) DO UPDATE SET
+            learning_score = excluded.learning_score,
+            application_score = excluded.application_score,
+            learning_direction = excluded.learning_direction,
+            learning_strength = excluded.learning_strength,
+            application_direction = excluded.application_direction,
+            application_strength = excluded.application_strength,
+            overall_style = excluded.overall_style,
+            scoring_version = excluded.scoring_version,
+            model_version = excluded.model_version,
+            computed_at = CURRENT_TIMESTAMP
+"""
+
+def save_score_snapshot(conn, submission_id: str, scores: Dict[str, float], labels: Dict[str, str],
+                        model_version: str) -> None:
     """
-    Find the description for a specific preference in a learning style.
+    Stores (or replaces) the computed scores and labels for a submission,
+    tagged with the SCORING_VERSION and scoring model version that produced them.
     """
-    for preference in learning_style["preferences"]:
-        if (preference["strengthLevel"] == strength_level and 
-            preference["dimensionType"] == dimension_type and 
-            preference["dimensionValue"] == dimension_value):
-            return preference["description"]
-    return ""
+    conn.execute(SAVE_SCORE_SNAPSHOT_SQL,
+                 (submission_id, scores["learning_score"], scores["application_score"],
+                  *(labels[field] for field in LABEL_FIELDS), SCORING_VERSION, model_version))
+
+# Columns score_snapshot_from_row() expects, in order
+SNAPSHOT_COLUMNS = """learning_score, application_score,
+               learning_direction, learning_strength,
+               application_direction, application_strength,
+               overall_style, scoring_version, model_version"""
+
+LOAD_SCORE_SNAPSHOT_SQL = f"""
+        SELECT {SNAPSHOT_COLUMNS}
+        FROM submission_scores
+        WHERE submission_id = ?
+"""
 
-def get_detailed_profile(submission_id: str, question_list: list) -> Dict[str, Any]:
+def load_score_snapshot(submission_id: str, model_version: str, conn=None) -> Optional[Dict[str, Any]]:
+    """
+    Returns the stored scores/labels for a submission, or None if there is no
+    snapshot or it was produced by a different SCORING_VERSION or scoring model.
+    """
+    if conn is None:
+        with db_connection() as own_conn:
+            return load_score_snapshot(submission_id, model_version, own_conn)
+
+    row = conn.execute(LOAD_SCORE_SNAPSHOT_SQL, (submission_id,)).fetchone()
+    return score_snapshot_from_row(row, model_version)
+
+def score_snapshot_from_row(row, model_version: str) -> Optional[Dict[str, Any]]:
+    """
+    Builds a snapshot from a row selected with SNAPSHOT_COLUMNS, or returns
+    None if the row is missing (all NULL after a LEFT JOIN) or outdated.
+    """
+    if row is None or row[7] != SCORING_VERSION or row[8] != model_version:
+        return None
+    return {
+        "scores": {"learning_score": row[0], "application_score": row[1]},
+        "labels": dict(zip(LABEL_FIELDS, row[2:7]))
+    }
+
+def get_detailed_profile(submission_id: str, model: ScoringModel) -> Dict[str, Any]:
     """
     Generates a detailed learning profile based on submission responses.
     Using the new creative_matrix.json structure.
     """
+    scores = compute_scores(submission_id, model)
+    categories = categorize_scores(scores["learning_score"], scores["application_score"])
+    return build_detailed_profile(categories)
+
+def build_detailed_profile(categories: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Builds the detailed profile for already-categorized scores
+    (the output of categorize_scores).
+    """
     try:
-        # Calculate basic scores and categories
-        scores = compute_scores(submission_id, question_list)
-        categories = categorize_scores(scores["learning_score"], scores["application_score"])
-        
-        # Load creative matrix data
-        with open("data/creative_matrix.json", 'r') as f:
-            matrix_data = json.load(f)
+        # Shared, indexed creative matrix (parsed once, reloaded on edit)
+        matrix = get_creative_matrix()
         
         # Find the matching learning style
         style_id = categories["overall_style"]
-        learning_style = None
-        
-        for style in matrix_data["learningStyles"]:
-            if style["id"] == style_id:
-                learning_style = style
-                break
+        learning_style = matrix.style(style_id)
         
         if not learning_style:
             raise ValueError(f"Learning style with id '{style_id}' not found")
@@ -151,15 +204,15 @@ def get_detailed_profile(submission_id: str, question_list: list) -> Dict[str, A
         application_direction = categories["application_direction"].lower()
         
         # Find preference descriptions
-        learning_preference_description = find_preference_description(
-            learning_style, 
+        learning_preference_description = matrix.preference_description(
+            style_id, 
             learning_strength, 
             "learningMethod", 
             learning_direction.lower()
         )
         
-        application_preference_description = find_preference_description(
-            learning_style,
+        application_preference_description = matrix.preference_description(
+            style_id,
             application_strength,
             "knowledgeApplication",
             application_direction.lower()
@@ -195,4 +248,254 @@ def get_detailed_profile(submission_id: str, question_list: list) -> Dict[str, A
             },
             "strengths": [],
             "weaknesses": []
-        }
\ No newline at end of file
+        }
+
+
+def get_style_profile(style_id, strength_level):
+    """
+    Get style profile data from the creative matrix, as shown by the admin simulator
+    (preferences picked by style and learning strength only).
+    """
+    try:
+        matrix = get_creative_matrix()
+        
+        # Find the matching learning style
+        style_id = style_id.lower()
+        learning_style = matrix.style(style_id)
+        
+        if not learning_style:
+            return {
+                "style_description": "Style not found",
+                "preference_description": "",
+                "application_preference_description": "",
+                "working_relationships": {
+                    "intuitives": "",
+                    "conceptuals": "",
+                    "pragmatists": "",
+                    "deductives": ""
+                },
+                "strengths": [""],
+                "weaknesses": [""]
+            }
+        
+        # Find preference descriptions based on strength level
+        strength_level = strength_level.lower()
+        preference_description = matrix.preferences_by_strength.get(
+            (style_id, strength_level, "learningMethod"), "")
+        application_preference_description = matrix.preferences_by_strength.get(
+            (style_id, strength_level, "knowledgeApplication"), "")
+        
+        # Convert strengths and weaknesses to arrays if they're strings
+        strengths = [learning_style["strengths"]] if isinstance(learning_style["strengths"], str) else learning_style["strengths"]
+        weaknesses = [learning_style["weaknesses"]] if isinstance(learning_style["weaknesses"], str) else learning_style["weaknesses"]
+        
+        # Return the detailed profile in the format expected by the frontend
+        return {
+            "style_description": learning_style["description"],
+            "preference_description": preference_description,
+            "application_preference_description": application_preference_description,
+            "working_relationships": {
+                "intuitives": learning_style["workingWith"].get("intuitive", ""),
+                "conceptuals": learning_style["workingWith"].get("conceptual", ""),
+                "pragmatists": learning_style["workingWith"].get("pragmatic", ""),
+                "deductives": learning_style["workingWith"].get("deductive", "")
+            },
+            "strengths": strengths,
+            "weaknesses": weaknesses
+        }
+        
+    except Exception as e:
+        print(f"Error loading style profile: {str(e)}")
+        return {
+            "style_description": f"Error: {str(e)}",
+            "preference_description": "",
+            "application_preference_description": "",
+            "working_relationships": {
+                "intuitives": "",
+                "conceptuals": "",
+                "pragmatists": "",
+                "deductives": ""
+            },
+            "strengths": [""],
+            "weaknesses": [""]
+        }
+
+def format_simulation_labels(labels: Dict[str, str]) -> Dict[str, str]:
+    """Formats categorize_scores labels the way the admin simulator displays them."""
+    return {
+        "learning_direction": f"to Learn Through {labels['learning_direction']}",
+        "learning_strength": labels["learning_strength"],
+        "application_direction": f"to Apply Knowledge for {labels['application_direction']}",
+        "application_strength": labels["application_strength"],
+        "overall_style": labels["overall_style"].capitalize() + " Creative Style"
+    }
+
+def build_simulation_result(learning_score: int, application_score: int) -> Dict[str, Any]:
+    """
+    Builds the /api/admin/simulate payload for a score pair
+    without touching the database.
+    """
+    labels = categorize_scores(learning_score, application_score)
+    return {
+        "scores": {
+            "learning_score": learning_score,
+            "application_score": application_score
+        },
+        "labels": format_simulation_labels(labels),
+        "detailed_profile": get_style_profile(labels["overall_style"], labels["learning_strength"]),
+        "plot_url": None  # No plot for simulations
+    }
+
+
+RESULTS_PIPELINE_STAGES = ("fetch", "score", "categorise", "profile", "serialise")
+
+@dataclass
+class ResultsReport:
+    """Everything one results request produced, plus where the time went."""
+    submission_id: str
+    source: str                                  # "snapshot", "totals" or "responses"
+    scores: Dict[str, float]
+    labels: Dict[str, str]
+    detailed_profile: Dict[str, Any]
+    body: bytes                                  # serialised JSON payload
+    matrix_version: int                          # creative matrix the profile came from
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.timings_ms.values())
+
+class _StageTimer:
+    """Process-wide running totals of per-stage pipeline latency."""
+
+    def __init__(self, stages):
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._total = {stage: 0.0 for stage in stages}
+        self._max = {stage: 0.0 for stage in stages}
+
+    def record(self, timings_ms: Dict[str, float]) -> None:
+        with self._lock:
+            self._runs += 1
+            for stage, ms in timings_ms.items():
+                self._total[stage] += ms
+                self._max[stage] = max(self._max[stage], ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = self._runs
+            return {
+                "runs": runs,
+                "stages": {
+                    stage: {
+                        "avg_ms": (self._total[stage] / runs) if runs else 0.0,
+                        "max_ms": self._max[stage]
+                    }
+                    for stage in self._total
+                }
+            }
+
+_pipeline_timer = _StageTimer(RESULTS_PIPELINE_STAGES)
+
+class ResultsPipeline:
+    """
+    Builds the /api/results payload for one submission in a single pass:
+    fetch (stored snapshot, else running totals, else the responses) ->
+    score -> categorise -> profile lookup -> serialise, timing each stage.
+
+    If result_table is given (a callable returning a logic.result_table.ResultTable),
+    the last three stages are a lookup into the precomputed table.
+    """
+
+    def __init__(self, model: ScoringModel, result_table=None):
+        self.model = model
+        self.result_table = result_table
+
+    def run(self, submission_id: str, conn=None) -> ResultsReport:
+        timings: Dict[str, float] = {}
+        clock = time.perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal clock
+            now = time.perf_counter()
+            timings[stage] = (now - clock) * 1000
+            clock = now
+
+        # 1. Fetch: one connection, one or two lookups (snapshot, totals) or
+        # one index scan (responses)
+        if conn is None:
+            with db_connection() as own_conn:
+                snapshot, totals, response_map = self._fetch(own_conn, submission_id)
+        else:
+            snapshot, totals, response_map = self._fetch(conn, submission_id)
+        lap("fetch")
+
+        # 2. Score (already done for stored snapshots)
+        if snapshot is not None:
+            source = "snapshot"
+            scores = snapshot["scores"]
+        elif totals is not None:
+            source = "totals"
+            scores = totals
+        else:
+            source = "responses"
+            scores = self.model.score(response_map)
+        lap("score")
+
+        entry = None
+        # Read before the profile is built: if the matrix is reloaded mid-run,
+        # the report claims the older version and is rebuilt on its next use
+        matrix_version = get_creative_matrix().version
+        if self.result_table is not None:
+            table = self.result_table()
+            matrix_version = table.matrix_version
+            entry = table.lookup(scores["learning_score"], scores["application_score"])
+
+        if entry is not None:
+            # 3-5. Precomputed labels, profile and JSON body
+            labels = entry.labels
+            lap("categorise")
+            detailed_profile = entry.detailed_profile
+            lap("profile")
+            body = entry.results_json
+            lap("serialise")
+        else:
+            # 3. Categorise
+            if snapshot is not None:
+                labels = snapshot["labels"]
+            else:
+                labels = categorize_scores(scores["learning_score"], scores["application_score"])
+            lap("categorise")
+
+            # 4. Profile lookup
+            detailed_profile = build_detailed_profile(labels)
+            lap("profile")
+
+            # 5. Serialise
+            body = json.dumps({
+                "scores": {
+                    "learning_score": scores["learning_score"],
+                    "application_score": scores["application_score"]
+                },
+                "labels": labels,
+                "detailed_profile": detailed_profile,
+                "plot_url": None
+            }, separators=(",", ":")).encode("utf-8")
+            lap("serialise")
+
+        _pipeline_timer.record(timings)
+        return ResultsReport(submission_id, source, scores, labels,
+                             detailed_profile, body, matrix_version, timings)
+
+    def _fetch(self, conn, submission_id: str):
+        snapshot = load_score_snapshot(submission_id, self.model.version, conn)
+        if snapshot is not None:
+            return snapshot, None, None
+        totals = load_running_totals(conn, submission_id, self.model)
+        if totals is not None:
+            return None, totals, None
+        return None, None, fetch_numeric_responses(conn, submission_id)
+
+def results_pipeline_stats() -> Dict[str, Any]:
+    """Average and max latency per pipeline stage since startup."""
+    return _pipeline_timer.stats()
@@ -0,0 +1,149 @@
+# logic/scoring_model.py
+"""
+Scoring model compiled once from a scale question bank
+(data/scale_questions.json).
+
+Each scored question is reduced to (axis index, sign, offset), where
+sign is +1 for "normal" and -1 for "reverse" items and
+offset = -sign * midpoint, with midpoint the centre of metadata.scaleRange.
+An answer then contributes sign * raw + offset to its axis, so scoring is
+one pass over the answered questions (or one matrix product for bulk
+re-scoring), with no per-request lookups in the question dicts.
+
+Models are identified by a version derived from their content (prefixed by
+metadata.version when the bank has one). They are registered by version, so
+different assessment versions can be served side by side and compiling the
+same bank twice returns the same object.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# The bank the app serves, for code that runs outside it (CLI jobs, migrations)
+SCALE_QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "data", "scale_questions.json")
+
+# Score types that subtract from their axis; anything else listed in
+# metadata.scoreTypes adds to it
+REVERSE_SCORE_TYPES = ("reverse",)
+
+# Score columns the database keeps (snapshots, running totals, rollups); a
+# bank's metadata.categories must name exactly these axes, in any order
+STORED_SCORE_FIELDS = ("learning_score", "application_score")
+
+
+class ScoringModel:
+    """A compiled, read-only scoring model."""
+
+    def __init__(self, axes: List[str], midpoint, items: Dict[str, Tuple[int, int, Any]],
+                 scale_range: Dict[str, int], version: str):
+        self.axes = tuple(axes)
+        # e.g. ("learning_score", "application_score")
+        self.score_fields = tuple(f"{axis.lower()}_score" for axis in self.axes)
+        # Axis index of each STORED_SCORE_FIELDS column, for code that works
+        # on axis-indexed arrays (running totals, bulk re-scoring)
+        self.stored_axes = tuple(self.score_fields.index(f) for f in STORED_SCORE_FIELDS)
+        self.midpoint = midpoint
+        self.scale_range = scale_range
+        self.version = version
+        # question_id -> (axis index, sign, offset)
+        self.items = items
+
+        # Largest |score| reachable on any axis
+        lo, hi = scale_range["min"], scale_range["max"]
+        reach = [0] * len(self.axes)
+        for axis, sign, offset in items.values():
+            reach[axis] += max(abs(sign * lo + offset), abs(sign * hi + offset))
+        self.score_bound = max(reach) if reach else 0
+
+    def score(self, response_map: Dict[str, int]) -> Dict[str, Any]:
+        """{question_id: numeric_response} -> {"<axis>_score": total, ...}"""
+        totals = [0] * len(self.axes)
+        get_item = self.items.get
+        for question_id, raw in response_map.items():
+            item = get_item(question_id)
+            if item is not None:
+                axis, sign, offset = item
+                totals[axis] += sign * raw + offset
+        return dict(zip(self.score_fields, totals))
+
+    def weight_matrix(self) -> Dict[str, Any]:
+        """
+        Column index per scored question plus (questions x axes) weight and
+        offset matrices, so that for answers A and answered-mask M
+        (submissions x questions): scores = A @ weights + M @ offsets.
+        """
+        columns = {question_id: i for i, question_id in enumerate(self.items)}
+        dtype = np.int64 if isinstance(self.midpoint, int) else np.float64
+        weights = np.zeros((len(columns), len(self.axes)), dtype=np.int64)
+        offsets = np.zeros((len(columns), len(self.axes)), dtype=dtype)
+        for question_id, (axis, sign, offset) in self.items.items():
+            weights[columns[question_id], axis] = sign
+            offsets[columns[question_id], axis] = offset
+        return {"columns": columns, "weights": weights, "offsets": offsets}
+
+
+_models: Dict[str, ScoringModel] = {}
+_models_lock = threading.Lock()
+
+
+def compile_scoring_model(scale_data: Dict[str, Any]) -> ScoringModel:
+    """
+    Compile (or fetch the already registered) model for a parsed scale
+    question bank: {"metadata": {...}, "questions": [...]}.
+    Raises ValueError for a bank that cannot be scored.
+    """
+    metadata = scale_data["metadata"]
+    scale_range = {"min": int(metadata["scaleRange"]["min"]),
+                   "max": int(metadata["scaleRange"]["max"])}
+    if scale_range["min"] >= scale_range["max"]:
+        raise ValueError(f"Invalid scaleRange: {scale_range}")
+    axes = list(metadata["categories"])
+    if sorted(f"{axis.lower()}_score" for axis in axes) != sorted(STORED_SCORE_FIELDS):
+        raise ValueError(f"categories {axes} do not match the stored scores "
+                         f"{list(STORED_SCORE_FIELDS)}")
+    score_types = set(metadata.get("scoreTypes", {"normal": "", "reverse": ""}))
+
+    total = scale_range["min"] + scale_range["max"]
+    midpoint = total // 2 if total % 2 == 0 else total / 2
+
+    items: Dict[str, Tuple[int, int, Any]] = {}
+    for q in scale_data["questions"]:
+        if q.get("category") not in axes:
+            continue
+        score_type = q.get("scoreType", "normal")
+        if score_type not in score_types:
+            raise ValueError(f"Question {q['id']}: unknown scoreType {score_type!r}")
+        sign = -1 if score_type in REVERSE_SCORE_TYPES else 1
+        items[q["id"]] = (axes.index(q["category"]), sign, -sign * midpoint)
+
+    spec = json.dumps({"axes": axes, "range": scale_range, "items": items},
+                      sort_keys=True, separators=(",", ":"))
+    version = hashlib.sha256(spec.encode("utf-8")).hexdigest()[:12]
+    if metadata.get("version"):
+        version = f"{metadata['version']}-{version}"
+
+    with _models_lock:
+        model = _models.get(version)
+        if model is None:
+            model = _models[version] = ScoringModel(axes, midpoint, items, scale_range, version)
+        return model
+
+
+def load_scoring_model(path: str) -> ScoringModel:
+    with open(path, "r", encoding="utf-8") as f:
+        return compile_scoring_model(json.load(f))
+
+
+def get_scoring_model(version: str) -> Optional[ScoringModel]:
+    """A previously compiled model by version, or None."""
+    return _models.get(version)
+
+
+def scoring_model_versions() -> List[str]:
+    return sorted(_models)
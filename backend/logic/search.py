@@ -0,0 +1,78 @@
+# logic/search.py
+"""
+Full-text search over open-ended (text) responses.
+
+response_text_fts is an FTS5 external-content index over
+submission_responses.text_response, kept in sync by triggers (migration 8).
+Hits are ranked by bm25 and keyset-paginated on (rank, rowid).
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters that mark the matched terms inside a snippet
+SNIPPET_OPEN = "["
+SNIPPET_CLOSE = "]"
+SNIPPET_TOKENS = 12
+
+_TERM = re.compile(r"\w+\*?")
+
+SEARCH_SQL = f"""
+    SELECT f.rowid, r.submission_id, r.question_id, s.user_name, s.submission_time,
+           snippet(response_text_fts, 0, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '...', {SNIPPET_TOKENS}),
+           f.rank
+    FROM response_text_fts f
+    JOIN submission_responses r ON r.id = f.rowid
+    JOIN submissions s ON s.submission_id = r.submission_id
+    WHERE response_text_fts MATCH ?
+"""
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match, a trailing *
+    makes it a prefix search. Quoting each term keeps FTS5 operators and
+    punctuation in user input from being parsed as query syntax.
+    Returns None when there is nothing to search for.
+    """
+    terms = []
+    for term in _TERM.findall(text or ""):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def search_query(match_query: str, limit: int, after: Optional[List[Any]] = None,
+                 question_id: Optional[str] = None) -> Tuple[str, List[Any]]:
+    """SQL and parameters for one page of search_responses()."""
+    query = SEARCH_SQL
+    params: List[Any] = [match_query]
+    if question_id:
+        query += " AND r.question_id = ?"
+        params.append(question_id)
+    if after is not None:
+        query += " AND (f.rank, f.rowid) > (?, ?)"
+        params.extend(after)
+    query += " ORDER BY f.rank, f.rowid LIMIT ?"
+    params.append(limit)
+    return query, params
+
+
+def search_responses(conn, match_query: str, limit: int, after: Optional[List[Any]] = None,
+                     question_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Best-ranked text responses matching `match_query`. `after` is the
+    (rank, response_id) of the last hit on the previous page.
+    """
+    query, params = search_query(match_query, limit, after, question_id)
+    return [{
+        "response_id": row[0],
+        "submission_id": row[1],
+        "question_id": row[2],
+        "user_name": row[3],
+        "submission_time": row[4],
+        "snippet": row[5],
+        "rank": row[6]
+    } for row in conn.execute(query, params).fetchall()]
@@ -0,0 +1,189 @@
+# logic/submission_queries.py
+"""
+SQL for the submission endpoints in app.py and routes/admin_routes.py.
+
+Statements are defined once here (fixed text as *_SQL constants, variable
+text by the *_query builders) so that logic/query_plans.py explains exactly
+what the handlers run.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from logic.scoring import SCORING_VERSION, SNAPSHOT_COLUMNS
+
+INSERT_SUBMISSION_SQL = """
+    INSERT INTO submissions (submission_id, user_name, user_email, cohort)
+    VALUES (?, ?, ?, ?)
+"""
+
+SUBMISSION_EXISTS_SQL = "SELECT submission_id FROM submissions WHERE submission_id = ?"
+
+# Completed submissions are scored once and counted in the rollups, item
+# statistics and percentiles, so their responses no longer accept writes
+SUBMISSION_STATUS_SQL = "SELECT is_complete FROM submissions WHERE submission_id = ?"
+
+# rowcount is 0 on a repeat call, so callers can tell the first completion
+COMPLETE_SUBMISSION_SQL = """
+    UPDATE submissions
+    SET is_complete = 1
+    WHERE submission_id = ? AND is_complete = 0
+"""
+
+RECENT_SUBMISSIONS_SQL = """
+    SELECT submission_id, user_name, submission_time, is_complete
+    FROM submissions
+    ORDER BY submission_time DESC, submission_id DESC
+    LIMIT ?
+"""
+
+SUBMISSION_HEADER_SQL = """
+    SELECT submission_id, user_name, user_email, submission_time, is_complete
+    FROM submissions WHERE submission_id = ?
+"""
+
+SUBMISSION_RESPONSES_SQL = """
+    SELECT question_id, numeric_response, text_response
+    FROM submission_responses
+    WHERE submission_id = ?
+"""
+
+# sort parameter -> (sort column, tie-breaker); each pair is the tail of an index.
+# {t} is the table driving the query: s (submissions), or sc (submission_scores,
+# which keeps a copy of submission_time) when only scored submissions can match.
+SUBMISSION_SORTS = {
+    "submission_time": ("{t}.submission_time", "{t}.submission_id"),
+    "learning_score": ("sc.learning_score", "sc.submission_id"),
+    "application_score": ("sc.application_score", "sc.submission_id"),
+}
+
+# Listing filter -> condition; values are bound in this order
+SUBMISSION_FILTERS = {
+    "status": "s.is_complete = ?",
+    "date_from": "{t}.submission_time >= ?",
+    "date_to": "{t}.submission_time <= ?",
+    # Score/label filters run against the indexed submission_scores snapshot
+    "style": "sc.overall_style = ?",
+    "learning_strength": "sc.learning_strength = ?",
+    "application_strength": "sc.application_strength = ?",
+    "learning_min": "sc.learning_score >= ?",
+    "learning_max": "sc.learning_score <= ?",
+    "application_min": "sc.application_score >= ?",
+    "application_max": "sc.application_score <= ?",
+}
+
+# Integer score bounds among SUBMISSION_FILTERS
+SCORE_RANGE_FILTERS = ("learning_min", "learning_max", "application_min", "application_max")
+RANGE_FILTERS = ("date_from", "date_to") + SCORE_RANGE_FILTERS
+
+
+def _submission_filters(filters: Dict[str, Any], model_version: str,
+                        sort: str = "submission_time",
+                        paginated: bool = False) -> Tuple[str, List[str], List[Any], str]:
+    """
+    (FROM clause, WHERE conditions, parameters, driving table alias) for the
+    listing filters. Only snapshots of the current SCORING_VERSION and
+    `model_version` are joined, the same ones score_snapshot_from_row()
+    accepts, so outdated scores are neither filtered, sorted, counted nor
+    shown. For a page (`paginated`), range filters on columns other
+    than the sort column get a unary + so the planner walks the sort's index
+    and stops after one page of matches, instead of collecting every match
+    through the filter's index and sorting them.
+    """
+    names = [name for name in SUBMISSION_FILTERS if filters.get(name) is not None]
+
+    # Only scored submissions can match a score filter or sort, so those
+    # queries join (and are driven by) submission_scores
+    scored_only = sort != "submission_time" or any(
+        SUBMISSION_FILTERS[name].startswith("sc.") for name in names)
+    table = "sc" if scored_only else "s"
+    join = "JOIN" if scored_only else "LEFT JOIN"
+    from_sql = f"""
+        FROM submissions s
+        {join} submission_scores sc ON sc.submission_id = s.submission_id
+            AND sc.scoring_version = ? AND sc.model_version = ?
+    """
+    sort_column = SUBMISSION_SORTS[sort][0].format(t=table)
+    where_clauses = []
+    for name in names:
+        condition = SUBMISSION_FILTERS[name].format(t=table)
+        if paginated and name in RANGE_FILTERS and not condition.startswith(sort_column + " "):
+            condition = "+" + condition
+        where_clauses.append(condition)
+    params = [SCORING_VERSION, model_version] + [filters[name] for name in names]
+    return from_sql, where_clauses, params, table
+
+
+def submission_list_query(filters: Dict[str, Any], model_version: str,
+                          sort: str = "submission_time",
+                          order: str = "desc", after: Optional[Sequence[Any]] = None,
+                          limit: int = 50) -> Tuple[str, List[Any]]:
+    """
+    One page of the admin listing: submissions matching `filters` (keys of
+    SUBMISSION_FILTERS), ordered by `sort`, resuming after the
+    (sort value, submission_id) pair `after`. Scores come from the stored
+    snapshot, if it was produced by `model_version`.
+    """
+    from_sql, where_clauses, params, table = _submission_filters(filters, model_version, sort,
+                                                                 paginated=True)
+
+    # Resume after the last row of the previous page
+    sort_column, tie_breaker = (column.format(t=table) for column in SUBMISSION_SORTS[sort])
+    if after is not None:
+        comparison = "<" if order == "desc" else ">"
+        where_clauses.append(f"({sort_column}, {tie_breaker}) {comparison} (?, ?)")
+        params.extend(after)
+
+    query = """
+        SELECT s.submission_id, s.user_name, s.user_email, s.submission_time, s.is_complete,
+               sc.learning_score, sc.application_score, sc.overall_style
+    """ + from_sql
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+
+    direction = order.upper()
+    query += f" ORDER BY {sort_column} {direction}, {tie_breaker} {direction} LIMIT ?"
+    params.append(limit)
+    return query, params
+
+
+def submission_count_query(filters: Dict[str, Any], model_version: str,
+                           sort: str = "submission_time") -> Tuple[str, List[Any]]:
+    """Number of submissions the listing with these filters would page through."""
+    from_sql, where_clauses, params, _ = _submission_filters(filters, model_version, sort)
+    query = "SELECT COUNT(*) " + from_sql
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    return query, params
+
+
+def submission_headers_query(submission_ids: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Headers with their score snapshot columns for a batch of submissions."""
+    placeholders = ", ".join("?" * len(submission_ids))
+    return f"""
+        SELECT s.submission_id, s.user_name, s.user_email, s.submission_time,
+               s.is_complete, {SNAPSHOT_COLUMNS}
+        FROM submissions s
+        LEFT JOIN submission_scores sc ON sc.submission_id = s.submission_id
+        WHERE s.submission_id IN ({placeholders})
+    """, list(submission_ids)
+
+
+def batch_responses_query(submission_ids: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Every response of a batch of submissions (also used by the export)."""
+    placeholders = ", ".join("?" * len(submission_ids))
+    return f"""
+        SELECT submission_id, question_id, numeric_response, text_response
+        FROM submission_responses
+        WHERE submission_id IN ({placeholders})
+    """, list(submission_ids)
+
+
+def completed_submissions_query(submission_ids: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Which of a batch of submissions are already complete."""
+    placeholders = ", ".join("?" * len(submission_ids))
+    # The unary + keeps the planner on the primary key rather than walking
+    # every completed submission in the is_complete index
+    return f"""
+        SELECT submission_id FROM submissions
+        WHERE submission_id IN ({placeholders}) AND +is_complete = 1
+    """, list(submission_ids)
@@ -0,0 +1,145 @@
+# logic/totals.py
+"""
+Per-submission running score totals (submission_totals), kept up to date by
+save_responses() in the same transaction as the response upsert.
+
+For each written answer the old numeric value is read first, and the totals
+move by contribution(new) - contribution(old) using the compiled scoring
+model's (axis, sign, offset). save_responses() takes the write lock (BEGIN
+IMMEDIATE) before that read, so a concurrent writer cannot change an answer
+between the read and the upsert and leave the totals off by its delta.
+Reading a submission's live scores is then one primary-key lookup, however
+many answers or revisions it has.
+
+Each row records the scoring model version that produced it. Rows written
+under another model are left alone and ignored by readers (they fall back to
+scoring the responses) until rebuild_running_totals() recomputes them, which
+migration 12 and the re-scoring job do.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Old-value lookups per query; two parameters per (submission_id, question_id)
+LOOKUP_CHUNK = 400
+
+UPSERT_TOTALS_SQL = """
+    INSERT INTO submission_totals (submission_id, learning_score, application_score,
+                                   answered, model_version)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (submission_id) DO UPDATE SET
+        learning_score = learning_score + excluded.learning_score,
+        application_score = application_score + excluded.application_score,
+        answered = answered + excluded.answered
+    WHERE submission_totals.model_version = excluded.model_version
+"""
+
+LOAD_TOTALS_SQL = """
+    SELECT learning_score, application_score, answered, model_version
+    FROM submission_totals
+    WHERE submission_id = ?
+"""
+
+
+def current_values_query(keys: List[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+    """Stored numeric answers for up to LOOKUP_CHUNK (submission_id, question_id) pairs."""
+    values = ", ".join("(?, ?)" for _ in keys)
+    # Joined from the key list so each pair is one unique-index probe
+    return f"""
+        SELECT r.submission_id, r.question_id, r.numeric_response
+        FROM (VALUES {values}) AS k
+        JOIN submission_responses r
+            ON r.submission_id = k.column1 AND r.question_id = k.column2
+    """, [part for key in keys for part in key]
+
+
+def _current_values(conn, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[int]]:
+    """Stored numeric answers for (submission_id, question_id) pairs that already exist."""
+    found: Dict[Tuple[str, str], Optional[int]] = {}
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        query, params = current_values_query(keys[start:start + LOOKUP_CHUNK])
+        for submission_id, question_id, numeric_response in conn.execute(query, params):
+            found[(submission_id, question_id)] = numeric_response
+    return found
+
+
+def response_deltas(conn, model, rows: Iterable[tuple]) -> Dict[str, List[Any]]:
+    """
+    submission_id -> [delta per model axis..., answered delta] for response
+    rows about to be upserted. Must run before the upsert, in the
+    same write-locked transaction.
+    """
+    items = model.items
+    rows = [row for row in rows if row[1] in items]
+    if not rows:
+        return {}
+
+    current = _current_values(conn, list({(row[0], row[1]) for row in rows}))
+    answered = len(model.axes)
+    deltas: Dict[str, List[Any]] = {}
+    # Rows apply in order, so a repeated answer in one batch replaces the previous one
+    for submission_id, question_id, numeric_response, _text in rows:
+        key = (submission_id, question_id)
+        old = current.get(key)
+        axis, sign, offset = items[question_id]
+        delta = deltas.setdefault(submission_id, [0] * (answered + 1))
+        if old is not None:
+            delta[axis] -= sign * old + offset
+            delta[answered] -= 1
+        if numeric_response is not None:
+            delta[axis] += sign * numeric_response + offset
+            delta[answered] += 1
+        current[key] = numeric_response
+    return deltas
+
+
+def apply_response_deltas(conn, model, deltas: Dict[str, List[Any]]) -> None:
+    if deltas:
+        learning, application = model.stored_axes
+        conn.executemany(UPSERT_TOTALS_SQL, [
+            (submission_id, delta[learning], delta[application], delta[-1], model.version)
+            for submission_id, delta in deltas.items()])
+
+
+def load_running_totals(conn, submission_id: str, model) -> Optional[Dict[str, Any]]:
+    """The submission's running scores, or None if there is no row for this model version."""
+    row = conn.execute(LOAD_TOTALS_SQL, (submission_id,)).fetchone()
+    if row is None or row[3] != model.version:
+        return None
+    return {"learning_score": row[0], "application_score": row[1]}
+
+
+def rebuild_running_totals(conn, model) -> int:
+    """
+    Recompute every submission's totals from its responses with `model`, in
+    SQL via a temporary weights table. Returns the number of rows written.
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.scoring_weights")
+    conn.execute("""
+        CREATE TEMP TABLE scoring_weights (
+            question_id TEXT PRIMARY KEY,
+            axis INTEGER NOT NULL,
+            sign INTEGER NOT NULL,
+            offset NUMERIC NOT NULL
+        )
+    """)
+    conn.executemany("INSERT INTO temp.scoring_weights VALUES (?, ?, ?, ?)",
+                     [(question_id, axis, sign, offset)
+                      for question_id, (axis, sign, offset) in model.items.items()])
+
+    conn.execute("DELETE FROM submission_totals")
+    conn.execute("""
+        INSERT INTO submission_totals (submission_id, learning_score, application_score,
+                                       answered, model_version)
+        SELECT r.submission_id,
+               COALESCE(SUM(CASE WHEN w.axis = ? THEN w.sign * r.numeric_response + w.offset END), 0),
+               COALESCE(SUM(CASE WHEN w.axis = ? THEN w.sign * r.numeric_response + w.offset END), 0),
+               COUNT(*),
+               ?
+        FROM submission_responses r
+        JOIN temp.scoring_weights w ON w.question_id = r.question_id
+        WHERE r.numeric_response IS NOT NULL
+        GROUP BY r.submission_id
+    """, (*model.stored_axes, model.version))
+    count = conn.execute("SELECT COUNT(*) FROM submission_totals").fetchone()[0]
+    conn.execute("DROP TABLE temp.scoring_weights")
+    return count
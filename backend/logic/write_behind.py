@@ -0,0 +1,223 @@
+# logic/write_behind.py
+"""
+Optional write-behind mode for /api/submit-response.
+
+Responses are put on a bounded in-process queue and a single writer thread
+group-commits them: a batch is written once it reaches WRITE_BEHIND_BATCH_SIZE
+items or WRITE_BEHIND_INTERVAL_MS after its first item arrived, whichever
+comes first. Enable it with WRITE_BEHIND=1.
+
+The request handler validates each row (known, still open submission;
+known question; value in range) before queueing it, since the client has
+already been answered by the time it is written. A row that still fails to
+write, or whose submission was completed while it sat in the queue, is
+dropped, logged and counted in stats()["dropped"].
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from logic.db_helpers import ResponseRow, db_connection, save_responses
+from logic.submission_queries import completed_submissions_query
+
+WRITE_BEHIND_ENABLED = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "100"))
+WRITE_BEHIND_INTERVAL_MS = int(os.environ.get("WRITE_BEHIND_INTERVAL_MS", "50"))
+WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+# How long a request waits for queue space before it is turned away
+WRITE_BEHIND_PUT_TIMEOUT = float(os.environ.get("WRITE_BEHIND_PUT_TIMEOUT", "0.5"))
+
+_STOP = object()
+
+
+class ResponseWriter:
+    """Bounded queue plus one writer thread that group-commits response rows."""
+
+    def __init__(self,
+                 batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 interval_ms: int = WRITE_BEHIND_INTERVAL_MS,
+                 max_queue: int = WRITE_BEHIND_QUEUE_SIZE,
+                 put_timeout: float = WRITE_BEHIND_PUT_TIMEOUT,
+                 on_commit: Optional[Callable[[List[ResponseRow]], None]] = None,
+                 model=None):
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.put_timeout = put_timeout
+        self.on_commit = on_commit
+        # Scoring model for the running totals save_responses() maintains
+        self.model = model
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        # Progress counters; _done is signalled whenever a batch finishes
+        self._done = threading.Condition()
+        self._enqueued = 0
+        self._processed = 0
+        self._rejected = 0
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+        self._last_batch = 0
+        self._max_batch = 0
+        self._max_depth = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,
+                                            name="response-writer",
+                                            daemon=True)
+            self._thread.start()
+
+    def submit(self, row: ResponseRow) -> bool:
+        """
+        Queue a row for writing. Returns False if the queue stayed full for
+        put_timeout seconds, so the caller can push back on the client.
+        """
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            with self._done:
+                self._rejected += 1
+            return False
+
+        with self._done:
+            self._enqueued += 1
+            self._max_depth = max(self._max_depth, self._queue.qsize())
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued before this call has been written."""
+        with self._done:
+            target = self._enqueued
+            return self._done.wait_for(lambda: self._processed >= target, timeout)
+
+    def stop(self, timeout: Optional[float] = 10) -> None:
+        """Drain the queue and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+        # Write whatever is still queued after the stop marker
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            self._commit(leftover[start:start + self.batch_size])
+
+    def _save(self, rows: List[ResponseRow]) -> List[ResponseRow]:
+        """
+        Write the rows whose submission is still open, in one transaction that
+        holds the write lock from the check on. Returns the rows written.
+        """
+        with db_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            query, params = completed_submissions_query(list({row[0] for row in rows}))
+            completed = {row[0] for row in conn.execute(query, params)}
+            open_rows = [row for row in rows if row[0] not in completed]
+            save_responses(conn, open_rows, self.model)
+        for row in rows:
+            if row[0] in completed:
+                print(f"Write-behind dropped response {row[:2]}: submission already complete")
+        return open_rows
+
+    def _commit(self, batch: List[ResponseRow]) -> None:
+        written: List[ResponseRow] = []
+        try:
+            written = self._save(batch)
+        except Exception as e:
+            # One bad row (e.g. an unknown submission_id) must not sink the
+            # rest of the batch, so fall back to row-at-a-time writes.
+            print(f"Write-behind batch of {len(batch)} failed, retrying rows: {str(e)}")
+            for row in batch:
+                try:
+                    written.extend(self._save([row]))
+                except Exception as row_error:
+                    print(f"Write-behind dropped response {row[:2]}: {str(row_error)}")
+        dropped = len(batch) - len(written)
+
+        if written and self.on_commit is not None:
+            try:
+                self.on_commit(written)
+            except Exception as e:
+                print(f"Write-behind on_commit hook failed: {str(e)}")
+
+        with self._done:
+            self._batches += 1
+            self._written += len(written)
+            self._dropped += dropped
+            self._processed += len(batch)
+            self._last_batch = len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+            self._done.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._done:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_depth_max": self._max_depth,
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "rejected": self._rejected,
+                "batches": self._batches,
+                "batch_size_last": self._last_batch,
+                "batch_size_max": self._max_batch,
+                "batch_size_avg": (self._processed / self._batches) if self._batches else 0.0,
+            }
+
+
+_writer: Optional[ResponseWriter] = None
+
+
+def start_response_writer(**kwargs) -> ResponseWriter:
+    """Start the process-wide writer and make sure it drains on shutdown."""
+    global _writer
+    if _writer is None:
+        _writer = ResponseWriter(**kwargs)
+        _writer.start()
+        atexit.register(_writer.stop)
+    return _writer
+
+
+def get_response_writer() -> Optional[ResponseWriter]:
+    """The running writer, or None when write-behind mode is off."""
+    return _writer
+
+
+def response_writer_stats() -> Optional[Dict[str, Any]]:
+    return _writer.stats() if _writer is not None else None
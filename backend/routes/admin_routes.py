@@ -1,119 +1,437 @@
 # backend/routes/admin_routes.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from auth.auth_middleware import admin_required
-from logic.db_helpers import get_connection
-import json
-import os 
-from logic.scoring import compute_scores, categorize_scores, get_detailed_profile
+from logic.db_helpers import db_connection, pool_stats
+from logic.distribution import DistributionError, score_distribution
+from logic.percentiles import percentile_index
+from logic.export import csv_stream, export_columns, iter_export_rows, ndjson_stream
+from logic.item_analysis import item_analysis
+from logic.pagination import PaginationError, decode_cursor, encode_cursor, parse_limit
+from logic.result_table import get_result_table
+from logic.rescoring import rescore_all
+from logic.search import build_match_query, search_responses
+from logic.results_cache import results_cache
+from logic.rollups import daily_series, rollup_totals, style_distribution
+from logic.write_behind import response_writer_stats
+from logic.http_cache import (is_not_modified, load_submission_revision, not_modified,
+                              set_validators)
+from logic.scoring import (SCORING_VERSION, load_score_snapshot, score_snapshot_from_row,
+                           results_pipeline_stats, build_simulation_result)
+from logic.submission_queries import (RECENT_SUBMISSIONS_SQL, SCORE_RANGE_FILTERS,
+                                      SUBMISSION_HEADER_SQL, SUBMISSION_RESPONSES_SQL,
+                                      SUBMISSION_SORTS, batch_responses_query,
+                                      submission_count_query, submission_headers_query,
+                                      submission_list_query)
 
 admin_bp = Blueprint('admin', __name__, url_prefix="/api/admin")
 
+# Values accepted by the /submissions label filters
+STYLES = ("intuitive", "conceptual", "pragmatic", "deductive")
+STRENGTHS = ("slight", "solid", "strong")
+
 @admin_bp.route('/submissions', methods=['GET'])
 @admin_required
 def get_submissions():
-    """Get all submissions with optional filtering."""
+    """
+    Get submissions with optional filtering and sorting.
+    Filters: status, date_from, date_to, style, learning_strength,
+    application_strength and learning_/application_ min/max (inclusive).
+    `sort` is submission_time (default), learning_score or application_score,
+    `order` desc (default) or asc; score filters and sorts only return scored
+    (completed) submissions. Keyset-paginated on (sort value, submission_id):
+    pass `limit` and the `next_cursor` from the previous page as `cursor`.
+    `include_total=1` adds the filtered row count.
+    """
     try:
         # Get query parameters for filtering
         status = request.args.get('status')
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
+        style = request.args.get('style')
+        learning_strength = request.args.get('learning_strength')
+        application_strength = request.args.get('application_strength')
+        sort = request.args.get('sort', 'submission_time')
+        order = request.args.get('order', 'desc')
+        include_total = request.args.get('include_total') in ('1', 'true')
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            after = decode_cursor(request.args.get('cursor'), 2)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Build the SQL query with possible filters
-        query = "SELECT * FROM submissions"
-        params = []
-        
-        # Add WHERE clause if filters are provided
-        where_clauses = []
-        if status:
-            where_clauses.append("is_complete = ?")
-            params.append(int(status))
-        
-        if date_from:
-            where_clauses.append("submission_time >= ?")
-            params.append(date_from)
+        if sort not in SUBMISSION_SORTS:
+            return jsonify({"error": "sort must be one of " + ", ".join(SUBMISSION_SORTS)}), 400
+        if order not in ('asc', 'desc'):
+            return jsonify({"error": "order must be asc or desc"}), 400
+        if style and style not in STYLES:
+            return jsonify({"error": "style must be one of " + ", ".join(STYLES)}), 400
+        for strength in (learning_strength, application_strength):
+            if strength and strength not in STRENGTHS:
+                return jsonify({"error": "strength must be one of " + ", ".join(STRENGTHS)}), 400
         
-        if date_to:
-            where_clauses.append("submission_time <= ?")
-            params.append(date_to)
-        
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        filters = {
+            "status": int(status) if status else None,
+            "date_from": date_from or None,
+            "date_to": date_to or None,
+            "style": style or None,
+            "learning_strength": learning_strength or None,
+            "application_strength": application_strength or None,
+        }
+        for name in SCORE_RANGE_FILTERS:
+            value = request.args.get(name)
+            if value in (None, ''):
+                continue
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                return jsonify({"error": f"{name} must be an integer"}), 400
         
-        # Add ordering
-        query += " ORDER BY submission_time DESC"
+        # One extra row tells us whether there is another page
+        model_version = current_app.config["SCORING_MODEL"].version
+        query, params = submission_list_query(filters, model_version, sort, order, after,
+                                              limit + 1)
         
         # Execute the query
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
+        with db_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            total = None
+            if include_total:
+                count_query, count_params = submission_count_query(filters, model_version, sort)
+                total = conn.execute(count_query, count_params).fetchone()[0]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            sort_value = {"submission_time": rows[-1][3], "learning_score": rows[-1][5],
+                          "application_score": rows[-1][6]}[sort]
+            next_cursor = encode_cursor([sort_value, rows[-1][0]])
         
         # Convert to list of dictionaries
         submissions = []
-        for row in cursor.fetchall():
+        for row in rows:
             submissions.append({
                 "submission_id": row[0],
                 "user_name": row[1],
                 "user_email": row[2],
                 "submission_time": row[3],
-                "is_complete": bool(row[4])
+                "is_complete": bool(row[4]),
+                "learning_score": row[5],
+                "application_score": row[6],
+                "overall_style": row[7]
             })
         
-        conn.close()
+        result = {"submissions": submissions, "next_cursor": next_cursor, "limit": limit}
+        if include_total:
+            result["total"] = total
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_stats():
+    """
+    Dashboard summary read from the daily rollup tables: counts, completion
+    rate, the five most recent submissions, style distribution and
+    submissions per day (with average scores) over the last `days` days
+    (default 30).
+    """
+    try:
+        try:
+            days = min(max(int(request.args.get('days', 30)), 1), 365)
+        except ValueError:
+            return jsonify({"error": "days must be an integer"}), 400
+        
+        with db_connection() as conn:
+            totals = rollup_totals(conn)
+            
+            recent_rows = conn.execute(RECENT_SUBMISSIONS_SQL, (5,)).fetchall()
+            
+            styles = style_distribution(conn)
+            per_day = daily_series(conn, days)
+        
+        completed = totals["completed"]
+        total = totals["started"]
+        
+        return jsonify({
+            "total": total,
+            "completed": completed,
+            "in_progress": total - completed,
+            "completion_rate": (completed / total) if total else 0.0,
+            "recent_submissions": [{
+                "submission_id": row[0],
+                "user_name": row[1],
+                "submission_time": row[2],
+                "is_complete": bool(row[3])
+            } for row in recent_rows],
+            "style_distribution": {style: count for style, count in styles.items() if style},
+            "submissions_per_day": per_day
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/search', methods=['GET'])
+@admin_required
+def search_text_responses():
+    """
+    Full-text search over text responses, best matches first.
+    `q` is required (all words must match, `word*` for a prefix);
+    `question_id` restricts it to one question. Paginated like /submissions
+    with `limit` and `cursor`.
+    """
+    try:
+        match_query = build_match_query(request.args.get('q', ''))
+        if match_query is None:
+            return jsonify({"error": "q is required"}), 400
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            after = decode_cursor(request.args.get('cursor'), 2)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        with db_connection() as conn:
+            hits = search_responses(conn, match_query, limit + 1, after,
+                                    request.args.get('question_id'))
+        
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_cursor([hits[-1]["rank"], hits[-1]["response_id"]])
         
-        return jsonify({"submissions": submissions})
+        return jsonify({"results": hits, "next_cursor": next_cursor, "limit": limit})
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/distribution', methods=['GET'])
+@admin_required
+def get_distribution():
+    """
+    Score distribution of completed submissions: per-axis histograms, a 2-D
+    grid[application_bin][learning_bin] and quadrant shares. Optional filters:
+    date_from/date_to (YYYY-MM-DD, inclusive), cohort, and bin_width
+    (score points per bin, default 1).
+    """
+    try:
+        try:
+            bin_width = int(request.args.get('bin_width', 1))
+        except ValueError:
+            return jsonify({"error": "bin_width must be an integer"}), 400
+        try:
+            result = score_distribution.compute(
+                date_from=request.args.get('date_from'),
+                date_to=request.args.get('date_to'),
+                cohort=request.args.get('cohort'),
+                bin_width=bin_width)
+        except DistributionError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result)
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/item-analysis', methods=['GET'])
+@admin_required
+def get_item_analysis():
+    """
+    Reliability of the scale per category: Cronbach's alpha, and per item the
+    mean, variance, item-rest correlation and alpha if deleted (see
+    logic/item_analysis.py).
+    """
+    try:
+        with db_connection() as conn:
+            result = item_analysis(conn, current_app.config["SCORING_MODEL"])
+        return jsonify(result)
     
     except Exception as e:
+        print(f"Item analysis error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+# Admins must see edits and re-scoring straight away, so always revalidate
+DETAIL_CACHE_CONTROL = "private, no-cache"
+
+# Upper bound on IDs accepted by /submissions/batch in one request
+MAX_BATCH_SUBMISSIONS = 500
+
+def _submission_detail(header_row, response_rows, snapshot):
+    """Shape one submission (header row, response rows, snapshot) for the detail endpoints."""
+    return {
+        "submission_id": header_row[0],
+        "user_name": header_row[1],
+        "user_email": header_row[2],
+        "submission_time": header_row[3],
+        "is_complete": bool(header_row[4]),
+        "responses": [{
+            "question_id": row[0],
+            "numeric_response": row[1],
+            "text_response": row[2]
+        } for row in response_rows],
+        # Stored scores/labels (None until the submission is completed)
+        "scores": snapshot["scores"] if snapshot else None,
+        "labels": snapshot["labels"] if snapshot else None
+    }
+
 @admin_bp.route('/submissions/<submission_id>', methods=['GET'])
 @admin_required
 def get_submission_detail(submission_id):
-    """Get detailed information about a specific submission."""
+    """
+    Get detailed information about a specific submission.
+    Sends an ETag/Last-Modified from the submission's revision and answers
+    If-None-Match/If-Modified-Since with 304 before loading anything else.
+    """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Get submission header
-        cursor.execute("SELECT * FROM submissions WHERE submission_id = ?", (submission_id,))
-        submission_row = cursor.fetchone()
-        
-        if not submission_row:
-            conn.close()
-            return jsonify({"error": "Submission not found"}), 404
-        
-        submission = {
-            "submission_id": submission_row[0],
-            "user_name": submission_row[1],
-            "user_email": submission_row[2],
-            "submission_time": submission_row[3],
-            "is_complete": bool(submission_row[4])
-        }
+        with db_connection() as conn:
+            revision = load_submission_revision(submission_id, conn)
+            if revision is None:
+                return jsonify({"error": "Submission not found"}), 404
+            model_version = current_app.config["SCORING_MODEL"].version
+            etag = f"{revision['revision']}-{SCORING_VERSION}-{model_version}"
+            if is_not_modified(etag, revision["last_modified"]):
+                return not_modified(etag, revision["last_modified"], DETAIL_CACHE_CONTROL)
+            
+            cursor = conn.cursor()
+            
+            # Get submission header
+            cursor.execute(SUBMISSION_HEADER_SQL, (submission_id,))
+            submission_row = cursor.fetchone()
+            
+            if not submission_row:
+                return jsonify({"error": "Submission not found"}), 404
+            
+            # Get all responses for this submission
+            cursor.execute(SUBMISSION_RESPONSES_SQL, (submission_id,))
+            response_rows = cursor.fetchall()
+            
+            snapshot = load_score_snapshot(submission_id, model_version, conn)
         
-        # Get all responses for this submission
-        cursor.execute("""
-            SELECT question_id, numeric_response, text_response
-            FROM submission_responses
-            WHERE submission_id = ?
-        """, (submission_id,))
-        
-        responses = []
-        for row in cursor.fetchall():
-            responses.append({
-                "question_id": row[0],
-                "numeric_response": row[1],
-                "text_response": row[2]
-            })
+        response = jsonify(_submission_detail(submission_row, response_rows, snapshot))
+        return set_validators(response, etag, revision["last_modified"], DETAIL_CACHE_CONTROL)
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/submissions/batch', methods=['POST'])
+@admin_required
+def get_submission_details_batch():
+    """
+    Detail for many submissions at once: {"submission_ids": [...]} (up to
+    MAX_BATCH_SUBMISSIONS). Headers with their score snapshots and all
+    responses are read with one IN query each, and returned keyed by ID.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        submission_ids = data.get("submission_ids")
+        if (not isinstance(submission_ids, list)
+                or not all(isinstance(sid, str) for sid in submission_ids)):
+            return jsonify({"error": "submission_ids must be a list of strings"}), 400
+        submission_ids = list(dict.fromkeys(submission_ids))
+        if len(submission_ids) > MAX_BATCH_SUBMISSIONS:
+            return jsonify({
+                "error": f"At most {MAX_BATCH_SUBMISSIONS} submission_ids per request"
+            }), 400
+        if not submission_ids:
+            return jsonify({"submissions": {}, "not_found": []})
+        
+        with db_connection() as conn:
+            header_rows = conn.execute(*submission_headers_query(submission_ids)).fetchall()
+            response_rows = conn.execute(*batch_responses_query(submission_ids)).fetchall()
         
-        submission["responses"] = responses
+        responses_by_id = {}
+        for row in response_rows:
+            responses_by_id.setdefault(row[0], []).append(row[1:])
         
-        conn.close()
+        model_version = current_app.config["SCORING_MODEL"].version
+        submissions = {}
+        for row in header_rows:
+            submissions[row[0]] = _submission_detail(
+                row[:5], responses_by_id.get(row[0], []),
+                score_snapshot_from_row(row[5:], model_version))
         
-        return jsonify(submission)
+        return jsonify({
+            "submissions": submissions,
+            "not_found": [sid for sid in submission_ids if sid not in submissions]
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@admin_bp.route('/export', methods=['GET'])
+@admin_required
+def export_submissions():
+    """
+    Stream every submission as one wide row (answers to Q1..Qn plus scores).
+    `format` is csv (default) or ndjson; `status`, `date_from` and `date_to`
+    filter like /submissions. Rows are read in small chunks, so memory and
+    read transactions stay short however large the export is.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    
+    status = request.args.get('status')
+    try:
+        status = int(status) if status else None
+    except ValueError:
+        return jsonify({"error": "status must be 0 or 1"}), 400
+    
+    question_ids = [q["id"] for q in current_app.config["QUESTIONS"]]
+    rows = iter_export_rows(question_ids, current_app.config["SCORING_MODEL"].version,
+                            status=status,
+                            date_from=request.args.get('date_from'),
+                            date_to=request.args.get('date_to'))
+    if export_format == 'csv':
+        body = csv_stream(export_columns(question_ids), rows)
+        mimetype = "text/csv"
+    else:
+        body = ndjson_stream(rows)
+        mimetype = "application/x-ndjson"
+    
+    def generate():
+        # Headers are already sent once streaming starts, so a failure can
+        # only be logged and the stream cut short
+        try:
+            yield from body
+        except Exception as e:
+            print(f"Export error: {str(e)}")
+    
+    filename = f"submissions.{export_format}"
+    return current_app.response_class(
+        generate(), mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@admin_bp.route('/rescore', methods=['POST'])
+@admin_required
+def rescore_submissions():
+    """
+    Recompute the stored scores of every completed submission with the
+    current question bank (see logic/rescoring.py), then drop cached results.
+    """
+    try:
+        result = rescore_all(current_app.config["SCORING_MODEL"],
+                             progress=lambda done, total: print(f"Rescored {done}/{total}"))
+        results_cache.clear()
+        score_distribution.reset()
+        percentile_index.reset()
+        return jsonify(result)
     
     except Exception as e:
+        print(f"Rescore error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@admin_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Report runtime metrics for the backend (connection pool, etc.)."""
+    return jsonify({
+        "db_pool": pool_stats(),
+        "write_behind": response_writer_stats(),
+        "results_pipeline": results_pipeline_stats(),
+        "results_cache": results_cache.stats()
+    })
+
 @admin_bp.route('/simulate', methods=['POST'])
 @admin_required
 def simulate_results():
@@ -123,114 +441,15 @@ def simulate_results():
         learning_score = int(data.get('learning_score', 0))
         application_score = int(data.get('application_score', 0))
         
-        # Generate labels using the categorize_scores function
-        labels = categorize_scores(learning_score, application_score)
-        
-        # Get detailed profile based on the style and learning strength
-        style = labels["overall_style"]
-        strength = labels["learning_strength"]
-        detailed_profile = get_style_profile(style, strength)
-        
-        # Format the direction labels to match frontend expectations
-        learning_direction_label = f"to Learn Through {labels['learning_direction']}"
-        application_direction_label = f"to Apply Knowledge for {labels['application_direction']}"
-        
-        # Construct formatted labels
-        formatted_labels = {
-            "learning_direction": learning_direction_label,
-            "learning_strength": labels["learning_strength"],
-            "application_direction": application_direction_label,
-            "application_strength": labels["application_strength"],
-            "overall_style": labels["overall_style"].capitalize() + " Creative Style"
-        }
+        # Every reachable score pair is precomputed and pre-serialised
+        entry = get_result_table().lookup(learning_score, application_score)
+        if entry is not None:
+            return current_app.response_class(entry.simulation_json,
+                                              mimetype="application/json")
         
-        # Return structured response
-        return jsonify({
-            "scores": {
-                "learning_score": learning_score,
-                "application_score": application_score
-            },
-            "labels": formatted_labels,
-            "detailed_profile": detailed_profile,
-            "plot_url": None  # No plot for simulations
-        })
+        # Out-of-range scores: build the payload on the fly
+        return jsonify(build_simulation_result(learning_score, application_score))
     
     except Exception as e:
         print(f"Simulation error: {str(e)}")
         return jsonify({"error": str(e)}), 500
-        
-# Helper function to get style profile from creative_matrix.json
-def get_style_profile(style_id, strength_level):
-    """Get style profile data from creative_matrix.json"""
-    try:
-        matrix_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'creative_matrix.json')
-        with open(matrix_path, 'r') as f:
-            matrix_data = json.load(f)
-        
-        # Find the matching learning style
-        learning_style = None
-        for style in matrix_data["learningStyles"]:
-            if style["id"] == style_id.lower():
-                learning_style = style
-                break
-        
-        if not learning_style:
-            return {
-                "style_description": "Style not found",
-                "preference_description": "",
-                "application_preference_description": "",
-                "working_relationships": {
-                    "intuitives": "",
-                    "conceptuals": "",
-                    "pragmatists": "",
-                    "deductives": ""
-                },
-                "strengths": [""],
-                "weaknesses": [""]
-            }
-        
-        # Find preference descriptions based on strength level
-        preference_description = ""
-        application_preference_description = ""
-        
-        for pref in learning_style["preferences"]:
-            if pref["strengthLevel"] == strength_level.lower():
-                if pref["dimensionType"] == "learningMethod":
-                    preference_description = pref["description"]
-                elif pref["dimensionType"] == "knowledgeApplication":
-                    application_preference_description = pref["description"]
-        
-        # Convert strengths and weaknesses to arrays if they're strings
-        strengths = [learning_style["strengths"]] if isinstance(learning_style["strengths"], str) else learning_style["strengths"]
-        weaknesses = [learning_style["weaknesses"]] if isinstance(learning_style["weaknesses"], str) else learning_style["weaknesses"]
-        
-        # Return the detailed profile in the format expected by the frontend
-        return {
-            "style_description": learning_style["description"],
-            "preference_description": preference_description,
-            "application_preference_description": application_preference_description,
-            "working_relationships": {
-                "intuitives": learning_style["workingWith"].get("intuitive", ""),
-                "conceptuals": learning_style["workingWith"].get("conceptual", ""),
-                "pragmatists": learning_style["workingWith"].get("pragmatic", ""),
-                "deductives": learning_style["workingWith"].get("deductive", "")
-            },
-            "strengths": strengths,
-            "weaknesses": weaknesses
-        }
-        
-    except Exception as e:
-        print(f"Error loading style profile: {str(e)}")
-        return {
-            "style_description": f"Error: {str(e)}",
-            "preference_description": "",
-            "application_preference_description": "",
-            "working_relationships": {
-                "intuitives": "",
-                "conceptuals": "",
-                "pragmatists": "",
-                "deductives": ""
-            },
-            "strengths": [""],
-            "weaknesses": [""]
-        }
\ No newline at end of file
@@ -0,0 +1,91 @@
+# tests/conftest.py
+"""
+Shared fixtures. The app binds its connection pool to DATABASE_FILE when it
+is imported, so the whole session runs against one fresh database built by
+the migrations; tests create their own submissions and never depend on each
+other's rows. Run from the backend directory:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Set before any test module imports logic.db_helpers, which reads them once
+os.environ["DATABASE_FILE"] = os.path.join(tempfile.mkdtemp(prefix="cc-tests-"), "test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-not-for-production")
+os.environ["WRITE_BEHIND"] = "0"
+# app.py reads the question bank relative to the backend directory
+os.chdir(BACKEND_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def appmod():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(appmod):
+    return appmod.app.test_client()
+
+
+@pytest.fixture
+def model(appmod):
+    return appmod.scoring_model
+
+
+@pytest.fixture
+def admin_headers(appmod):
+    from auth.auth_utils import generate_token
+    return {"Authorization": f"Bearer {generate_token('admin')}"}
+
+
+@pytest.fixture
+def start_submission(client):
+    """Factory: start a submission (optionally in a cohort) and return its ID."""
+    def start(cohort=None):
+        response = client.post("/api/start", json={"name": "Test", "email": "test@example.com",
+                                                   "cohort": cohort})
+        assert response.status_code == 200
+        return response.get_json()["submission_id"]
+    return start
+
+
+@pytest.fixture
+def answer_sheet(model):
+    """Factory: {question_id: answer} for every scale question, drawn from `rng`."""
+    def answers(rng):
+        low, high = model.scale_range["min"], model.scale_range["max"]
+        return {question_id: int(rng.integers(low, high + 1)) for question_id in model.items}
+    return answers
+
+
+@pytest.fixture(scope="session")
+def complete_submission(appmod):
+    """
+    Factory: start a submission, submit `answers` ({question_id: answer}) and
+    complete it; returns its ID. Session-scoped so module fixtures can build
+    their populations with it.
+    """
+    client = appmod.app.test_client()
+
+    def complete(answers, cohort=None):
+        response = client.post("/api/start", json={"name": "Test", "email": "test@example.com",
+                                                   "cohort": cohort})
+        assert response.status_code == 200
+        submission_id = response.get_json()["submission_id"]
+        response = client.post("/api/submit-responses", json={
+            "submission_id": submission_id,
+            "responses": [{"question_id": q, "numeric_response": v} for q, v in answers.items()]})
+        assert response.status_code == 200
+        assert client.post(f"/api/complete/{submission_id}").status_code == 200
+        return submission_id
+    return complete
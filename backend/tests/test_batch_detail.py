@@ -0,0 +1,53 @@
+# tests/test_batch_detail.py
+
+import numpy as np
+
+from routes.admin_routes import MAX_BATCH_SUBMISSIONS
+
+
+def _batch(client, headers, submission_ids):
+    return client.post("/api/admin/submissions/batch", headers=headers,
+                       json={"submission_ids": submission_ids})
+
+
+def _by_question(detail):
+    return sorted(detail["responses"], key=lambda row: row["question_id"])
+
+
+def test_batch_matches_the_single_detail_endpoint(client, admin_headers, start_submission,
+                                                  complete_submission, answer_sheet):
+    rng = np.random.default_rng(17)
+    submission_ids = [complete_submission(answer_sheet(rng)) for _ in range(2)]
+    submission_ids.append(start_submission())
+
+    response = _batch(client, admin_headers, [*submission_ids, "missing", submission_ids[0]])
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["not_found"] == ["missing"]
+    assert set(body["submissions"]) == set(submission_ids)
+    for submission_id in submission_ids:
+        single = client.get(f"/api/admin/submissions/{submission_id}",
+                            headers=admin_headers).get_json()
+        batch = body["submissions"][submission_id]
+        assert _by_question(batch) == _by_question(single)
+        assert {k: v for k, v in batch.items() if k != "responses"} == \
+            {k: v for k, v in single.items() if k != "responses"}
+    assert body["submissions"][submission_ids[0]]["scores"] is not None
+    assert body["submissions"][submission_ids[2]]["scores"] is None
+
+
+def test_batch_enforces_its_id_cap(client, admin_headers):
+    at_cap = [f"cap-{i}" for i in range(MAX_BATCH_SUBMISSIONS)]
+    # Repeated IDs count once
+    response = _batch(client, admin_headers, at_cap + at_cap[:10])
+    assert response.status_code == 200
+    assert len(response.get_json()["not_found"]) == MAX_BATCH_SUBMISSIONS
+
+    assert _batch(client, admin_headers, at_cap + ["one-more"]).status_code == 400
+
+
+def test_batch_validates_its_body(client, admin_headers):
+    assert _batch(client, admin_headers, "abc").status_code == 400
+    assert _batch(client, admin_headers, [1, 2]).status_code == 400
+    assert _batch(client, admin_headers, []).get_json() == {"submissions": {}, "not_found": []}
+    assert _batch(client, {}, ["abc"]).status_code == 401
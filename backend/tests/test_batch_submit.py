@@ -0,0 +1,81 @@
+# tests/test_batch_submit.py
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+
+
+def _stored(submission_id):
+    with db_connection() as conn:
+        return {row[0]: row[1:] for row in conn.execute(
+            "SELECT question_id, numeric_response, text_response FROM submission_responses "
+            "WHERE submission_id = ?", (submission_id,))}
+
+
+def test_valid_items_are_saved_and_invalid_ones_reported(appmod, client, model,
+                                                         start_submission):
+    submission_id = start_submission()
+    scale_ids = list(model.items)[:2]
+    text_id = appmod.text_questions[0]["id"]
+    low, high = model.scale_range["min"], model.scale_range["max"]
+
+    response = client.post("/api/submit-responses", json={"submission_id": submission_id,
+                                                          "responses": [
+        {"question_id": scale_ids[0], "numeric_response": low},
+        {"question_id": scale_ids[1], "numeric_response": high + 1},
+        {"question_id": "no-such-question", "numeric_response": low},
+        {"question_id": text_id, "text_response": "Sketches first."},
+        "not an object",
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["status"], body["saved"]) == ("partial", 2)
+    assert [(r["index"], r["status"]) for r in body["results"]] == [
+        (0, "success"), (1, "error"), (2, "error"), (3, "success"), (4, "error")]
+    assert body["results"][1]["question_id"] == scale_ids[1]
+    assert _stored(submission_id) == {scale_ids[0]: (low, None),
+                                      text_id: (None, "Sketches first.")}
+
+
+def test_a_batch_of_valid_items_succeeds(client, model, start_submission, answer_sheet):
+    submission_id = start_submission()
+    answers = answer_sheet(np.random.default_rng(3))
+    response = client.post("/api/submit-responses", json={
+        "submission_id": submission_id,
+        "responses": [{"question_id": q, "numeric_response": v} for q, v in answers.items()]})
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "success"
+    assert response.get_json()["saved"] == len(answers)
+    assert _stored(submission_id) == {q: (v, None) for q, v in answers.items()}
+
+
+def test_a_batch_with_no_valid_items_saves_nothing(client, model, start_submission):
+    submission_id = start_submission()
+    question_id = next(iter(model.items))
+    response = client.post("/api/submit-responses", json={
+        "submission_id": submission_id,
+        "responses": [{"question_id": question_id, "numeric_response": "3"}]})
+
+    assert response.status_code == 400
+    assert (response.get_json()["status"], response.get_json()["saved"]) == ("error", 0)
+    assert _stored(submission_id) == {}
+
+
+def test_malformed_and_oversized_batches_are_rejected(appmod, client, model, start_submission):
+    submission_id = start_submission()
+    question_id = next(iter(model.items))
+    item = {"question_id": question_id, "numeric_response": model.scale_range["min"]}
+
+    assert client.post("/api/submit-responses",
+                       json={"submission_id": submission_id, "responses": []}).status_code == 400
+    assert client.post("/api/submit-responses",
+                       json={"responses": [item]}).status_code == 400
+    oversized = client.post("/api/submit-responses", json={
+        "submission_id": submission_id,
+        "responses": [item] * (appmod.MAX_BATCH_RESPONSES + 1)})
+    assert oversized.status_code == 400
+    assert client.post("/api/submit-responses", json={
+        "submission_id": "no-such-submission", "responses": [item]}).status_code == 404
+    assert _stored(submission_id) == {}
@@ -0,0 +1,86 @@
+# tests/test_distribution.py
+
+import numpy as np
+import pytest
+
+from logic.db_helpers import db_connection
+
+
+@pytest.fixture(scope="module")
+def cohort_scores(appmod, complete_submission):
+    """Scores of twelve completed submissions in their own cohort."""
+    model = appmod.scoring_model
+    rng = np.random.default_rng(19)
+    low, high = model.scale_range["min"], model.scale_range["max"]
+    scores = []
+    for _ in range(12):
+        # A per-submission lean spreads the population over the quadrants
+        lean = int(rng.integers(low, high + 1))
+        answers = {q: int(np.clip(lean + rng.integers(-2, 3), low, high)) for q in model.items}
+        complete_submission(answers, cohort="distribution")
+        scores.append(model.score(answers))
+    return scores
+
+
+def _distribution(client, headers, query):
+    response = client.get(f"/api/admin/distribution?cohort=distribution&{query}",
+                          headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _histogram(values, edges):
+    return [sum(edges[k] <= value < edges[k + 1] for value in values)
+            for k in range(len(edges) - 1)]
+
+
+@pytest.mark.parametrize("bin_width", [1, 4])
+def test_histograms_and_quadrants_match_the_scores(client, admin_headers, cohort_scores,
+                                                   bin_width):
+    result = _distribution(client, admin_headers, f"bin_width={bin_width}")
+    learning = [s["learning_score"] for s in cohort_scores]
+    application = [s["application_score"] for s in cohort_scores]
+    edges = result["bin_edges"]
+
+    assert result["count"] == len(cohort_scores)
+    assert {edges[k + 1] - edges[k] for k in range(len(edges) - 1)} == {bin_width}
+    assert result["learning_histogram"] == _histogram(learning, edges)
+    assert result["application_histogram"] == _histogram(application, edges)
+    expected_grid = np.zeros((len(edges) - 1, len(edges) - 1), dtype=int)
+    for a, l in zip(application, learning):
+        expected_grid[(a - edges[0]) // bin_width, (l - edges[0]) // bin_width] += 1
+    assert result["grid"] == expected_grid.tolist()
+
+    quadrants = {
+        "intuitive": sum(l >= 0 and a >= 0 for l, a in zip(learning, application)),
+        "conceptual": sum(l < 0 and a >= 0 for l, a in zip(learning, application)),
+        "pragmatic": sum(l < 0 and a < 0 for l, a in zip(learning, application)),
+        "deductive": sum(l >= 0 and a < 0 for l, a in zip(learning, application)),
+    }
+    assert {style: q["count"] for style, q in result["quadrants"].items()} == quadrants
+    assert result["quadrants"]["intuitive"]["share"] == pytest.approx(
+        quadrants["intuitive"] / len(cohort_scores))
+    assert result["mean"]["learning_score"] == pytest.approx(np.mean(learning))
+    assert result["mean"]["application_score"] == pytest.approx(np.mean(application))
+
+
+def test_new_completions_and_date_filters(client, admin_headers, cohort_scores,
+                                          complete_submission, answer_sheet):
+    before = _distribution(client, admin_headers, "")["count"]
+    complete_submission(answer_sheet(np.random.default_rng(190)), cohort="distribution")
+    assert _distribution(client, admin_headers, "")["count"] == before + 1
+
+    with db_connection() as conn:
+        today = conn.execute("SELECT date('now')").fetchone()[0]
+    assert _distribution(client, admin_headers, f"date_from={today}&date_to={today}"
+                         )["count"] == before + 1
+    empty = _distribution(client, admin_headers, "date_to=2000-01-01")
+    assert empty["count"] == 0
+    assert empty["mean"] == {"learning_score": None, "application_score": None}
+    assert all(q["share"] == 0.0 for q in empty["quadrants"].values())
+
+
+@pytest.mark.parametrize("query", ["bin_width=0", "bin_width=wide", "date_from=yesterday"])
+def test_bad_filters_are_rejected(client, admin_headers, query):
+    response = client.get(f"/api/admin/distribution?{query}", headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,81 @@
+# tests/test_export.py
+
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+
+from logic.export import export_columns, iter_export_rows
+
+
+@pytest.fixture
+def exported(appmod, client, model, start_submission, answer_sheet):
+    """A completed submission with scale and text answers, plus an empty one in progress."""
+    submission_id = start_submission()
+    answers = answer_sheet(np.random.default_rng(14))
+    text_id = appmod.text_questions[0]["id"]
+    client.post("/api/submit-responses", json={"submission_id": submission_id, "responses": [
+        *({"question_id": q, "numeric_response": v} for q, v in answers.items()),
+        {"question_id": text_id, "text_response": "Ideas, then, a plan"}]})
+    assert client.post(f"/api/complete/{submission_id}").status_code == 200
+    return submission_id, answers, text_id, start_submission()
+
+
+def _export(client, admin_headers, query=""):
+    response = client.get(f"/api/admin/export?{query}", headers=admin_headers)
+    assert response.status_code == 200
+    return response
+
+
+def test_ndjson_rows_pivot_answers_and_scores(appmod, client, admin_headers, model, exported):
+    submission_id, answers, text_id, in_progress = exported
+    rows = {row["submission_id"]: row for row in map(
+        json.loads, _export(client, admin_headers, "format=ndjson").get_data(as_text=True)
+        .splitlines())}
+
+    row = rows[submission_id]
+    assert list(row) == export_columns([q["id"] for q in appmod.all_questions])
+    assert row["is_complete"] is True
+    assert {q: row[q] for q in answers} == answers
+    assert row[text_id] == "Ideas, then, a plan"
+    assert all(row[q["id"]] is None for q in appmod.text_questions[1:])
+    scores = model.score(answers)
+    assert (row["learning_score"], row["application_score"]) == (scores["learning_score"],
+                                                                 scores["application_score"])
+    labels = client.get(f"/api/results/{submission_id}").get_json()["labels"]
+    assert row["overall_style"] == labels["overall_style"]
+
+    assert rows[in_progress]["is_complete"] is False
+    assert rows[in_progress]["learning_score"] is None
+
+
+def test_csv_has_one_column_per_question(appmod, client, admin_headers, exported):
+    submission_id, answers, text_id, _ = exported
+    response = _export(client, admin_headers)
+    assert response.mimetype == "text/csv"
+    reader = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert reader.fieldnames == export_columns([q["id"] for q in appmod.all_questions])
+
+    row = next(row for row in reader if row["submission_id"] == submission_id)
+    assert {q: row[q] for q in answers} == {q: str(v) for q, v in answers.items()}
+    assert row[text_id] == "Ideas, then, a plan"
+
+
+def test_status_filter_and_chunking(client, admin_headers, model, exported):
+    submission_id, _, _, in_progress = exported
+    open_rows = [json.loads(line) for line in _export(
+        client, admin_headers, "format=ndjson&status=0").get_data(as_text=True).splitlines()]
+    ids = {row["submission_id"] for row in open_rows}
+    assert in_progress in ids and submission_id not in ids
+    assert all(not row["is_complete"] for row in open_rows)
+
+    # Keyset chunks resume exactly where the previous one stopped
+    question_ids = list(model.items)
+    assert list(iter_export_rows(question_ids, model.version, chunk_size=3)) == \
+        list(iter_export_rows(question_ids, model.version))
+
+
+def test_unknown_format_is_rejected(client, admin_headers):
+    assert client.get("/api/admin/export?format=xml", headers=admin_headers).status_code == 400
@@ -0,0 +1,53 @@
+# tests/test_item_analysis.py
+
+import numpy as np
+import pytest
+
+from logic.db_helpers import db_connection
+from logic.item_analysis import ITEM_STATISTICS_SQL, item_analysis, rebuild_item_statistics
+
+
+@pytest.fixture(scope="module")
+def partial_submissions(appmod, complete_submission):
+    """Completed submissions that skipped some questions, for pairwise deletion."""
+    model = appmod.scoring_model
+    rng = np.random.default_rng(23)
+    low, high = model.scale_range["min"], model.scale_range["max"]
+    for _ in range(15):
+        answered = [q for q in model.items if rng.random() < 0.8]
+        complete_submission({q: int(rng.integers(low, high + 1)) for q in answered})
+
+
+def _statistics(conn):
+    return {row[:3]: row[3:] for row in conn.execute(ITEM_STATISTICS_SQL)}
+
+
+def test_incremental_statistics_match_the_rebuild(model, partial_submissions):
+    with db_connection() as conn:
+        incremental = _statistics(conn)
+        incremental_report = item_analysis(conn, model)
+        # A small chunk size so the rebuild flushes several matrices
+        rebuild_item_statistics(conn, model, chunk_size=4)
+        rebuilt = _statistics(conn)
+        rebuilt_report = item_analysis(conn, model)
+        conn.rollback()
+
+    assert incremental.keys() == rebuilt.keys()
+    for key, (n, sum_a, sum_b, sum_ab, version) in incremental.items():
+        assert rebuilt[key] == (n, pytest.approx(sum_a), pytest.approx(sum_b),
+                                pytest.approx(sum_ab), version)
+    assert _flatten(incremental_report) == pytest.approx(_flatten(rebuilt_report), nan_ok=True)
+
+
+def _flatten(value, prefix=""):
+    """{"a": {"b": 1}} -> {"a.b": 1}, lists indexed, for an approximate comparison."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix: value}
+    flat = {}
+    for key, item in items:
+        flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
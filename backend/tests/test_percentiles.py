@@ -0,0 +1,81 @@
+# tests/test_percentiles.py
+
+import numpy as np
+import pytest
+
+from logic.db_helpers import db_connection
+from logic.percentiles import AXES, PercentileIndex
+from logic.results_cache import results_cache
+from logic.scoring import SCORING_VERSION
+
+
+@pytest.fixture(scope="module")
+def cohort_submissions(appmod, complete_submission):
+    """Twenty-four completed submissions over two cohorts and none."""
+    model = appmod.scoring_model
+    rng = np.random.default_rng(24)
+    low, high = model.scale_range["min"], model.scale_range["max"]
+    for i in range(24):
+        complete_submission({q: int(rng.integers(low, high + 1)) for q in model.items},
+                            cohort=("red", "blue", None)[i % 3])
+
+
+def _brute_force_rank(population, score):
+    """Mid-rank percentile of `score` among `population`."""
+    below = sum(1 for value in population if value < score)
+    equal = sum(1 for value in population if value == score)
+    return round(100 * (below + equal / 2) / len(population))
+
+
+def test_lookup_matches_brute_force_rank(model, cohort_submissions):
+    index = PercentileIndex(model.score_bound, refresh_interval=0, model_version=model.version)
+    with db_connection() as conn:
+        rows = conn.execute("SELECT sc.learning_score, sc.application_score, s.cohort "
+                            "FROM submission_scores sc "
+                            "JOIN submissions s ON s.submission_id = sc.submission_id "
+                            "WHERE sc.scoring_version = ? AND sc.model_version = ?",
+                            (SCORING_VERSION, model.version)).fetchall()
+
+    for cohort in ("red", "blue"):
+        members = [row for row in rows if row[2] == cohort]
+        for score in range(-model.score_bound, model.score_bound + 1, 3):
+            scores = {"learning_score": score, "application_score": -score}
+            result = index.lookup(scores, cohort)
+            for axis, field in enumerate(AXES):
+                assert result["overall"][field] == _brute_force_rank(
+                    [row[axis] for row in rows], scores[field])
+                assert result["cohort"][field] == _brute_force_rank(
+                    [row[axis] for row in members], scores[field])
+
+
+def test_generation_moves_only_when_counts_change(model, complete_submission, answer_sheet,
+                                                  cohort_submissions):
+    index = PercentileIndex(model.score_bound, refresh_interval=0, model_version=model.version)
+    index.refresh()
+    generation = index.generation
+    index.refresh()
+    assert index.generation == generation
+
+    complete_submission(answer_sheet(np.random.default_rng(1)))
+    assert index.refresh() == 1
+    assert index.generation == generation + 1
+
+    index.reset()
+    assert index.generation == generation + 2
+
+
+def test_revalidation_answers_304_without_scoring(appmod, client, monkeypatch,
+                                                  complete_submission, answer_sheet):
+    submission_id = complete_submission(answer_sheet(np.random.default_rng(2)))
+    first = client.get(f"/api/results/{submission_id}")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == appmod.COMPLETED_RESULTS_CACHE_CONTROL
+
+    runs = []
+    monkeypatch.setattr(appmod.results_pipeline, "run",
+                        lambda *args, **kwargs: runs.append(args))
+    results_cache.invalidate(submission_id)
+    again = client.get(f"/api/results/{submission_id}",
+                       headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert runs == []
@@ -0,0 +1,78 @@
+# tests/test_rescoring.py
+
+import sqlite3
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+from logic.migrations import apply_migrations
+from logic.rescoring import rescore_chunk
+from logic.scoring import (LOAD_SCORE_SNAPSHOT_SQL, categorize_scores, score_snapshot_from_row,
+                           save_score_snapshot)
+
+
+def _stored_answers(conn, submission_id):
+    return dict(conn.execute("SELECT question_id, numeric_response FROM submission_responses "
+                             "WHERE submission_id = ? AND numeric_response IS NOT NULL",
+                             (submission_id,)))
+
+
+def test_chunked_rescore_matches_model_score(tmp_path, model, answer_sheet):
+    conn = sqlite3.connect(tmp_path / "rescore.db")
+    try:
+        apply_migrations(conn)
+        rng = np.random.default_rng(15)
+        expected = {}
+        for i in range(23):
+            submission_id = f"s-{i:02d}"
+            # Some submissions skip questions; every fifth is still in progress
+            answers = {q: v for q, v in answer_sheet(rng).items() if rng.random() < 0.9}
+            conn.execute("INSERT INTO submissions (submission_id, user_name, is_complete) "
+                         "VALUES (?, '', ?)", (submission_id, int(i % 5 != 4)))
+            conn.executemany("INSERT INTO submission_responses (submission_id, question_id, "
+                             "numeric_response) VALUES (?, ?, ?)",
+                             [(submission_id, q, v) for q, v in answers.items()])
+            conn.execute("INSERT INTO submission_responses (submission_id, question_id, "
+                         "text_response) VALUES (?, 'T1', 'words')", (submission_id,))
+            if i % 5 != 4:
+                expected[submission_id] = model.score(answers)
+        # A stale snapshot is overwritten
+        stale = {"learning_score": 99, "application_score": -99}
+        save_score_snapshot(conn, "s-00", stale, categorize_scores(**stale), "old-bank")
+
+        after, chunks = "", 0
+        while after is not None:
+            _, after = rescore_chunk(conn, model, after, chunk_size=4)
+            chunks += 1
+        assert chunks == 1 + (len(expected) + 3) // 4
+
+        for submission_id, scores in expected.items():
+            row = conn.execute(LOAD_SCORE_SNAPSHOT_SQL, (submission_id,)).fetchone()
+            snapshot = score_snapshot_from_row(row, model.version)
+            assert snapshot["scores"] == scores
+            assert snapshot["labels"] == categorize_scores(**scores)
+        assert conn.execute("SELECT COUNT(*) FROM submission_scores").fetchone()[0] == len(expected)
+    finally:
+        conn.close()
+
+
+def test_rescore_endpoint_stores_model_scores(client, admin_headers, model, complete_submission,
+                                              answer_sheet):
+    rng = np.random.default_rng(16)
+    submission_ids = [complete_submission(answer_sheet(rng)) for _ in range(3)]
+    with db_connection() as conn:
+        conn.execute("UPDATE submission_scores SET learning_score = learning_score + 1 "
+                     "WHERE submission_id = ?", (submission_ids[0],))
+
+    response = client.post("/api/admin/rescore", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()["model_version"] == model.version
+
+    with db_connection() as conn:
+        for submission_id in submission_ids:
+            row = conn.execute(LOAD_SCORE_SNAPSHOT_SQL, (submission_id,)).fetchone()
+            assert score_snapshot_from_row(row, model.version)["scores"] == \
+                model.score(_stored_answers(conn, submission_id))
+    scores = client.get(f"/api/results/{submission_ids[0]}").get_json()["scores"]
+    with db_connection() as conn:
+        assert scores == model.score(_stored_answers(conn, submission_ids[0]))
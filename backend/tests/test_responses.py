@@ -0,0 +1,58 @@
+# tests/test_responses.py
+
+import sqlite3
+
+import pytest
+
+from logic.db_helpers import db_connection
+from logic.migrations import apply_migrations
+
+
+def test_dedup_migration_keeps_the_latest_answer(tmp_path):
+    conn = sqlite3.connect(tmp_path / "dedup.db")
+    try:
+        apply_migrations(conn, target=2)
+        conn.execute("INSERT INTO submissions (submission_id, user_name) VALUES ('s', '')")
+        # (id, question, answer, response_time): q1's latest answer was inserted
+        # first; q2's two latest answers tie on time, so the higher id wins
+        conn.executemany("INSERT INTO submission_responses (id, submission_id, question_id, "
+                         "numeric_response, response_time) VALUES (?, 's', ?, ?, ?)", [
+            (1, "q1", 5, "2024-03-02 10:00:00"),
+            (2, "q1", 1, "2024-03-01 10:00:00"),
+            (3, "q2", 2, "2024-03-01 10:00:00"),
+            (4, "q2", 3, "2024-03-02 10:00:00"),
+            (5, "q2", 4, "2024-03-02 10:00:00"),
+            (6, "q3", 6, "2024-03-01 10:00:00"),
+        ])
+        conn.commit()
+
+        apply_migrations(conn, target=3)
+
+        rows = conn.execute("SELECT question_id, id, numeric_response FROM submission_responses "
+                            "ORDER BY question_id").fetchall()
+        assert rows == [("q1", 1, 5), ("q2", 5, 4), ("q3", 6, 6)]
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO submission_responses (submission_id, question_id) "
+                         "VALUES ('s', 'q1')")
+    finally:
+        conn.close()
+
+
+def test_a_changed_answer_replaces_the_stored_one(client, model, start_submission):
+    submission_id = start_submission()
+    question_id = next(iter(model.items))
+    low, high = model.scale_range["min"], model.scale_range["max"]
+
+    for value in (low, high):
+        response = client.post("/api/submit-response", json={
+            "submission_id": submission_id, "question_id": question_id, "numeric_response": value})
+        assert response.status_code == 200
+    client.post("/api/submit-responses", json={"submission_id": submission_id, "responses": [
+        {"question_id": question_id, "numeric_response": low}]})
+
+    with db_connection() as conn:
+        rows = conn.execute("SELECT numeric_response FROM submission_responses "
+                            "WHERE submission_id = ?", (submission_id,)).fetchall()
+    assert rows == [(low,)]
+    scores = client.get(f"/api/results/{submission_id}").get_json()["scores"]
+    assert scores == model.score({question_id: low})
@@ -0,0 +1,124 @@
+# tests/test_results_cache.py
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from logic.creative_matrix import MATRIX_PATH, creative_matrix_repository
+from logic.results_cache import ResultsCache
+
+TIMEOUT = 5
+
+
+def _in_thread(target):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", target()))
+    thread.start()
+    return thread, result
+
+
+def test_invalidation_during_compute_is_not_cached():
+    cache = ResultsCache()
+    data = {"version": 1}
+    started, release = threading.Event(), threading.Event()
+
+    def slow_read():
+        value = data["version"]
+        started.set()
+        assert release.wait(TIMEOUT)
+        return value
+
+    leader, leader_result = _in_thread(lambda: cache.get_or_compute("s1", slow_read))
+    assert started.wait(TIMEOUT)
+    # A caller that arrived before the write shares the leader's computation
+    waiter, waiter_result = _in_thread(
+        lambda: cache.get_or_compute("s1", lambda: "not called"))
+    while cache.stats()["coalesced"] < 1:
+        time.sleep(0.001)
+
+    # The write lands while the leader is still computing from the old data
+    data["version"] = 2
+    cache.invalidate("s1")
+    # A read after the write must not join the stale computation
+    assert cache.get_or_compute("s1", lambda: data["version"]) == 2
+
+    release.set()
+    leader.join(TIMEOUT)
+    waiter.join(TIMEOUT)
+    assert leader_result["value"] == 1
+    assert waiter_result["value"] == 1
+    # The stale value did not overwrite the fresh one
+    assert cache.get_or_compute("s1", lambda: "not called") == 2
+
+
+def test_write_during_results_compute_is_seen_by_the_next_read(appmod, client, monkeypatch,
+                                                               start_submission, model):
+    submission_id = start_submission()
+    question_id = next(iter(model.items))
+    high = model.scale_range["max"]
+    low = model.scale_range["min"]
+    client.post("/api/submit-response", json={"submission_id": submission_id,
+                                              "question_id": question_id,
+                                              "numeric_response": low})
+
+    run = appmod.results_pipeline.run
+    fetched, release = threading.Event(), threading.Event()
+
+    def paused_run(*args, **kwargs):
+        report = run(*args, **kwargs)
+        fetched.set()
+        assert release.wait(TIMEOUT)
+        return report
+
+    monkeypatch.setattr(appmod.results_pipeline, "run", paused_run)
+    reader, _ = _in_thread(lambda: appmod.app.test_client().get(f"/api/results/{submission_id}"))
+    assert fetched.wait(TIMEOUT)
+
+    client.post("/api/submit-response", json={"submission_id": submission_id,
+                                              "question_id": question_id,
+                                              "numeric_response": high})
+    release.set()
+    reader.join(TIMEOUT)
+    monkeypatch.setattr(appmod.results_pipeline, "run", run)
+
+    expected = model.score({question_id: high})
+    scores = client.get(f"/api/results/{submission_id}").get_json()["scores"]
+    assert scores == expected
+
+
+def test_matrix_edit_replaces_cached_profile_and_etag(client, monkeypatch, tmp_path,
+                                                      start_submission, answer_sheet):
+    # A private copy of the matrix file, checked on every access
+    path = tmp_path / "creative_matrix.json"
+    with open(MATRIX_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setattr(creative_matrix_repository, "path", str(path))
+    monkeypatch.setattr(creative_matrix_repository, "check_interval", 0)
+    monkeypatch.setattr(creative_matrix_repository, "_matrix", None)
+
+    submission_id = start_submission()
+    client.post("/api/submit-responses", json={"submission_id": submission_id, "responses": [
+        {"question_id": q, "numeric_response": v}
+        for q, v in answer_sheet(np.random.default_rng(20)).items()]})
+    first = client.get(f"/api/results/{submission_id}")
+    style = first.get_json()["labels"]["overall_style"]
+
+    for entry in data["learningStyles"]:
+        if entry["id"] == style:
+            entry["description"] = "Edited description."
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    second = client.get(f"/api/results/{submission_id}",
+                        headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.get_json()["detailed_profile"]["style_description"] == "Edited description."
+    assert second.headers["ETag"] != first.headers["ETag"]
+    third = client.get(f"/api/results/{submission_id}",
+                       headers={"If-None-Match": second.headers["ETag"]})
+    assert third.status_code == 304
@@ -0,0 +1,54 @@
+# tests/test_rollups.py
+
+import sqlite3
+
+import numpy as np
+
+from logic.migrations import apply_migrations
+from logic.rollups import (daily_series, record_completed, record_started, rebuild_rollups,
+                           rollup_totals, style_distribution)
+from logic.scoring import categorize_scores, save_score_snapshot
+
+
+def _tables(conn):
+    return (conn.execute("SELECT * FROM daily_rollups ORDER BY day").fetchall(),
+            conn.execute("SELECT * FROM style_rollups ORDER BY day, overall_style").fetchall())
+
+
+def test_incremental_rollups_match_the_rebuild(tmp_path, model):
+    conn = sqlite3.connect(tmp_path / "rollups.db")
+    try:
+        apply_migrations(conn)
+        rng = np.random.default_rng(13)
+        bound = model.score_bound
+        expected_styles = {}
+        for i in range(40):
+            submission_id = f"r-{i}"
+            day = f"2024-05-{1 + i % 4:02d}"
+            conn.execute("INSERT INTO submissions (submission_id, user_name, submission_time) "
+                         "VALUES (?, '', ?)", (submission_id, f"{day} 12:{i:02d}:00"))
+            record_started(conn, submission_id)
+            if i % 5 == 4:
+                continue
+            scores = {"learning_score": int(rng.integers(-bound, bound + 1)),
+                      "application_score": int(rng.integers(-bound, bound + 1))}
+            labels = categorize_scores(**scores)
+            conn.execute("UPDATE submissions SET is_complete = 1 WHERE submission_id = ?",
+                         (submission_id,))
+            save_score_snapshot(conn, submission_id, scores, labels, model.version)
+            record_completed(conn, submission_id, scores, labels)
+            style = labels["overall_style"]
+            expected_styles[style] = expected_styles.get(style, 0) + 1
+        conn.commit()
+
+        assert rollup_totals(conn) == {"started": 40, "completed": 32}
+        assert style_distribution(conn) == expected_styles
+        series = daily_series(conn, 100000)
+        assert [day["started"] for day in series] == [10, 10, 10, 10]
+        assert [day["completed"] for day in series] == [8, 8, 8, 8]
+
+        incremental = _tables(conn)
+        rebuild_rollups(conn)
+        assert _tables(conn) == incremental
+    finally:
+        conn.close()
@@ -0,0 +1,69 @@
+# tests/test_search.py
+
+from logic.db_helpers import db_connection
+from logic.search import build_match_query
+
+
+def _answer(client, submission_id, question_id, text):
+    response = client.post("/api/submit-response", json={
+        "submission_id": submission_id, "question_id": question_id, "text_response": text})
+    assert response.status_code == 200
+
+
+def _search(client, headers, query):
+    response = client.get(f"/api/admin/search?{query}", headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_index_follows_an_edited_answer(appmod, client, admin_headers, start_submission):
+    submission_id = start_submission()
+    question_id = appmod.text_questions[0]["id"]
+    _answer(client, submission_id, question_id, "I start with charcoal quokkasketch drawings")
+    first = _search(client, admin_headers, "q=quokkasketch")["results"]
+    assert [hit["submission_id"] for hit in first] == [submission_id]
+    assert "[quokkasketch]" in first[0]["snippet"]
+
+    # The upsert rewrites the same row, so the old words must leave the index
+    _answer(client, submission_id, question_id, "Now I model in clay quokkasculpt first")
+    assert _search(client, admin_headers, "q=quokkasketch")["results"] == []
+    second = _search(client, admin_headers, "q=quokkasculpt")["results"]
+    assert [hit["response_id"] for hit in second] == [first[0]["response_id"]]
+    with db_connection() as conn:
+        conn.execute("INSERT INTO response_text_fts (response_text_fts) VALUES ('integrity-check')")
+
+
+def test_prefix_filter_and_pages(appmod, client, admin_headers, start_submission):
+    questions = [q["id"] for q in appmod.text_questions[:2]]
+    expected = set()
+    for i in range(5):
+        submission_id = start_submission()
+        for question_id in questions:
+            _answer(client, submission_id, question_id, f"wombatpaint number {i} on {question_id}")
+            expected.add((submission_id, question_id))
+
+    assert {(hit["submission_id"], hit["question_id"]) for hit in _search(
+        client, admin_headers, "q=wombatpa*&limit=100")["results"]} == expected
+    filtered = _search(client, admin_headers, f"q=wombatpaint&question_id={questions[1]}")
+    assert {hit["question_id"] for hit in filtered["results"]} == {questions[1]}
+    assert len(filtered["results"]) == 5
+
+    hits, cursor = [], ""
+    while True:
+        page = _search(client, admin_headers, f"q=wombatpaint&limit=3&cursor={cursor}")
+        hits.extend(page["results"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(hits) == len(expected)
+    assert {hit["response_id"] for hit in hits} == {hit["response_id"] for hit in _search(
+        client, admin_headers, "q=wombatpaint&limit=100")["results"]}
+    ranks = [(hit["rank"], hit["response_id"]) for hit in hits]
+    assert ranks == sorted(ranks)
+
+
+def test_query_syntax_in_input_is_treated_as_words(client, admin_headers):
+    assert build_match_query('clay OR "paint* -x') == '"clay" "OR" "paint"* "x"'
+    assert build_match_query("  *** ") is None
+    assert _search(client, admin_headers, 'q=wombatpaint NEAR(")')["results"] == []
+    assert client.get("/api/admin/search?q=", headers=admin_headers).status_code == 400
@@ -0,0 +1,42 @@
+# tests/test_snapshot_versions.py
+"""Outdated score snapshots are left out of every aggregate and export."""
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+from logic.distribution import ScoreDistribution
+from logic.export import iter_export_rows
+from logic.percentiles import PercentileIndex
+
+
+def test_outdated_snapshots_are_not_counted_or_exported(model, complete_submission,
+                                                        answer_sheet):
+    rng = np.random.default_rng(19)
+    submission_ids = [complete_submission(answer_sheet(rng), cohort="versions")
+                      for _ in range(3)]
+    retired = submission_ids[0]
+    with db_connection() as conn:
+        conn.execute("UPDATE submission_scores SET model_version = 'retired' "
+                     "WHERE submission_id = ?", (retired,))
+
+    distribution = ScoreDistribution(model_version=model.version)
+    assert distribution.compute(cohort="versions")["count"] == 2
+
+    # The retired submission's own score ranks as if it had never been counted
+    with db_connection() as conn:
+        scores = {row[0]: row[1] for row in conn.execute(
+            "SELECT submission_id, learning_score FROM submission_scores "
+            "WHERE submission_id IN (?, ?, ?)", submission_ids)}
+    counted = [scores[s] for s in submission_ids[1:]]
+    retired_score = scores[retired]
+    expected = round(100 * (sum(v < retired_score for v in counted)
+                            + sum(v == retired_score for v in counted) / 2) / len(counted))
+    index = PercentileIndex(model.score_bound, refresh_interval=0, model_version=model.version)
+    ranks = index.lookup({"learning_score": retired_score, "application_score": 0}, "versions")
+    assert ranks["cohort"]["learning_score"] == expected
+
+    rows = {row["submission_id"]: row for row in iter_export_rows(list(model.items), model.version)
+            if row["submission_id"] in submission_ids}
+    assert rows[retired]["learning_score"] is None
+    assert rows[retired]["overall_style"] is None
+    assert all(rows[s]["learning_score"] is not None for s in submission_ids[1:])
@@ -0,0 +1,89 @@
+# tests/test_snapshots.py
+
+import numpy as np
+
+from logic.db_helpers import db_connection
+from logic.results_cache import results_cache
+from logic.scoring import categorize_scores, load_score_snapshot, save_score_snapshot
+
+
+def test_snapshot_from_another_model_is_ignored(client, model, complete_submission,
+                                                answer_sheet):
+    answers = answer_sheet(np.random.default_rng(2))
+    submission_id = complete_submission(answers)
+    expected = model.score(answers)
+    assert load_score_snapshot(submission_id, model.version)["scores"] == expected
+
+    # Same SCORING_VERSION, different question bank: the stored scores are stale
+    wrong = {"learning_score": expected["learning_score"] + 1,
+             "application_score": expected["application_score"]}
+    with db_connection() as conn:
+        save_score_snapshot(conn, submission_id, wrong, categorize_scores(**wrong), "other-bank")
+
+    assert load_score_snapshot(submission_id, "other-bank")["scores"] == wrong
+    assert load_score_snapshot(submission_id, model.version) is None
+    results_cache.invalidate(submission_id)
+    assert client.get(f"/api/results/{submission_id}").get_json()["scores"] == expected
+
+
+def test_migration_backfills_snapshots_for_completed_submissions(tmp_path, model, answer_sheet):
+    import sqlite3
+    from logic.migrations import apply_migrations
+    from logic.scoring import score_snapshot_from_row, LOAD_SCORE_SNAPSHOT_SQL
+
+    conn = sqlite3.connect(tmp_path / "upgrade.db")
+    try:
+        # A database from before snapshots were backfilled: completed
+        # submissions without one, plus one whose snapshot predates model_version
+        apply_migrations(conn, target=13)
+        rng = np.random.default_rng(3)
+        expected = {}
+        for i in range(5):
+            submission_id = f"old-{i}"
+            answers = answer_sheet(rng)
+            conn.execute("INSERT INTO submissions (submission_id, user_name, is_complete) "
+                         "VALUES (?, '', ?)", (submission_id, int(i < 4)))
+            conn.executemany("INSERT INTO submission_responses (submission_id, question_id, "
+                             "numeric_response) VALUES (?, ?, ?)",
+                             [(submission_id, q, v) for q, v in answers.items()])
+            if i < 4:
+                expected[submission_id] = model.score(answers)
+        conn.execute("INSERT INTO submission_scores (submission_id, learning_score, "
+                     "application_score, overall_style, scoring_version) "
+                     "VALUES ('old-0', 99, 99, 'intuitive', '1')")
+        conn.commit()
+
+        assert apply_migrations(conn)[:2] == [14, 15]
+
+        for submission_id, scores in expected.items():
+            row = conn.execute(LOAD_SCORE_SNAPSHOT_SQL, (submission_id,)).fetchone()
+            assert score_snapshot_from_row(row, model.version)["scores"] == scores
+        assert conn.execute("SELECT COUNT(*) FROM submission_scores "
+                            "WHERE submission_id = 'old-4'").fetchone()[0] == 0
+        completed = conn.execute("SELECT SUM(completed) FROM style_rollups").fetchone()[0]
+        assert completed == len(expected)
+    finally:
+        conn.close()
+
+
+def test_completed_submissions_reject_response_writes(client, model, complete_submission,
+                                                       answer_sheet):
+    answers = answer_sheet(np.random.default_rng(4))
+    submission_id = complete_submission(answers)
+    question_id = next(iter(answers))
+    changed = model.scale_range["max"] if answers[question_id] != model.scale_range["max"] \
+        else model.scale_range["min"]
+
+    single = client.post("/api/submit-response", json={
+        "submission_id": submission_id, "question_id": question_id, "numeric_response": changed})
+    batch = client.post("/api/submit-responses", json={
+        "submission_id": submission_id,
+        "responses": [{"question_id": question_id, "numeric_response": changed}]})
+    assert (single.status_code, batch.status_code) == (409, 409)
+
+    # The snapshot still scores the stored answers
+    with db_connection() as conn:
+        stored = dict(conn.execute("SELECT question_id, numeric_response FROM submission_responses "
+                                   "WHERE submission_id = ?", (submission_id,)))
+    assert stored[question_id] == answers[question_id]
+    assert load_score_snapshot(submission_id, model.version)["scores"] == model.score(answers)
@@ -0,0 +1,49 @@
+# tests/test_stats.py
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from logic.db_helpers import db_connection
+
+
+def _today(stats):
+    with db_connection() as conn:
+        today = conn.execute("SELECT date('now')").fetchone()[0]
+    return next((day for day in stats["submissions_per_day"] if day["day"] == today), None)
+
+
+def test_stats_count_starts_completions_and_styles(client, admin_headers, start_submission,
+                                                   complete_submission, answer_sheet):
+    before = client.get("/api/admin/stats", headers=admin_headers).get_json()
+
+    rng = np.random.default_rng(12)
+    start_submission()
+    completed = [complete_submission(answer_sheet(rng)) for _ in range(3)]
+    results = [client.get(f"/api/results/{s}").get_json() for s in completed]
+    styles = Counter(result["labels"]["overall_style"] for result in results)
+
+    after = client.get("/api/admin/stats", headers=admin_headers).get_json()
+    assert after["total"] == before["total"] + 4
+    assert after["completed"] == before["completed"] + 3
+    assert after["in_progress"] == before["in_progress"] + 1
+    assert after["completion_rate"] == pytest.approx(after["completed"] / after["total"])
+    for style in set(after["style_distribution"]) | set(before["style_distribution"]):
+        assert (after["style_distribution"].get(style, 0)
+                - before["style_distribution"].get(style, 0)) == styles[style]
+
+    day_before, day_after = _today(before), _today(after)
+    started_before = day_before["started"] if day_before else 0
+    assert day_after["started"] == started_before + 4
+    assert day_after["avg_learning_score"] is not None
+
+    recent = after["recent_submissions"]
+    assert len(recent) == min(5, after["total"])
+    keys = [(row["submission_time"], row["submission_id"]) for row in recent]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_stats_validate_days(client, admin_headers):
+    assert client.get("/api/admin/stats?days=soon", headers=admin_headers).status_code == 400
+    assert client.get("/api/admin/stats").status_code == 401
@@ -0,0 +1,95 @@
+# tests/test_totals.py
+
+import copy
+import json
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from logic.db_helpers import db_connection, save_responses
+from logic.migrations import apply_migrations
+from logic.rescoring import rescore_chunk
+from logic.scoring import LOAD_SCORE_SNAPSHOT_SQL, score_snapshot_from_row
+from logic.scoring_model import SCALE_QUESTIONS_PATH, compile_scoring_model
+from logic.totals import load_running_totals, rebuild_running_totals
+
+WRITERS = 8
+ROUNDS = 40
+
+
+def test_totals_match_full_scoring_under_concurrent_writers(start_submission, model):
+    submission_ids = [start_submission() for _ in range(3)]
+    question_ids = list(model.items)[:6]
+    low, high = model.scale_range["min"], model.scale_range["max"]
+    errors = []
+    barrier = threading.Barrier(WRITERS)
+
+    def writer(seed):
+        # Every writer keeps re-answering the same few questions, so their
+        # read-old-value / upsert windows overlap
+        rng = np.random.default_rng(seed)
+        try:
+            barrier.wait()
+            for _ in range(ROUNDS):
+                rows = [(submission_id, question_id, int(rng.integers(low, high + 1)), None)
+                        for submission_id in submission_ids
+                        for question_id in rng.choice(question_ids, 3, replace=False)]
+                with db_connection() as conn:
+                    save_responses(conn, rows, model)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+    with db_connection() as conn:
+        for submission_id in submission_ids:
+            responses = dict(conn.execute(
+                "SELECT question_id, numeric_response FROM submission_responses "
+                "WHERE submission_id = ? AND numeric_response IS NOT NULL", (submission_id,)))
+            assert load_running_totals(conn, submission_id, model) == model.score(responses)
+
+
+def _bank(categories):
+    with open(SCALE_QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        bank = copy.deepcopy(json.load(f))
+    bank["metadata"]["categories"] = categories
+    return bank
+
+
+def test_axis_order_follows_the_score_columns(tmp_path, model, answer_sheet):
+    # Same questions, categories listed the other way round
+    reversed_model = compile_scoring_model(_bank(list(reversed(model.axes))))
+    assert reversed_model.axes == tuple(reversed(model.axes))
+    answers = answer_sheet(np.random.default_rng(22))
+    expected = model.score(answers)
+    assert reversed_model.score(answers) == expected
+
+    conn = sqlite3.connect(tmp_path / "reversed.db")
+    try:
+        apply_migrations(conn)
+        conn.execute("INSERT INTO submissions (submission_id, user_name, is_complete) "
+                     "VALUES ('s1', '', 1)")
+        save_responses(conn, [("s1", q, v, None) for q, v in answers.items()], reversed_model)
+        assert load_running_totals(conn, "s1", reversed_model) == expected
+
+        rebuild_running_totals(conn, reversed_model)
+        assert load_running_totals(conn, "s1", reversed_model) == expected
+
+        rescore_chunk(conn, reversed_model)
+        row = conn.execute(LOAD_SCORE_SNAPSHOT_SQL, ("s1",)).fetchone()
+        assert score_snapshot_from_row(row, reversed_model.version)["scores"] == expected
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("categories", [["Learning"], ["Learning", "Application", "Delivery"]])
+def test_banks_without_the_stored_axes_are_rejected(categories):
+    with pytest.raises(ValueError):
+        compile_scoring_model(_bank(categories))
@@ -0,0 +1,81 @@
+# tests/test_write_behind.py
+
+import numpy as np
+import pytest
+
+import logic.write_behind as write_behind
+from logic.db_helpers import db_connection
+from logic.scoring import load_score_snapshot
+
+
+@pytest.fixture
+def writer(appmod, monkeypatch):
+    """A running writer installed as the app's, with a long batching window."""
+    writer = write_behind.ResponseWriter(batch_size=1000, interval_ms=300,
+                                         model=appmod.scoring_model)
+    writer.start()
+    monkeypatch.setattr(write_behind, "_writer", writer)
+    yield writer
+    writer.stop()
+
+
+def test_complete_flushes_queued_responses(client, writer, model, start_submission, answer_sheet):
+    submission_id = start_submission()
+    answers = answer_sheet(np.random.default_rng(1))
+    for question_id, value in answers.items():
+        response = client.post("/api/submit-response", json={
+            "submission_id": submission_id, "question_id": question_id, "numeric_response": value})
+        assert response.status_code == 202
+
+    # Nothing has been written yet; completing must wait for the queue
+    assert writer.stats()["written"] < len(answers)
+    assert client.post(f"/api/complete/{submission_id}").status_code == 200
+
+    assert writer.stats()["written"] == len(answers)
+    expected = model.score(answers)
+    assert load_score_snapshot(submission_id, model.version)["scores"] == expected
+    assert client.get(f"/api/results/{submission_id}").get_json()["scores"] == expected
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"question_id": "Q1", "numeric_response": 4}, 404),
+    ({"question_id": "Q999", "numeric_response": 4}, 400),
+    ({"question_id": "Q1", "numeric_response": 99}, 400),
+    ({"question_id": "Q1", "numeric_response": "4"}, 400),
+])
+def test_invalid_responses_are_rejected_before_queueing(client, writer, start_submission,
+                                                        body, status):
+    submission_id = start_submission() if status != 404 else "missing-submission"
+    response = client.post("/api/submit-response", json={"submission_id": submission_id, **body})
+    assert response.status_code == status
+    assert writer.stats()["enqueued"] == 0
+
+
+def test_rows_that_fail_to_write_are_dropped_and_counted(writer):
+    # Bypasses the handler's validation: the foreign key rejects the row
+    assert writer.submit(("missing-submission", "Q1", 4, None))
+    assert writer.flush(5)
+    stats = writer.stats()
+    assert (stats["written"], stats["dropped"]) == (0, 1)
+
+
+def test_completed_submissions_are_rejected_before_queueing(client, writer, start_submission):
+    submission_id = start_submission()
+    assert client.post(f"/api/complete/{submission_id}").status_code == 200
+    response = client.post("/api/submit-response", json={
+        "submission_id": submission_id, "question_id": "Q1", "numeric_response": 4})
+    assert response.status_code == 409
+    assert writer.stats()["enqueued"] == 0
+
+
+def test_rows_queued_before_completion_are_dropped(client, writer, start_submission):
+    # Passed the handler's check, then the submission was completed before
+    # the writer got to the row
+    submission_id = start_submission()
+    with db_connection() as conn:
+        conn.execute("UPDATE submissions SET is_complete = 1 WHERE submission_id = ?",
+                     (submission_id,))
+    assert writer.submit((submission_id, "Q1", 4, None))
+    assert writer.flush(5)
+    stats = writer.stats()
+    assert (stats["written"], stats["dropped"]) == (0, 1)
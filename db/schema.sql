@@ -1,4 +1,8 @@
 -- schema.sql
+--
+-- Reference copy of the current schema. The live database is created and
+-- upgraded by backend/logic/migrations.py (run `python -m logic.migrations`
+-- from backend/); keep this file in sync when adding a migration.
 
 -- Table: submissions
 -- One row per user/test. Tracks user info, completion status, etc.
@@ -7,7 +11,10 @@ CREATE TABLE IF NOT EXISTS submissions (
     user_name TEXT,                       -- optional: store user's name
     user_email TEXT,                      -- optional: store user's email
     submission_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-    is_complete INTEGER DEFAULT 0         -- 0 = in progress, 1 = finished
+    is_complete INTEGER DEFAULT 0,        -- 0 = in progress, 1 = finished
+    cohort TEXT,                          -- optional group label passed to /api/start
+    revision INTEGER NOT NULL DEFAULT 0,  -- bumped by the triggers below on every change
+    updated_at DATETIME                   -- time of the last such change (ETag/Last-Modified)
 );
 
 -- Table: submission_responses
@@ -24,5 +31,202 @@ CREATE TABLE IF NOT EXISTS submission_responses (
     FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
 );
 
--- You can add additional indexes if needed for performance, for example:
--- CREATE INDEX idx_submission_responses_submission_id ON submission_responses (submission_id);
\ No newline at end of file
+-- One answer per question per submission; changed answers are upserted.
+-- Also serves every per-submission response lookup.
+CREATE UNIQUE INDEX IF NOT EXISTS uq_submission_responses_submission_question
+    ON submission_responses (submission_id, question_id);
+
+-- Admin listing by time/status, keyset-paginated on (submission_time, submission_id).
+CREATE INDEX IF NOT EXISTS idx_submissions_time_id
+    ON submissions (submission_time, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submissions_complete_time_id
+    ON submissions (is_complete, submission_time, submission_id);
+
+-- Table: submission_scores
+-- Scores and labels computed once when a submission is completed.
+CREATE TABLE IF NOT EXISTS submission_scores (
+    submission_id TEXT PRIMARY KEY,       -- links to submissions.submission_id
+    learning_score INTEGER NOT NULL,
+    application_score INTEGER NOT NULL,
+    learning_direction TEXT,              -- labels from categorize_scores()
+    learning_strength TEXT,
+    application_direction TEXT,
+    application_strength TEXT,
+    overall_style TEXT,
+    scoring_version TEXT NOT NULL,        -- logic.scoring.SCORING_VERSION that produced the row
+    computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    model_version TEXT,                   -- ScoringModel.version (question bank) that produced it
+    submission_time DATETIME,             -- copy of submissions.submission_time, for time-sorted listings
+    FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
+);
+
+-- Score-range filters and score sorting in the admin listing, keyset-paginated
+-- on (score, submission_id), optionally within one overall_style.
+CREATE INDEX IF NOT EXISTS idx_submission_scores_learning
+    ON submission_scores (learning_score, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submission_scores_application
+    ON submission_scores (application_score, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submission_scores_style_learning
+    ON submission_scores (overall_style, learning_score, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submission_scores_style_application
+    ON submission_scores (overall_style, application_score, submission_id);
+-- Scored listings in submission-time order (the default sort), optionally per style.
+CREATE INDEX IF NOT EXISTS idx_submission_scores_time
+    ON submission_scores (submission_time, submission_id);
+CREATE INDEX IF NOT EXISTS idx_submission_scores_style_time
+    ON submission_scores (overall_style, submission_time, submission_id);
+
+-- Table: daily_rollups
+-- Per-day counters kept up to date by start/complete (see backend/logic/rollups.py).
+-- Score sums divided by `scored` give the day's average scores.
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT PRIMARY KEY,                 -- date(submission_time), UTC
+    started INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    learning_score_sum INTEGER NOT NULL DEFAULT 0,
+    application_score_sum INTEGER NOT NULL DEFAULT 0
+);
+
+-- Table: style_rollups
+-- Completed submissions per day and overall_style (quadrant).
+CREATE TABLE IF NOT EXISTS style_rollups (
+    day TEXT NOT NULL,
+    overall_style TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    learning_score_sum INTEGER NOT NULL DEFAULT 0,
+    application_score_sum INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, overall_style)
+);
+
+-- Table: submission_totals
+-- Running per-submission scores, moved by every response write in the same
+-- transaction (see backend/logic/totals.py). Rows are only used while
+-- model_version matches the scoring model the app loaded.
+CREATE TABLE IF NOT EXISTS submission_totals (
+    submission_id TEXT PRIMARY KEY,       -- links to submissions.submission_id
+    learning_score INTEGER NOT NULL DEFAULT 0,
+    application_score INTEGER NOT NULL DEFAULT 0,
+    answered INTEGER NOT NULL DEFAULT 0,  -- scored questions answered
+    model_version TEXT NOT NULL,          -- ScoringModel.version that produced the row
+    FOREIGN KEY (submission_id) REFERENCES submissions (submission_id)
+);
+
+-- Table: item_statistics
+-- Sufficient statistics per pair of scale items in one category, over completed
+-- submissions that answered both (see backend/logic/item_analysis.py). Values
+-- are keyed (reverse items reversed); (item, item) rows hold the item's own sums.
+CREATE TABLE IF NOT EXISTS item_statistics (
+    category TEXT NOT NULL,               -- scale metadata category, e.g. 'Learning'
+    item_a TEXT NOT NULL,                 -- question ids, in question bank order
+    item_b TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    sum_a INTEGER NOT NULL DEFAULT 0,
+    sum_b INTEGER NOT NULL DEFAULT 0,
+    sum_ab INTEGER NOT NULL DEFAULT 0,
+    model_version TEXT NOT NULL,          -- ScoringModel.version that produced the row
+    PRIMARY KEY (category, item_a, item_b)
+);
+
+-- Table: response_text_fts
+-- FTS5 index over text responses (external content: the text itself lives in
+-- submission_responses). The triggers below keep it in sync.
+CREATE VIRTUAL TABLE IF NOT EXISTS response_text_fts USING fts5(
+    text_response,
+    content = 'submission_responses',
+    content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_fts_insert
+AFTER INSERT ON submission_responses
+WHEN new.text_response IS NOT NULL
+BEGIN
+    INSERT INTO response_text_fts (rowid, text_response)
+    VALUES (new.id, new.text_response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_fts_delete
+AFTER DELETE ON submission_responses
+WHEN old.text_response IS NOT NULL
+BEGIN
+    INSERT INTO response_text_fts (response_text_fts, rowid, text_response)
+    VALUES ('delete', old.id, old.text_response);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_fts_update
+AFTER UPDATE OF text_response ON submission_responses
+BEGIN
+    INSERT INTO response_text_fts (response_text_fts, rowid, text_response)
+    SELECT 'delete', old.id, old.text_response WHERE old.text_response IS NOT NULL;
+    INSERT INTO response_text_fts (rowid, text_response)
+    SELECT new.id, new.text_response WHERE new.text_response IS NOT NULL;
+END;
+
+-- Revision tracking: anything that changes what a submission's endpoints
+-- return bumps submissions.revision (see backend/logic/http_cache.py).
+CREATE TRIGGER IF NOT EXISTS trg_responses_revision_insert
+AFTER INSERT ON submission_responses
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = new.submission_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_revision_update
+AFTER UPDATE ON submission_responses
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = new.submission_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_responses_revision_delete
+AFTER DELETE ON submission_responses
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = old.submission_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_submissions_revision_complete
+AFTER UPDATE OF is_complete ON submissions
+WHEN old.is_complete IS NOT new.is_complete
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = new.submission_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scores_revision_insert
+AFTER INSERT ON submission_scores
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = new.submission_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_scores_revision_update
+AFTER UPDATE ON submission_scores
+WHEN old.learning_score IS NOT new.learning_score
+  OR old.application_score IS NOT new.application_score
+  OR old.overall_style IS NOT new.overall_style
+  OR old.scoring_version IS NOT new.scoring_version
+  OR old.model_version IS NOT new.model_version
+BEGIN
+    UPDATE submissions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE submission_id = new.submission_id;
+END;
+
+-- Keep the copy of submission_time on each new snapshot (submission_time never changes).
+CREATE TRIGGER IF NOT EXISTS trg_scores_submission_time
+AFTER INSERT ON submission_scores
+BEGIN
+    UPDATE submission_scores SET submission_time = (
+        SELECT s.submission_time FROM submissions s
+        WHERE s.submission_id = new.submission_id)
+    WHERE submission_id = new.submission_id;
+END;
+
+-- Table: schema_version
+-- One row per applied migration (see backend/logic/migrations.py).
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT,
+    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
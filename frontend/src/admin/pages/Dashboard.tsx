@@ -19,6 +19,7 @@ interface Submission {
 interface DashboardStats {
   totalSubmissions: number;
   completedSubmissions: number;
+  completionRate: number;
   recentSubmissions: Array<Submission>;
 }
 
@@ -30,25 +31,14 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        // Get all submissions
-        const response = await adminApi.getSubmissions();
-        const allSubmissions: Submission[] = response.submissions;
-        
-        // Calculate stats
-        const totalSubmissions = allSubmissions.length;
-        const completedSubmissions = allSubmissions.filter((sub: Submission) => sub.is_complete).length;
-        
-        // Get 5 most recent submissions
-        const recentSubmissions = allSubmissions
-          .sort((a: Submission, b: Submission) => 
-            new Date(b.submission_time).getTime() - new Date(a.submission_time).getTime()
-          )
-          .slice(0, 5);
+        // Counts and recent submissions are aggregated server-side
+        const response = await adminApi.getStats();
         
         setStats({
-          totalSubmissions,
-          completedSubmissions,
-          recentSubmissions
+          totalSubmissions: response.total,
+          completedSubmissions: response.completed,
+          completionRate: response.completion_rate,
+          recentSubmissions: response.recent_submissions
         });
       } catch (err) {
         setError('Failed to load dashboard data');
@@ -102,7 +92,7 @@ const Dashboard = () => {
           <CardContent>
             <p className="text-4xl font-bold">{stats?.completedSubmissions}</p>
             <p className="text-gray-500">
-              ({Math.round((stats?.completedSubmissions || 0) / (stats?.totalSubmissions || 1) * 100)}% completion rate)
+              ({Math.round((stats?.completionRate || 0) * 100)}% completion rate)
             </p>
           </CardContent>
         </Card>
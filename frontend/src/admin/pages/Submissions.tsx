@@ -21,32 +21,46 @@ interface Submission {
   user_email: string;
   submission_time: string;
   is_complete: boolean;
+  learning_score: number | null;
+  application_score: number | null;
+  overall_style: string | null;
 }
 
 interface SubmissionsResponse {
   submissions: Submission[];
+  next_cursor: string | null;
 }
 
+const PAGE_SIZE = '50';
+
 const SubmissionsPage = () => {
   const [submissions, setSubmissions] = useState<Submission[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [filters, setFilters] = useState({
     status: '',
     date_from: '',
-    date_to: ''
+    date_to: '',
+    style: '',
+    sort: ''
   });
 
+  // Filter out empty strings from filters
+  const activeFilters = () => Object.fromEntries(
+    Object.entries(filters).filter(([_, v]) => v !== '')
+  );
+
   const fetchSubmissions = async () => {
     setLoading(true);
     try {
-      // Filter out empty strings from filters
-      const activeFilters = Object.fromEntries(
-        Object.entries(filters).filter(([_, v]) => v !== '')
-      );
-      
-      const response = await adminApi.getSubmissions(activeFilters) as SubmissionsResponse;
+      const response = await adminApi.getSubmissions({
+        ...activeFilters(),
+        limit: PAGE_SIZE,
+      }) as SubmissionsResponse;
       setSubmissions(response.submissions || []);
+      setNextCursor(response.next_cursor);
     } catch (err) {
       setError('Failed to load submissions');
       console.error(err);
@@ -55,6 +69,25 @@ const SubmissionsPage = () => {
     }
   };
 
+  const fetchMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await adminApi.getSubmissions({
+        ...activeFilters(),
+        limit: PAGE_SIZE,
+        cursor: nextCursor,
+      }) as SubmissionsResponse;
+      setSubmissions(prev => [...prev, ...(response.submissions || [])]);
+      setNextCursor(response.next_cursor);
+    } catch (err) {
+      setError('Failed to load more submissions');
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchSubmissions();
   }, []);
@@ -79,7 +112,7 @@ const SubmissionsPage = () => {
         </CardHeader>
         <CardContent>
           <form onSubmit={handleFilterSubmit} className="space-y-4 md:space-y-0 md:flex md:space-x-4">
-            <div className="w-full md:w-1/3 space-y-2">
+            <div className="w-full md:w-1/5 space-y-2">
               <label className="block text-sm font-medium text-gray-700" htmlFor="status">Status</label>
               <Select
                 name="status"  // Add name attribute
@@ -93,7 +126,7 @@ const SubmissionsPage = () => {
               </Select>
             </div>
             
-            <div className="w-full md:w-1/3">
+            <div className="w-full md:w-1/5">
               <label className="block text-sm font-medium text-gray-700 mb-1">From Date</label>
               <input
                 type="date"
@@ -104,7 +137,7 @@ const SubmissionsPage = () => {
               />
             </div>
             
-            <div className="w-full md:w-1/3">
+            <div className="w-full md:w-1/5">
               <label className="block text-sm font-medium text-gray-700 mb-1">To Date</label>
               <input
                 type="date"
@@ -115,6 +148,36 @@ const SubmissionsPage = () => {
               />
             </div>
             
+            <div className="w-full md:w-1/5 space-y-2">
+              <label className="block text-sm font-medium text-gray-700" htmlFor="style">Style</label>
+              <Select
+                name="style"
+                value={filters.style}
+                onChange={handleFilterChange}
+                id="style"
+              >
+                <SelectItem value="">All</SelectItem>
+                <SelectItem value="intuitive">Intuitive</SelectItem>
+                <SelectItem value="conceptual">Conceptual</SelectItem>
+                <SelectItem value="pragmatic">Pragmatic</SelectItem>
+                <SelectItem value="deductive">Deductive</SelectItem>
+              </Select>
+            </div>
+            
+            <div className="w-full md:w-1/5 space-y-2">
+              <label className="block text-sm font-medium text-gray-700" htmlFor="sort">Sort by</label>
+              <Select
+                name="sort"
+                value={filters.sort}
+                onChange={handleFilterChange}
+                id="sort"
+              >
+                <SelectItem value="">Newest</SelectItem>
+                <SelectItem value="learning_score">Learning score</SelectItem>
+                <SelectItem value="application_score">Application score</SelectItem>
+              </Select>
+            </div>
+            
             <div className="flex items-end">
               <Button type="submit">
                 Apply Filters
@@ -153,6 +216,15 @@ const SubmissionsPage = () => {
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Status
                     </th>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Learning
+                    </th>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Application
+                    </th>
+                    <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
+                      Style
+                    </th>
                     <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">
                       Actions
                     </th>
@@ -161,7 +233,7 @@ const SubmissionsPage = () => {
                 <tbody className="bg-white divide-y divide-gray-200">
                   {submissions.length === 0 ? (
                     <tr>
-                      <td colSpan={5} className="px-6 py-4 text-center text-gray-500">
+                      <td colSpan={8} className="px-6 py-4 text-center text-gray-500">
                         No submissions found.
                       </td>
                     </tr>
@@ -186,6 +258,16 @@ const SubmissionsPage = () => {
                             {submission.is_complete ? 'Completed' : 'In Progress'}
                           </span>
                         </td>
+                        {/* Scores come from the stored snapshot; unscored submissions show N/A */}
+                        <td className="px-6 py-4 whitespace-nowrap">
+                          {submission.learning_score ?? 'N/A'}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap">
+                          {submission.application_score ?? 'N/A'}
+                        </td>
+                        <td className="px-6 py-4 whitespace-nowrap capitalize">
+                          {submission.overall_style || 'N/A'}
+                        </td>
                         <td className="px-6 py-4 whitespace-nowrap text-sm font-medium">
                           <Link href={`/admin/submissions/${submission.submission_id}`}>
                             <a className="text-indigo-600 hover:text-indigo-900">View</a>
@@ -197,6 +279,14 @@ const SubmissionsPage = () => {
                 </tbody>
               </table>
             </div>
+            
+            {nextCursor && (
+              <div className="mt-4 flex justify-center">
+                <Button onClick={fetchMore} disabled={loadingMore}>
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </Button>
+              </div>
+            )}
           </CardContent>
         </Card>
       )}
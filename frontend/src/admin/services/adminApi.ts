@@ -104,11 +104,27 @@ export const adminApi = {
     return authFetch(`${API_BASE_URL}/submissions?${queryParams}`);
   },
 
+  // Get dashboard statistics (counts, recent submissions, distributions)
+  async getStats(days = 30) {
+    return authFetch(`${API_BASE_URL}/stats?days=${days}`);
+  },
+
   // Get details for a specific submission
   async getSubmissionDetail(submissionId: string) {
     return authFetch(`${API_BASE_URL}/submissions/${submissionId}`);
   },
 
+  // Get details for many submissions in one request, keyed by ID
+  async getSubmissionDetails(submissionIds: string[]) {
+    return authFetch(`${API_BASE_URL}/submissions/batch`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ submission_ids: submissionIds }),
+    });
+  },
+
   // Simulate results with custom scores
   async simulateResults(learning_score: number, application_score: number) {
     return authFetch(`${API_BASE_URL}/simulate`, {
@@ -117,6 +117,12 @@ const ResultsPage: React.FC = () => {
                       <p className="text-muted-foreground">
                         {results.detailed_profile.preference_description}
                       </p>
+                      {results.percentiles?.overall.learning_score != null && (
+                        <p className="text-sm text-muted-foreground mt-2">
+                          Percentile among all respondents:{" "}
+                          {results.percentiles.overall.learning_score}
+                        </p>
+                      )}
                     </CardContent>
                   </Card>
 
@@ -134,6 +140,12 @@ const ResultsPage: React.FC = () => {
                             .application_preference_description
                         }
                       </p>
+                      {results.percentiles?.overall.application_score != null && (
+                        <p className="text-sm text-muted-foreground mt-2">
+                          Percentile among all respondents:{" "}
+                          {results.percentiles.overall.application_score}
+                        </p>
+                      )}
                     </CardContent>
                   </Card>
                 </div>
@@ -59,9 +59,21 @@ export interface DetailedProfile {
   weaknesses: string[];
 }
 
+// Percentile ranks (0-100); null until anyone has completed
+export interface PercentileRanks {
+  learning_score: number | null;
+  application_score: number | null;
+}
+
+export interface Percentiles {
+  overall: PercentileRanks;
+  cohort: (PercentileRanks & { name: string }) | null;
+}
+
 export interface Results {
   scores: Scores;
   labels: Labels;
   detailed_profile: DetailedProfile;
   plot_url: string;
+  percentiles?: Percentiles;
 }
\ No newline at end of file